@@ -1,242 +1,224 @@
 import numpy as np
 import pandas as pd
-import googleapiclient.discovery
 import random
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
 import string
-from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-from tensorflow.keras.preprocessing.text import Tokenizer
-from tensorflow.keras.preprocessing.sequence import pad_sequences
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Embedding, Bidirectional, LSTM, Dense, Dropout, GlobalMaxPooling1D, Concatenate, Input
 import os
 import json
-from tensorflow.keras.models import Model
+import argparse
+import inspect
+import csv
 import datetime
+import gzip
+import re
+import timeit
+import zoneinfo
+import time
+import threading
+import functools
+import hashlib
+import itertools
+import contextlib
+import sqlite3
+import glob
+import importlib.util
+import multiprocessing
+import statistics
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+# TensorFlow, scikit-learn, NLTK and googleapiclient take seconds to import, so they are
+# imported on first use. Importing this module stays fast and works offline.
+
+# NLTK resources, downloaded on first use if they are missing
+NLTK_RESOURCES = {'punkt': 'tokenizers/punkt', 'punkt_tab': 'tokenizers/punkt_tab', 'stopwords': 'corpora/stopwords'}
+
+
+@functools.lru_cache(maxsize=None)
+def ensureNltkResources():
+    import nltk
+    for name, path in NLTK_RESOURCES.items():
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            nltk.download(name)
+
+
+@functools.lru_cache(maxsize=None)
+def getStopWords():
+    """
+    The NLTK and scikit-learn english stop words, loaded once.
+    """
+    ensureNltkResources()
+    from nltk.corpus import stopwords
+    from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+    return frozenset(stopwords.words('english') + list(ENGLISH_STOP_WORDS))
+
+
+def loadModelLibraries():
+    """
+    Import the TensorFlow and scikit-learn names the model functions use into
+    the module namespace. Every model function calls this first.
+    """
+    global train_test_split, StandardScaler, Tokenizer, pad_sequences, Model
+    global Embedding, Bidirectional, LSTM, Dense, Dropout, GlobalMaxPooling1D, Concatenate, Input, Flatten, MaskedGlobalMaxPooling1D
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import StandardScaler
+    from tensorflow.keras.preprocessing.text import Tokenizer
+    from tensorflow.keras.preprocessing.sequence import pad_sequences
+    from tensorflow.keras.models import Model
+    from tensorflow.keras.layers import Embedding, Bidirectional, LSTM, Dense, Dropout, GlobalMaxPooling1D, Concatenate, Input, Flatten
+    MaskedGlobalMaxPooling1D = defineMaskedGlobalMaxPooling1D()
+
+
+@functools.lru_cache(maxsize=None)
+def defineMaskedGlobalMaxPooling1D():
+    """
+    The MaskedGlobalMaxPooling1D layer class, defined once Keras is imported.
+
+    Keras' GlobalMaxPooling1D ignores the mask of Embedding(mask_zero=True),
+    so the padding timesteps of bucketed batches would join the max. This
+    pooling takes the max over the unmasked timesteps only, and gives zeros
+    for a row with none, such as an empty description.
+    """
+    import keras
+    from keras import ops
+
+    @keras.saving.register_keras_serializable(package='projectFinal')
+    class MaskedGlobalMaxPooling1D(keras.layers.Layer):
+        def __init__(self, **kwargs):
+            super().__init__(**kwargs)
+            self.supports_masking = True
+
+        def call(self, inputs, mask=None):
+            if mask is None:
+                return ops.max(inputs, axis=1)
+            mask = ops.expand_dims(ops.cast(mask, 'bool'), -1)
+            pooled = ops.max(ops.where(mask, inputs, float('-inf')), axis=1)
+            return ops.where(ops.any(mask, axis=1), pooled, ops.zeros_like(pooled))
+
+        def compute_mask(self, inputs, mask=None):
+            return None
+
+        def compute_output_shape(self, input_shape):
+            return (input_shape[0], input_shape[2])
 
-# Download NLTK resources
-import nltk
-nltk.download('punkt')
-nltk.download('stopwords')
+    return MaskedGlobalMaxPooling1D
 
-API_KEY = 'INSERTAPIKEY'
-youtube = googleapiclient.discovery.build('youtube', 'v3', developerKey=API_KEY)
 
+API_KEY = os.environ.get('YOUTUBE_API_KEY', 'INSERTAPIKEY')
 
-def getRandomVideos(saveFile=True, filePath='randomVideos2.json', numVideos=20):
-    # Check if the file already exists
-    if os.path.exists(filePath):
+
+def buildYoutubeClient():
+    import googleapiclient.discovery
+    return googleapiclient.discovery.build('youtube', 'v3', developerKey=API_KEY)
+
+
+# googleapiclient clients are not thread safe, so every crawl thread gets its own.
+# Point clientFactory at a stub to run the collectors offline, as tests/conftest.py does.
+clientFactory = buildYoutubeClient
+clientState = threading.local()
+
+
+def getYoutubeClient():
+    client = getattr(clientState, 'client', None)
+    if client is None:
+        client = clientState.client = clientFactory()
+    return client
+
+
+def getRandomVideos(saveFile=True, filePath='randomVideos2.json', numVideos=20, targetCount=None):
+    # Check if the file already exists and the crawl that wrote it finished
+    if isCrawlComplete(filePath):
         # If the file exists, load and return the data from the file
-        with open(filePath, 'r') as file:
-            videosData = json.load(file)
-        return videosData
+        return loadVideoRecords(filePath)
 
-    # If the file doesn't exist, fetch new random videos
-    videosData = []
+    # If the file doesn't exist, fetch new random videos, streaming them to disk as they arrive
+    writer = CrawlWriter(filePath, saveFile)
 
-    # Search for videos with the specified criteria
-    videos = youtube.search().list(
+    # Search for videos with the specified criteria, page by page until targetCount videos are kept
+    complete = crawlPages(
+        writer,
+        'search',
+        searchRecords,
+        targetCount=targetCount,
         part='snippet',
+        fields=SEARCH_VIDEO_FIELDS,
         type='video',
         relevanceLanguage='en',  # English videos
-        maxResults=numVideos,
+        maxResults=min(numVideos, PAGE_SIZE),
         videoDuration='any',   # Any duration
         videoDefinition='high',  # High definition
-        safeSearch='strict',
-    ).execute()
-
-
-    videoIds = [item['id']['videoId'] for item in videos['items']]
-    # Get video details (title, views) for the selected video IDs
-    for videoId in videoIds:
-        response = youtube.videos().list(
-            part='snippet,statistics',
-            id=videoId
-        ).execute()
-        
-        snippet = response['items'][0]['snippet']
-        statistics = response['items'][0]['statistics']
-
-        title = snippet['title']
-        description = snippet.get('description', '')
-        channel_title = snippet['channelTitle']
-        channel_id = snippet['channelId']
-        subscriber_count = get_channel_subscriber_count(channel_id)
-        category_id = snippet['categoryId']
-        publication_date = snippet['publishedAt']
-        
-        langMatch = True
-        if ('defaultAudioLanguage' in snippet and snippet['defaultAudioLanguage'] != 'en') or ('defaultLanguage' in snippet and snippet['defaultLanguage'] != 'en'):
-            langMatch = False
-        
-        
-        # Ensure the video has more than 1,000 views, exists, and is in english
-        if (langMatch and 'viewCount' in statistics and int(statistics['viewCount']) > 1000):
-            videosData.append({
-                'videoId': videoId,
-                'title': title,
-                'description': description,
-                'channelTitle': channel_title,
-                'channelId': channel_id,
-                'subscriberCount': subscriber_count,
-                'categoryId': category_id,
-                'publishedAt': publication_date,
-                'views': int(statistics['viewCount'])
-            })
-        
-        
+        safeSearch='strict'
+    )
 
     # Save the data to a file
-    if saveFile:
-        with open(filePath, 'w') as file:
-            json.dump(videosData, file)
+    return writer.finish(complete=complete)
 
-    return videosData
-
-def getPopularVideos(saveFile=True, filePath='popularVideos2.json'):
-    # Check if the file already exists
-    if os.path.exists(filePath):
+def getPopularVideos(saveFile=True, filePath='popularVideos2.json', targetCount=None):
+    # Check if the file already exists and the crawl that wrote it finished
+    if isCrawlComplete(filePath):
         # If the file exists, load and return the data from the file
-        with open(filePath, 'r') as file:
-            videosData = json.load(file)
-        return videosData
+        return loadVideoRecords(filePath)
 
-    # If the file doesn't exist, fetch new random videos
-    videosData = []
-    
-    popularVids = youtube.videos().list(
+    # If the file doesn't exist, fetch new random videos, streaming them to disk as they arrive
+    writer = CrawlWriter(filePath, saveFile)
+
+    # Ensure the videos have more than 1,000 views, exist, and are in english
+    complete = crawlPages(
+        writer,
+        'videos',
+        chartRecords,
+        targetCount=targetCount,
         part='snippet,statistics',
+        fields=CHART_FIELDS,
         chart='mostPopular',
         regionCode='US',  # Adjust the region code as needed
         maxResults=50
-    ).execute()
-
-    for video in popularVids['items']:
-        snippet = video['snippet']
-        statistics = video['statistics']
-
-        title = snippet['title']
-        description = snippet.get('description', '')
-        channel_title = snippet['channelTitle']
-        channel_id = snippet['channelId']
-        subscriber_count = get_channel_subscriber_count(channel_id)
-        category_id = snippet['categoryId']
-        publication_date = snippet['publishedAt']
-
-        lang_match = True
-        if ('defaultAudioLanguage' in snippet and snippet['defaultAudioLanguage'] != 'en') or ('defaultLanguage' in snippet and snippet['defaultLanguage'] != 'en'):
-            lang_match = False
-
-        # Ensure the video has more than 1,000 views and exists
-        if ('viewCount' in statistics and int(statistics['viewCount']) > 1000 and lang_match):
-            videosData.append({
-                'videoId': video['id'],
-                'title': title,
-                'description': description,
-                'channelTitle': channel_title,
-                'channelId': channel_id,
-                'subscriberCount': subscriber_count,
-                'categoryId': category_id,
-                'publishedAt': publication_date,
-                'views': int(statistics['viewCount'])
-            })
-
-
-
+    )
 
     # Save the data to a file
-    if saveFile:
-        with open(filePath, 'w') as file:
-            json.dump(videosData, file)
-
-    return videosData
+    return writer.finish(complete=complete)
 
 
-def getCategoryVideos(saveFile=True, filePath='categoryVideos2.json', numVideos=20):
-    # Check if the file already exists
-    if os.path.exists(filePath):
+def getCategoryVideos(saveFile=True, filePath='categoryVideos2.json', numVideos=20, targetCount=None):
+    # Check if the file already exists and the crawl that wrote it finished
+    if isCrawlComplete(filePath):
         # If the file exists, load and return the data from the file
-        with open(filePath, 'r') as file:
-            videosData = json.load(file)
-        return videosData
+        return loadVideoRecords(filePath)
 
-    # If the file doesn't exist, fetch new random videos
-    videosData = []
+    # If the file doesn't exist, fetch new random videos, streaming them to disk as they arrive
+    writer = CrawlWriter(filePath, saveFile)
 
-    # Search for videos with the specified criteria
-    videos = youtube.search().list(
+    # Search for videos with the specified criteria, page by page until targetCount videos are kept
+    complete = crawlPages(
+        writer,
+        'search',
+        searchRecords,
+        targetCount=targetCount,
         part='snippet',
+        fields=SEARCH_VIDEO_FIELDS,
         type='video',
         relevanceLanguage='en',  # English videos
-        maxResults=numVideos,
+        maxResults=min(numVideos, PAGE_SIZE),
         category_id=20,#gaming
         videoDuration='any',   # Any duration
         videoDefinition='high',  # High definition
-        safeSearch='strict',
-    ).execute()
-
-
-    videoIds = [item['id']['videoId'] for item in videos['items']]
-    # Get video details (title, views) for the selected video IDs
-    for videoId in videoIds:
-        response = youtube.videos().list(
-            part='snippet,statistics',
-            id=videoId
-        ).execute()
-        
-        snippet = response['items'][0]['snippet']
-        statistics = response['items'][0]['statistics']
-
-        title = snippet['title']
-        description = snippet.get('description', '')
-        channel_title = snippet['channelTitle']
-        channel_id = snippet['channelId']
-        subscriber_count = get_channel_subscriber_count(channel_id)
-        category_id = snippet['categoryId']
-        publication_date = snippet['publishedAt']
-        
-        langMatch = True
-        if ('defaultAudioLanguage' in snippet and snippet['defaultAudioLanguage'] != 'en') or ('defaultLanguage' in snippet and snippet['defaultLanguage'] != 'en'):
-            langMatch = False
-        
-        
-        # Ensure the video has more than 1,000 views, exists, and is in english
-        if (langMatch and 'viewCount' in statistics and int(statistics['viewCount']) > 1000):
-            videosData.append({
-                'videoId': videoId,
-                'title': title,
-                'description': description,
-                'channelTitle': channel_title,
-                'channelId': channel_id,
-                'subscriberCount': subscriber_count,
-                'categoryId': category_id,
-                'publishedAt': publication_date,
-                'views': int(statistics['viewCount'])
-            })
-        
-        
+        safeSearch='strict'
+    )
 
     # Save the data to a file
-    if saveFile:
-        with open(filePath, 'w') as file:
-            json.dump(videosData, file)
-
-    return videosData
+    return writer.finish(complete=complete)
 
 
-def getChannelsVideos(saveFile=True, filePath='channelsVideos3.json'):
-    # Check if the file already exists
-    if os.path.exists(filePath):
+def getChannelsVideos(saveFile=True, filePath='channelsVideos3.json', listingMode='search', targetCount=None):
+    # Check if the file already exists and the crawl that wrote it finished
+    if isCrawlComplete(filePath):
         # If the file exists, load and return the data from the file
-        with open(filePath, 'r') as file:
-            videosData = json.load(file)
-        return videosData
+        return loadVideoRecords(filePath)
 
     # If the file doesn't exist, fetch videos from specific channels
-    videosData = []
+    writer = CrawlWriter(filePath, saveFile)
 
     # channelIds = ['UCgRQHK8Ttr1j9xCEpCAlgbQ', 'UCHnyfMqiRRG1u-2MsSQLbXA', 'UCGfUuxBzB8E30XjCjOvji2w', 'UCBJycsmduvYEL83R_U4JriQ', 'UCvK4bOhULCpmLabd2pDMtnA',
     #                'UCc9CjaAjsMMvaSghZB7-Kog', 'UCX6OQ3DkcsbYNE6H8uQQuVA', 'UCQJWtTnAHhEG5w4uN0udnUQ', 'UCL6JmiMXKoXS6bpP1D3bk8g', 'UCZB6V9fUov0Mx_us3MWWILg']
@@ -259,468 +241,2938 @@ def getChannelsVideos(saveFile=True, filePath='channelsVideos3.json'):
                   'UCDogdKl7t7NHzQ95aEwkdMw', 'UC2C_jShtL725hvbm1arSV9w', 'UCftwRNsjfRo08xYE31tkiyw', 'UCyps-v4WNjWDnYRKmZ4BUGw']
     
     
-    for channelID in channelIds:
-        # Get the latest videos from the channel
-        channelResponse = youtube.search().list(
-            channelId=channelID,
-            part='id',
-            type='video',
+    # Get the latest videos from every channel and their details, checkpointing as channels finish
+    return crawlChannels(writer, channelIds, 20, listingMode, targetCount)
+
+
+def getPopularChannelsVideos(saveFile=True, filePath='popularChannelsVideos4.json', listingMode='search', targetCount=None):
+    # Check if the file already exists and the crawl that wrote it finished
+    if isCrawlComplete(filePath):
+        # If the file exists, load and return the data from the file
+        return loadVideoRecords(filePath)
+
+    # If the file doesn't exist, fetch videos from channels with videos on trending
+    writer = CrawlWriter(filePath, saveFile)
+
+    # Resume with the channels picked by the interrupted crawl, if there was one
+    trendingChannelIds = writer.getValue('channelIds')
+    if trendingChannelIds is None:
+        trendingList = apiCall(
+            'videos',
+            part='snippet',
+            fields=TRENDING_CHANNEL_FIELDS,
+            chart='mostPopular',
+            regionCode='US',  # Adjust the region code as needed
             maxResults=20
-        ).execute()
-
-        videoIds = [item['id']['videoId'] for item in channelResponse['items']]
-
-        # Get video details (title, views) for the selected video IDs
-        for video_id in videoIds:
-            response = youtube.videos().list(
-                part='snippet,statistics',
-                id=video_id
-            ).execute()
-            snippet = response['items'][0]['snippet']
-            statistics = response['items'][0]['statistics']
-
-            title = snippet['title']
-            description = snippet.get('description', '')
-            channel_title = snippet['channelTitle']
-            channel_id = snippet['channelId']
-            subscriber_count = get_channel_subscriber_count(channel_id)
-            category_id = snippet['categoryId']
-            publication_date = snippet['publishedAt']
-
-            lang_match = True
-            if ('defaultAudioLanguage' in snippet and snippet['defaultAudioLanguage'] != 'en') or ('defaultLanguage' in snippet and snippet['defaultLanguage'] != 'en'):
-                lang_match = False
-
-            # Ensure the video has more than 1,000 views and exists
-            if ('viewCount' in statistics and int(statistics['viewCount']) > 1000 and lang_match):
-                videosData.append({
-                    'videoId': video_id,
-                    'title': title,
-                    'description': description,
-                    'channelTitle': channel_title,
-                    'channelId': channel_id,
-                    'subscriberCount': subscriber_count,
-                    'categoryId': category_id,
-                    'publishedAt': publication_date,
-                    'views': int(statistics['viewCount'])
-                })
+        )
+
+        trendingChannelIds = [item['snippet']['channelId'] for item in trendingList['items']]
+        writer.setValue('channelIds', trendingChannelIds)
+
+    # Get the latest videos from every channel and their details, checkpointing as channels finish
+    return crawlChannels(writer, trendingChannelIds, 20, listingMode, targetCount)
+
+
+def getRandomChannelsVideos(saveFile=True, filePath='randomChannelsVideos8.json', numChannels=20, numVideosPerChannel=20, listingMode='search', targetCount=None):
+    # Check if the file already exists and the crawl that wrote it finished
+    if isCrawlComplete(filePath):
+        # If the file exists, load and return the data from the file
+        return loadVideoRecords(filePath)
+
+    # If the file doesn't exist, fetch videos from specific channels
+    writer = CrawlWriter(filePath, saveFile)
+
+    # Resume with the channels picked by the interrupted crawl, if there was one
+    channelIds = writer.getValue('channelIds')
+    if channelIds is None:
+        # Search for videos with the specified criteria
+        searchItems = listPageItems(
+            'search',
+            numChannels,
+            part='snippet',
+            fields=SEARCH_CHANNEL_FIELDS,
+            type='video',
+            relevanceLanguage='en',  # English videos
+            videoDuration='any',   # Any duration
+            videoDefinition='high',  # High definition
+            safeSearch='strict',
+        )
+
+        channelIds = [item['snippet']['channelId'] for item in searchItems]
+        writer.setValue('channelIds', channelIds)
+
+    # Get the latest videos from every channel and their details, checkpointing as channels finish
+    return crawlChannels(writer, channelIds, numVideosPerChannel, listingMode, targetCount)
+
+
+def combineDatasets(saveFile=True, columns=None):
+    """
+    Merge every collector file into one list with unique videoIds.
+
+    The files are found by name (e.g. channelsVideos2.json, channelsVideos3.jsonl).
+    With pyarrow, the files that are new or changed since the last call are
+    imported into videoStore, and the combined videos are read back from it:
+    one row per videoId, the latest upserted, and only the columns asked
+    for. Files imported together keep the first record of a videoId in
+    DATASET_FILES order. Without pyarrow, the files are merged in one
+    vectorized pandas pass, keeping the first record in DATASET_FILES order.
+    The combined file it saves (COMBINED_DATASET_PATH) is not one of its
+    inputs, so stale combined records never win over the collector files.
+
+    Args:
+        columns (list): Return a DataFrame of these columns (and videoId)
+            instead of a list of records.
+    """
+    filePaths = [filePath for filePath in findDatasetFiles() if os.path.basename(filePath) != COMBINED_DATASET_PATH]
+
+    if videoStore is not None and videoStore.isAvailable():
+        # Imported last to first, so the first file wins as the later upsert
+        videoStore.importDatasets(filePaths[::-1])
+        combined = videoStore.read(columns=None if saveFile else columns)
+    else:
+        # Combine the lists of sets into one list with unique videoIds
+        frames = [pd.DataFrame(loadVideoRecords(filePath)) for filePath in filePaths]
+        combined = pd.concat(frames, ignore_index=True).drop_duplicates('videoId', keep='first') if frames else toVideoFrame([])
+        if videoCatalog is not None:
+            videoCatalog.upsert(combined)
 
     # Save the data to a file
     if saveFile:
-        with open(filePath, 'w') as file:
-            json.dump(videosData, file)
+        with open(COMBINED_DATASET_PATH, 'w') as file:
+            file.write(combined.to_json(orient='records'))
+        if videoStore is not None and videoStore.isAvailable():
+            # Its videos are the store's already
+            videoStore.markImported([COMBINED_DATASET_PATH])
 
-    return videosData
+    if columns is not None:
+        return combined[['videoId'] + [column for column in columns if column != 'videoId']]
+    return combined.to_dict('records')
 
 
-def getPopularChannelsVideos(saveFile=True, filePath='popularChannelsVideos4.json'):
-    # Check if the file already exists
-    if os.path.exists(filePath):
+def getAllVideos(saveFile=True, filePath='allVideos2.json', numChannels=20, numVideosPerChannel=15, listingMode='search', targetCount=None):
+    # Check if the file already exists and the crawl that wrote it finished
+    if isCrawlComplete(filePath):
         # If the file exists, load and return the data from the file
-        with open(filePath, 'r') as file:
-            videosData = json.load(file)
-        return videosData
+        return loadVideoRecords(filePath)
 
-    # If the file doesn't exist, fetch videos from channels with videos on trending
-    videosData = []
+    # If the file doesn't exist, fetch videos from specific channels
+    writer = CrawlWriter(filePath, saveFile)
+
+    # Resume with the channels picked by the interrupted crawl, if there was one
+    channelIds = writer.getValue('channelIds')
+    if channelIds is None:
+        # Search for videos with the specified criteria
+        searchItems = listPageItems(
+            'search',
+            numChannels,
+            part='snippet',
+            fields=SEARCH_CHANNEL_FIELDS,
+            type='video',
+            relevanceLanguage='en',  # English videos
+            videoDuration='any',   # Any duration
+            videoDefinition='high',  # High definition
+            safeSearch='strict',
+        )
+
+        randomChannelIds = [item['snippet']['channelId'] for item in searchItems]
+
+        # specChannelIds = ['UCgRQHK8Ttr1j9xCEpCAlgbQ', 'UCHnyfMqiRRG1u-2MsSQLbXA', 'UCGfUuxBzB8E30XjCjOvji2w', 'UCBJycsmduvYEL83R_U4JriQ', 'UCvK4bOhULCpmLabd2pDMtnA',
+        #                   'UCc9CjaAjsMMvaSghZB7-Kog', 'UCX6OQ3DkcsbYNE6H8uQQuVA', 'UCQJWtTnAHhEG5w4uN0udnUQ', 'UCL6JmiMXKoXS6bpP1D3bk8g', 'UCZB6V9fUov0Mx_us3MWWILg']
+
+        specChannelIds = ['UCgRQHK8Ttr1j9xCEpCAlgbQ', 'UCHnyfMqiRRG1u-2MsSQLbXA', 'UCGfUuxBzB8E30XjCjOvji2w', 'UCBJycsmduvYEL83R_U4JriQ', 
+                      'UCvK4bOhULCpmLabd2pDMtnA', 'UCc9CjaAjsMMvaSghZB7-Kog', 'UCX6OQ3DkcsbYNE6H8uQQuVA', 'UCQJWtTnAHhEG5w4uN0udnUQ', 
+                      'UCL6JmiMXKoXS6bpP1D3bk8g', 'UCZB6V9fUov0Mx_us3MWWILg', 'UClyGlKOhDUooPJFy4v_mqPg', 'UCw1SQ6QRRtfAhrN_cjkrOgA', 
+                      'UCTkXRDQl0luXxVQrRQvWS6w', 'UCLXo7UDZvByw2ixzpQCufnA', 'UCAuk798iHprjTtwlClkFxMA', 'UCimiUgDLbi6P17BdaCZpVbg', 
+                      'UCDogdKl7t7NHzQ95aEwkdMw', 'UC2C_jShtL725hvbm1arSV9w', 'UCftwRNsjfRo08xYE31tkiyw', 'UCyps-v4WNjWDnYRKmZ4BUGw', 
+                      'UCsEukrAd64fqA7FjwkmZ_Dw', 'UCq6VFHwMzcMXbuKyG7SQYIg', 'UCTSRIY3GLFYIpkR2QwyeklA']
+
+
+        trendingList = apiCall(
+            'videos',
+            part='snippet',
+            fields=TRENDING_CHANNEL_FIELDS,
+            chart='mostPopular',
+            regionCode='US',  # Adjust the region code as needed
+            maxResults=20
+        )
+
+        trendingChannelIds = [item['snippet']['channelId'] for item in trendingList['items']]
+
+        channelIds = list(set(randomChannelIds + specChannelIds + trendingChannelIds))
+        writer.setValue('channelIds', channelIds)
+
+    # Get the latest videos from every channel and their details, checkpointing as channels finish
+    return crawlChannels(writer, channelIds, numVideosPerChannel, listingMode, targetCount)
+
+
+
+
+
+
+API_UNIT_COSTS = {'search': 100, 'videos': 1, 'channels': 1, 'playlistItems': 1}  # Quota units per list() call
+API_REQUESTS_PER_SECOND = 10
+DAILY_QUOTA_UNITS = 10000  # Default YouTube Data API quota
+CRAWL_WORKERS = 8
+
+
+# Partial responses: the API only sends back the fields the collectors read.
+# Responses are gzip-compressed as well, which googleapiclient asks for on every request.
+VIDEO_FIELDS = 'items(id,snippet(title,description,channelTitle,channelId,categoryId,publishedAt,defaultLanguage,defaultAudioLanguage),statistics/viewCount)'
+CHART_FIELDS = 'nextPageToken,' + VIDEO_FIELDS
+TRENDING_CHANNEL_FIELDS = 'items/snippet/channelId'
+CHANNEL_FIELDS = 'items(id,statistics/subscriberCount,contentDetails/relatedPlaylists/uploads)'
+SEARCH_VIDEO_FIELDS = 'nextPageToken,items/id/videoId'
+SEARCH_CHANNEL_FIELDS = 'nextPageToken,items/snippet/channelId'
+PLAYLIST_FIELDS = 'nextPageToken,items/contentDetails/videoId'
+STATISTICS_FIELDS = 'items(id,statistics/viewCount)'
+
+
+class QuotaExceededError(Exception):
+    pass
+
+
+class RateLimiter:
+    """
+    Token bucket shared by all crawl threads, spreading requests to at most
+    `ratePerSecond` with bursts of `burst`.
+    """
+
+    def __init__(self, ratePerSecond=API_REQUESTS_PER_SECOND, burst=None):
+        self.ratePerSecond = ratePerSecond
+        self.capacity = burst or max(1, ratePerSecond)
+        self.tokens = self.capacity
+        self.updatedAt = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updatedAt) * self.ratePerSecond)
+            self.updatedAt = now
+            # Take the token now and sleep off the debt outside the lock, so waiting threads queue up in order
+            self.tokens -= 1
+            wait = -self.tokens / self.ratePerSecond if self.tokens < 0 else 0
+
+        if wait > 0:
+            time.sleep(wait)
 
-    trendingList = youtube.videos().list(
-        part='snippet',
-        chart='mostPopular',
-        regionCode='US',  # Adjust the region code as needed
-        maxResults=20
-    ).execute()
 
-    trendingChannelIds = [item['snippet']['channelId'] for item in trendingList['items']]
+rateLimiter = RateLimiter()
 
-    for channelID in trendingChannelIds:
-        # Get the latest videos from the channel
-        channelResponse = youtube.search().list(
-            channelId=channelID,
+
+QUOTA_LEDGER_PATH = 'quotaLedger.json'
+
+# The daily quota resets at midnight Pacific Time
+try:
+    QUOTA_TIMEZONE = zoneinfo.ZoneInfo('America/Los_Angeles')
+except zoneinfo.ZoneInfoNotFoundError:
+    QUOTA_TIMEZONE = datetime.timezone(datetime.timedelta(hours=-8))
+
+
+def quotaDay():
+    return datetime.datetime.now(QUOTA_TIMEZONE).date().isoformat()
+
+
+class QuotaLedger:
+    """
+    Persistent record of the quota units spent today.
+
+    Every request is charged its documented cost before it is sent, and a
+    request that would go over `dailyQuota` raises QuotaExceededError instead.
+    Charges are kept in memory until flush(), which the crawls call after
+    every page or channel group and when they stop. The ledger also
+    remembers the channels a planned crawl had to defer.
+    """
+
+    def __init__(self, filePath=QUOTA_LEDGER_PATH, dailyQuota=DAILY_QUOTA_UNITS):
+        self.filePath = filePath
+        self.dailyQuota = dailyQuota
+        self.state = None
+        self.dirty = False
+        self.lock = threading.RLock()
+
+    def load(self):
+        self.state = {'day': quotaDay(), 'unitsUsed': 0, 'calls': {}, 'deferred': {}}
+        if self.filePath and os.path.exists(self.filePath):
+            with open(self.filePath, 'r') as file:
+                self.state.update(json.load(file))
+
+    def save(self):
+        self.dirty = False
+        if not self.filePath:
+            return
+        tmpPath = self.filePath + '.tmp'
+        with open(tmpPath, 'w') as file:
+            json.dump(self.state, file)
+        os.replace(tmpPath, self.filePath)
+
+    def flush(self):
+        # Write the charges made since the last save
+        with self.lock:
+            if self.dirty:
+                self.save()
+
+    def refresh(self):
+        # Load on first use and start from zero once the quota day changes
+        if self.state is None:
+            self.load()
+        today = quotaDay()
+        if self.state['day'] != today:
+            self.state.update({'day': today, 'unitsUsed': 0, 'calls': {}})
+
+    def remaining(self):
+        with self.lock:
+            self.refresh()
+            return self.dailyQuota - self.state['unitsUsed']
+
+    def charge(self, resource):
+        units = API_UNIT_COSTS.get(resource, 1)
+        with self.lock:
+            self.refresh()
+            if self.state['unitsUsed'] + units > self.dailyQuota:
+                raise QuotaExceededError(f"Daily quota of {self.dailyQuota} units reached ({self.state['unitsUsed']} used, {units} needed for {resource})")
+            self.state['unitsUsed'] += units
+            self.state['calls'][resource] = self.state['calls'].get(resource, 0) + 1
+            self.dirty = True
+
+    def getDeferred(self, crawlName):
+        with self.lock:
+            self.refresh()
+            return list(self.state['deferred'].get(crawlName, []))
+
+    def setDeferred(self, crawlName, channelIds):
+        with self.lock:
+            self.refresh()
+            if channelIds:
+                self.state['deferred'][crawlName] = list(channelIds)
+            else:
+                self.state['deferred'].pop(crawlName, None)
+            self.save()
+
+
+quotaLedger = QuotaLedger()
+
+
+def crawlGroupSize(numVideosPerChannel):
+    # Channels crawled together, enough for their videos to fill the concurrent detail batches
+    return max(1, VIDEO_BATCH_SIZE * crawlEngine.maxWorkers // max(1, numVideosPerChannel))
+
+
+def estimateCrawlUnits(channelIds, numVideosPerChannel, listingMode='search', cachedIds=frozenset()):
+    """
+    Estimate the quota units crawlChannels needs to list and fetch
+    numVideosPerChannel videos from each of channelIds.
+
+    The crawl goes in groups of crawlGroupSize() channels. Each group lists
+    its channels, fetches the details of their videos 50 IDs per call, and
+    looks up its channels that are not in cachedIds, 50 per channels().list
+    call. This is an upper bound: channels with fewer videos, or videos
+    listed twice, need fewer detail calls.
+    """
+    if listingMode == 'search':
+        listingUnits = -(-numVideosPerChannel // PAGE_SIZE) * API_UNIT_COSTS['search']
+    else:
+        listingUnits = -(-numVideosPerChannel // PAGE_SIZE) * API_UNIT_COSTS['playlistItems']
+
+    units = 0
+    for group in chunkList(list(channelIds), crawlGroupSize(numVideosPerChannel)):
+        numUncached = sum(channelId not in cachedIds for channelId in group)
+        units += len(group) * listingUnits
+        units += -(-len(group) * numVideosPerChannel // VIDEO_BATCH_SIZE) * API_UNIT_COSTS['videos']
+        units += -(-numUncached // CHANNEL_BATCH_SIZE) * API_UNIT_COSTS['channels']
+    return units
+
+
+def planCrawl(crawlName, channelIds, numVideosPerChannel, listingMode='search', ledger=None):
+    """
+    Fit a channel crawl into the quota left for today.
+
+    Channels deferred by the last crawl with the same name go first. Channels
+    that do not fit are deferred to the next run, which crawlChannels records
+    in the ledger when the crawl is saved.
+
+    Returns:
+        dict: 'channelIds' to crawl now, 'deferred' channel IDs,
+        'estimatedUnits' for the scheduled channels and 'remainingUnits'.
+    """
+    ledger = ledger or quotaLedger
+    candidates = list(dict.fromkeys(ledger.getDeferred(crawlName) + list(channelIds)))
+    remaining = ledger.remaining()
+    cachedIds = channelCache.freshIds(candidates)
+
+    # The longest prefix of the candidates that fits, the estimate only growing with more channels
+    numScheduled, tooMany = 0, len(candidates) + 1
+    while tooMany - numScheduled > 1:
+        middle = (numScheduled + tooMany) // 2
+        if estimateCrawlUnits(candidates[:middle], numVideosPerChannel, listingMode, cachedIds) <= remaining:
+            numScheduled = middle
+        else:
+            tooMany = middle
+
+    scheduled = candidates[:numScheduled]
+    deferred = candidates[numScheduled:]
+
+    estimatedUnits = estimateCrawlUnits(scheduled, numVideosPerChannel, listingMode, cachedIds)
+    print(f"Crawl plan for {crawlName}: {len(scheduled)} channels (~{estimatedUnits} units of {remaining} left), {len(deferred)} deferred")
+    return {'channelIds': scheduled, 'deferred': deferred, 'estimatedUnits': estimatedUnits, 'remainingUnits': remaining}
+
+
+def apiCall(resource, **params):
+    """
+    Send one <resource>().list(**params) request, charging its quota units to
+    the ledger and waiting on the rate limiter.
+
+    Args:
+        resource (str): 'search', 'videos', 'channels' or 'playlistItems'.
+
+    Returns:
+        dict: The decoded response.
+    """
+    quotaLedger.charge(resource)
+    rateLimiter.acquire()
+    return getattr(getYoutubeClient(), resource)().list(**params).execute()
+
+
+class CrawlEngine:
+    """
+    Bounded thread pool that runs independent API requests concurrently.
+    """
+
+    def __init__(self, maxWorkers=CRAWL_WORKERS):
+        self.maxWorkers = maxWorkers
+
+    def map(self, fn, items):
+        """
+        Apply fn to every item, at most maxWorkers at a time.
+
+        Returns:
+            list: The results, in the order of items.
+        """
+        items = list(items)
+        if self.maxWorkers <= 1 or len(items) <= 1:
+            return [fn(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.maxWorkers, len(items))) as executor:
+            return list(executor.map(fn, items))
+
+
+crawlEngine = CrawlEngine()
+
+
+PAGE_SIZE = 50  # list() calls return at most 50 items per page
+
+
+def listChannelVideoIds(channelIds, maxResults=20, listingMode='search'):
+    """
+    Get the latest video IDs of every channel, listing the channels concurrently.
+
+    Args:
+        channelIds (list): The IDs of the channels.
+        maxResults (int): Videos to list per channel.
+        listingMode (str): 'search' pages through search().list (100 units
+            per 50 videos, at most about 500). 'uploads' pages through the
+            channel's uploads playlist (1 unit per 50 videos, no depth limit).
+
+    Returns:
+        list: The video IDs, grouped by channel in the order of channelIds.
+    """
+    def searchChannel(channelId):
+        items = listPageItems(
+            'search',
+            maxResults,
+            channelId=channelId,
             part='id',
             type='video',
-            maxResults=20
-        ).execute()
-
-        videoIds = [item['id']['videoId'] for item in channelResponse['items']]
-
-        # Get video details (title, views) for the selected video IDs
-        for videoId in videoIds:
-            response = youtube.videos().list(
-                part='snippet,statistics',
-                id=videoId
-            ).execute()
-            snippet = response['items'][0]['snippet']
-            statistics = response['items'][0]['statistics']
-
-            title = snippet['title']
-            description = snippet.get('description', '')
-            channel_title = snippet['channelTitle']
-            channel_id = snippet['channelId']
-            subscriber_count = get_channel_subscriber_count(channel_id)
-            category_id = snippet['categoryId']
-            publication_date = snippet['publishedAt']
-
-            lang_match = True
-            if ('defaultAudioLanguage' in snippet and snippet['defaultAudioLanguage'] != 'en') or ('defaultLanguage' in snippet and snippet['defaultLanguage'] != 'en'):
-                lang_match = False
-
-            # Ensure the video has more than 1,000 views and exists
-            if ('viewCount' in statistics and int(statistics['viewCount']) > 1000 and lang_match):
-                videosData.append({
-                    'videoId': videoId,
-                    'title': title,
-                    'description': description,
-                    'channelTitle': channel_title,
-                    'channelId': channel_id,
-                    'subscriberCount': subscriber_count,
-                    'categoryId': category_id,
-                    'publishedAt': publication_date,
-                    'views': int(statistics['viewCount'])
-                })
+            fields=SEARCH_VIDEO_FIELDS
+        )
+        return [item['id']['videoId'] for item in items]
 
-    # Save the data to a file
-    if saveFile:
-        with open(filePath, 'w') as file:
-            json.dump(videosData, file)
+    if listingMode == 'search':
+        listChannel = searchChannel
+    elif listingMode == 'uploads':
+        uploadsPlaylistIds = getUploadsPlaylistIds(channelIds)
+
+        def listChannel(channelId):
+            playlistId = uploadsPlaylistIds.get(channelId)
+            if playlistId is None:
+                print(f"No uploads playlist found for channel {channelId}")
+                return []
+            return listPlaylistVideoIds(playlistId, maxResults)
+    else:
+        raise ValueError(f"Unknown listing mode: {listingMode}")
+
+    return [videoId for videoIds in crawlEngine.map(listChannel, channelIds) for videoId in videoIds]
+
+
+def getUploadsPlaylistIds(channelIds):
+    """
+    Resolve the uploads playlist of every channel through the channel cache.
+
+    Returns:
+        dict: channelId -> uploads playlist ID, for the channels that have one.
+    """
+    uploadsPlaylistIds = {}
+    for channelId, channel in channelCache.getChannels(channelIds).items():
+        try:
+            uploadsPlaylistIds[channelId] = channel['contentDetails']['relatedPlaylists']['uploads']
+        except (TypeError, KeyError):
+            pass
+    return uploadsPlaylistIds
+
+
+def listPlaylistVideoIds(playlistId, maxResults):
+    """
+    Page through a playlist until maxResults video IDs are collected.
+    """
+    try:
+        items = listPageItems(
+            'playlistItems',
+            maxResults,
+            part='contentDetails',
+            playlistId=playlistId,
+            fields=PLAYLIST_FIELDS
+        )
+    except QuotaExceededError:
+        raise
+    except Exception as e:
+        print(f"Error listing playlist {playlistId}: {e}")
+        return []
+
+    return [item['contentDetails']['videoId'] for item in items]
+
+
+def listPageItems(resource, maxItems, **params):
+    """
+    Follow nextPageToken through a listing until maxItems items are collected
+    or the listing ends.
+
+    Returns:
+        list: The items of every page, at most maxItems.
+    """
+    items = []
+    pageToken = None
+    while len(items) < maxItems:
+        response = apiCall(resource, maxResults=min(PAGE_SIZE, maxItems - len(items)), pageToken=pageToken, **params)
+        items.extend(response.get('items', []))
+        pageToken = response.get('nextPageToken')
+        if not pageToken:
+            break
+
+    return items[:maxItems]
+
+
+def crawlPages(writer, resource, toRecords, targetCount=None, **params):
+    """
+    Page through a search or chart listing, streaming the accepted records,
+    until targetCount records are saved or the listing ends.
+
+    The next page token is checkpointed after every page, so an interrupted
+    crawl continues from the page it stopped at. Without a targetCount only
+    the first page is read.
+
+    Args:
+        toRecords (callable): Turns the items of a page into dataset records.
+
+    Returns:
+        bool: False if the quota ran out. The checkpoint then stays, and the
+        next run resumes from the page the crawl stopped at.
+    """
+    if writer.isDone('pages'):
+        return True
+
+    pageToken = writer.getValue('pageToken')
+    try:
+        while True:
+            response = apiCall(resource, pageToken=pageToken, **params)
+            writer.write(toRecords(response.get('items', [])))
+
+            pageToken = response.get('nextPageToken')
+            if targetCount is None or writer.count() >= targetCount or not pageToken:
+                break
+            writer.setValue('pageToken', pageToken)
+            quotaLedger.flush()
+    except QuotaExceededError as e:
+        print(f"Stopping crawl of {writer.filePath}: {e}")
+        return False
+    finally:
+        quotaLedger.flush()
+
+    writer.markDone(['pages'])
+    return True
+
+
+def searchRecords(items):
+    # Get video details (title, views) for the video IDs of a search page
+    return fetchVideoRecords([item['id']['videoId'] for item in items])
+
+
+def chartRecords(items):
+    # Chart pages already hold the details, so only the filters are applied
+    records = [buildVideoRecord(video) for video in items]
+    return [record for record in records if record is not None]
+
+
+VIDEO_BATCH_SIZE = 50  # videos().list accepts at most 50 comma-separated IDs
+
+
+def chunkList(items, size):
+    """
+    Split a list into consecutive chunks of at most `size` items.
+    """
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def fetchVideoDetails(videoIds):
+    """
+    Get the snippet and statistics of many videos, 50 IDs per videos().list call.
+
+    Args:
+        videoIds (list): The IDs of the videos, duplicates allowed.
+
+    Returns:
+        list: The video resources in the order of videoIds. Videos the API no
+        longer returns (deleted or private) are skipped.
+    """
+    def fetchBatch(batch):
+        return apiCall(
+            'videos',
+            part='snippet,statistics',
+            id=','.join(batch),
+            fields=VIDEO_FIELDS
+        )
+
+    uniqueIds = list(dict.fromkeys(videoIds))
+    videosById = {}
+    for response in crawlEngine.map(fetchBatch, chunkList(uniqueIds, VIDEO_BATCH_SIZE)):
+        for video in response.get('items', []):
+            videosById[video['id']] = video
+
+    return [videosById[videoId] for videoId in videoIds if videoId in videosById]
+
+
+def isEnglishVideo(snippet):
+    # Videos without language metadata are kept, as they always have been
+    if 'defaultAudioLanguage' in snippet and snippet['defaultAudioLanguage'] != 'en':
+        return False
+    if 'defaultLanguage' in snippet and snippet['defaultLanguage'] != 'en':
+        return False
+    return True
+
+
+def buildVideoRecord(video):
+    """
+    Turn a videos().list resource into a dataset record.
+
+    Returns:
+        dict: The record, or None if the video is not in english or does not
+        have more than 1,000 views.
+    """
+    snippet = video['snippet']
+    statistics = video['statistics']
+
+    if not (isEnglishVideo(snippet) and 'viewCount' in statistics and int(statistics['viewCount']) > 1000):
+        return None
+
+    return {
+        'videoId': video['id'],
+        'title': snippet['title'],
+        'description': snippet.get('description', ''),
+        'channelTitle': snippet['channelTitle'],
+        'channelId': snippet['channelId'],
+        'subscriberCount': get_channel_subscriber_count(snippet['channelId']),
+        'categoryId': snippet['categoryId'],
+        'publishedAt': snippet['publishedAt'],
+        'views': int(statistics['viewCount'])
+    }
+
+
+def fetchVideoRecords(videoIds):
+    """
+    Fetch the details of videoIds in batches and keep the english videos with
+    more than 1,000 views.
+
+    Returns:
+        list: Dataset records, in the order of videoIds.
+    """
+    videos = fetchVideoDetails(videoIds)
+
+    # Look up every channel of the batch at once instead of once per video
+    channelCache.getChannels([video['snippet']['channelId'] for video in videos])
+
+    videosData = []
+    for video in videos:
+        record = buildVideoRecord(video)
+        if record is not None:
+            videosData.append(record)
+    return videosData
+
+
+def streamPathFor(filePath):
+    return os.path.splitext(filePath)[0] + '.partial.jsonl'
+
+
+def checkpointPathFor(filePath):
+    return os.path.splitext(filePath)[0] + '.checkpoint.json'
+
+
+def isCrawlComplete(filePath):
+    # A checkpoint next to the file means the crawl that writes it has not finished
+    return os.path.exists(filePath) and not os.path.exists(checkpointPathFor(filePath))
+
+
+def loadVideoRecords(filePath):
+    """
+    Load a dataset file, either a JSON array or JSON lines (.jsonl).
+    """
+    with open(filePath, 'r') as file:
+        if filePath.endswith('.jsonl'):
+            return [json.loads(line) for line in file if line.strip()]
+        return json.load(file)
+
+
+DATASET_CHUNK_SIZE = 10000  # Records per DataFrame chunk
+JSON_BLOCK_SIZE = 1 << 20  # Characters read from a JSON array file at a time
+WHITESPACE_PATTERN = re.compile(r'[ \t\r\n]*')
+
+
+def iterJsonArray(file, blockSize=JSON_BLOCK_SIZE):
+    """
+    Yield the elements of a JSON array file one at a time, reading it in
+    blocks instead of parsing the whole file at once.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    while not buffer:
+        block = file.read(blockSize)
+        if not block:
+            break
+        buffer = block.lstrip()
+    if not buffer.startswith('['):
+        raise ValueError(f"{getattr(file, 'name', 'file')} does not hold a JSON array")
+    position = 1
+
+    while True:
+        # Skip the whitespace and commas between elements
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if position < len(buffer):
+                break
+            block = file.read(blockSize)
+            if not block:
+                raise ValueError(f"{getattr(file, 'name', 'file')} ends inside its JSON array")
+            buffer, position = block, 0
+
+        if buffer[position] == ']':
+            return
+
+        # Read more of the file until the next element is complete. A number cut
+        # by the end of the buffer parses as its prefix (12|34, 1.5|e3), so a
+        # scalar is only complete once the ',' or ']' after it has been read
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+                if isinstance(value, (dict, list, str)):
+                    break
+                delimiter = WHITESPACE_PATTERN.match(buffer, end).end()
+                if delimiter < len(buffer) and buffer[delimiter] in ',]':
+                    break
+                error = ValueError(f"{getattr(file, 'name', 'file')} has an unterminated value in its JSON array")
+            except json.JSONDecodeError as e:
+                error = e
+            block = file.read(blockSize)
+            if not block:
+                raise error
+            buffer, position = buffer[position:] + block, 0
+
+        yield value
+        position = end
+
+
+def iterDatasetRecords(filePath):
+    """
+    Yield the records of a dataset file one at a time, either a JSON array or
+    JSON lines (.jsonl).
+    """
+    with open(filePath, 'r') as file:
+        if filePath.endswith('.jsonl'):
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from iterJsonArray(file)
+
+
+def iterDatasetChunks(filePath, chunksize=DATASET_CHUNK_SIZE, columns=None):
+    """
+    Read a dataset file as DataFrames of at most chunksize rows, so only one
+    chunk of records is held as Python dicts at a time.
+
+    Args:
+        columns (list): Keep only these columns.
+    """
+    records = []
+    for record in iterDatasetRecords(filePath):
+        records.append(record)
+        if len(records) == chunksize:
+            yield pd.DataFrame(records, columns=columns)
+            records = []
+    if records:
+        yield pd.DataFrame(records, columns=columns)
+
+
+def readDataset(filePath, columns=None, chunksize=DATASET_CHUNK_SIZE):
+    """
+    Load a dataset file into one DataFrame chunk by chunk, the low-memory
+    equivalent of pd.DataFrame(loadVideoRecords(filePath)).
+    """
+    chunks = list(iterDatasetChunks(filePath, chunksize, columns))
+    if not chunks:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def preprocessChunks(chunks, textColumns=('title',)):
+    """
+    Add a processed_<column> column (see preprocessText) to every chunk of an
+    iterDatasetChunks() or VideoCatalog.query(chunksize=...) iterator.
+    """
+    for chunk in chunks:
+        for column in textColumns:
+            chunk['processed_' + column] = preprocessTexts(chunk[column])
+        yield chunk
+
+
+# Collector files first; combined files, made from the others, rank last
+DATASET_FILES = ['allVideos', 'popularChannelsVideos', 'channelsVideos', 'randomChannelsVideos', 'categoryVideos', 'combinedVideos']
+COMBINED_DATASET_PATH = 'combinedVideos3.json'  # Where combineDatasets() saves
+
+
+def findDatasetFiles(baseNames=DATASET_FILES, directory='.'):
+    """
+    Find the numbered collector files (<baseName><number>.json or .jsonl),
+    grouped in baseNames order and sorted by number within a group.
+    """
+    filePaths = []
+    for baseName in baseNames:
+        pattern = re.compile(re.escape(baseName) + r'(\d+)\.jsonl?$')
+        matches = []
+        for filePath in glob.glob(os.path.join(directory, baseName + '*.json*')):
+            match = pattern.match(os.path.basename(filePath))
+            if match and isCrawlComplete(filePath):
+                matches.append((int(match.group(1)), filePath))
+        filePaths.extend(filePath for _, filePath in sorted(matches))
+    return filePaths
+
+
+VIDEO_STORE_PATH = 'videoStore'
+VIDEO_STORE_MAX_PARTS = 16  # Upserts past this many part files trigger a compaction
+VIDEO_COLUMNS = {
+    'videoId': 'string',
+    'title': 'string',
+    'description': 'string',
+    'channelTitle': 'string',
+    'channelId': 'string',
+    'subscriberCount': 'int64',
+    'categoryId': 'string',
+    'publishedAt': 'string',
+    'views': 'int64',
+}
+MODEL_COLUMNS = ['title', 'description', 'channelTitle', 'channelId', 'subscriberCount', 'categoryId', 'publishedAt', 'views']  # What the models read
+
+
+def toVideoFrame(records):
+    """
+    Turn dataset records (a list or DataFrame) into a DataFrame with exactly
+    the VIDEO_COLUMNS columns and types.
+    """
+    frame = records if isinstance(records, pd.DataFrame) else pd.DataFrame(records)
+    frame = frame.reindex(columns=list(VIDEO_COLUMNS))
+    frame['description'] = frame['description'].fillna('')
+    frame['subscriberCount'] = frame['subscriberCount'].fillna(0)
+    return frame.astype(VIDEO_COLUMNS)
+
+
+class VideoStore:
+    """
+    Columnar store of every collected video, keyed on videoId.
+
+    Each upsert writes a Parquet part file to dirPath. Reads load only the
+    requested columns of every part and keep the latest row per videoId, and
+    compact() rewrites the parts as one file sorted by videoId. Parquet needs
+    pyarrow, which is optional: without it the collectors skip the store.
+    """
+
+    def __init__(self, dirPath=VIDEO_STORE_PATH, maxParts=VIDEO_STORE_MAX_PARTS):
+        self.dirPath = dirPath
+        self.maxParts = maxParts
+        self.lock = threading.Lock()
+
+    @property
+    def importedPath(self):
+        # Size and modification time of every imported file, by absolute path
+        return os.path.join(self.dirPath, 'imported.json')
+
+    @staticmethod
+    def isAvailable():
+        return importlib.util.find_spec('pyarrow') is not None
+
+    def partPaths(self):
+        # Part names start with a nanosecond timestamp, so name order is write order
+        return sorted(glob.glob(os.path.join(self.dirPath, 'part-*.parquet')))
+
+    def writePart(self, frame):
+        os.makedirs(self.dirPath, exist_ok=True)
+        partPath = os.path.join(self.dirPath, f'part-{time.time_ns():020d}.parquet')
+        tmpPath = partPath + '.tmp'
+        frame.to_parquet(tmpPath, engine='pyarrow', index=False)
+        os.replace(tmpPath, partPath)
+        return partPath
+
+    def upsert(self, records):
+        """
+        Insert records, or replace the stored rows with the same videoId.
+
+        Args:
+            records (list or pandas.DataFrame): Dataset records.
+        """
+        frame = toVideoFrame(records).drop_duplicates('videoId', keep='last')
+        if frame.empty:
+            return
+        with self.lock:
+            self.writePart(frame)
+            if len(self.partPaths()) > self.maxParts:
+                self.compactLocked()
+
+    def read(self, columns=None):
+        """
+        Load the stored videos.
+
+        Args:
+            columns (list): The columns to load, all of them by default.
+                videoId is always loaded.
+
+        Returns:
+            pandas.DataFrame: One row per videoId, the latest upserted.
+        """
+        columns = list(VIDEO_COLUMNS) if columns is None else ['videoId'] + [column for column in columns if column != 'videoId']
+        partPaths = self.partPaths()
+        if not partPaths:
+            return pd.DataFrame({column: pd.Series(dtype=VIDEO_COLUMNS[column]) for column in columns})
+
+        frame = pd.concat([pd.read_parquet(partPath, engine='pyarrow', columns=columns) for partPath in partPaths], ignore_index=True)
+        return frame.drop_duplicates('videoId', keep='last').reset_index(drop=True)
+
+    def videoIds(self):
+        return self.read(columns=['videoId'])['videoId'].tolist()
+
+    def compact(self):
+        with self.lock:
+            self.compactLocked()
+
+    def compactLocked(self):
+        # The merged part is in place before the parts it replaces are removed
+        partPaths = self.partPaths()
+        if len(partPaths) <= 1:
+            return
+        merged = self.read().sort_values('videoId', ignore_index=True)
+        self.writePart(merged)
+        for partPath in partPaths:
+            os.remove(partPath)
+
+    def loadImported(self):
+        if not os.path.exists(self.importedPath):
+            return {}
+        with open(self.importedPath, 'r') as file:
+            return json.load(file)
+
+    @staticmethod
+    def fileStamp(filePath):
+        stat = os.stat(filePath)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def markImported(self, filePaths):
+        # Files whose videos are in the store, so importDatasets() skips them until they change
+        with self.lock:
+            imported = self.loadImported()
+            imported.update({os.path.abspath(filePath): self.fileStamp(filePath) for filePath in filePaths})
+            os.makedirs(self.dirPath, exist_ok=True)
+            tmpPath = self.importedPath + '.tmp'
+            with open(tmpPath, 'w') as file:
+                json.dump(imported, file)
+            os.replace(tmpPath, self.importedPath)
+
+    def importDatasets(self, filePaths=None):
+        """
+        Upsert the collector files (findDatasetFiles() by default) that are
+        new or changed since they were last imported. Later files win for
+        videos that appear more than once.
+
+        Returns:
+            list: The files imported.
+        """
+        filePaths = findDatasetFiles() if filePaths is None else filePaths
+        imported = self.loadImported()
+        changed = [filePath for filePath in filePaths if imported.get(os.path.abspath(filePath)) != self.fileStamp(filePath)]
+        frames = [toVideoFrame(loadVideoRecords(filePath)) for filePath in changed]
+        if frames:
+            self.upsert(pd.concat(frames, ignore_index=True))
+            self.compact()
+            self.markImported(changed)
+        return changed
+
+
+# Finished crawls are upserted into videoStore, and combineDatasets() reads from it. Set it to None to turn that off.
+videoStore = VideoStore()
+
+
+VIDEO_CATALOG_PATH = 'videoCatalog.db'
+CATALOG_INDEXES = ['channelId', 'categoryId', 'publishedAt']  # videoId is the primary key
+CATALOG_TYPES = {'string': 'TEXT', 'int64': 'INTEGER'}
+
+
+class VideoCatalog:
+    """
+    SQLite catalog of every collected video, indexed on videoId, channelId,
+    categoryId and publishedAt, so training data can be selected by channel,
+    category or date window without loading the whole corpus.
+
+    The catalog is an index over videoStore: query() and count() first
+    upsert the store's part files that are new since the last sync. Without
+    pyarrow there is no store, and finished crawls and combineDatasets()
+    upsert their records into the catalog directly.
+    """
+
+    def __init__(self, dbPath=VIDEO_CATALOG_PATH):
+        self.dbPath = dbPath
+        self.initialized = False
+        self.lock = threading.Lock()
+
+    def connect(self):
+        # One connection per operation, so the catalog can be used from any crawl thread
+        connection = sqlite3.connect(self.dbPath, timeout=30)
+        connection.execute('PRAGMA synchronous=NORMAL')  # Safe with WAL, and much faster for bulk upserts
+        if not self.initialized:
+            with self.lock:
+                connection.execute('PRAGMA journal_mode=WAL')
+                columns = ', '.join(f'{name} {CATALOG_TYPES[dtype]}' for name, dtype in VIDEO_COLUMNS.items() if name != 'videoId')
+                connection.execute(f'CREATE TABLE IF NOT EXISTS videos (videoId TEXT PRIMARY KEY, {columns}, updatedAt INTEGER)')
+                for column in CATALOG_INDEXES:
+                    connection.execute(f'CREATE INDEX IF NOT EXISTS idx_videos_{column} ON videos ({column})')
+                connection.execute('CREATE TABLE IF NOT EXISTS syncedParts (name TEXT PRIMARY KEY)')
+                connection.commit()
+                self.initialized = True
+        return connection
+
+    def upsert(self, records):
+        """
+        Insert records, or replace the stored rows with the same videoId.
+
+        Args:
+            records (list or pandas.DataFrame): Dataset records.
+        """
+        frame = toVideoFrame(records)
+        if frame.empty:
+            return
+        columns = list(VIDEO_COLUMNS)
+        # Column lists hold plain Python values, which sqlite3 binds directly; missing ones are NULL
+        frame = frame.astype(object).where(frame.notna(), None)
+        rows = zip(*(frame[column].tolist() for column in columns), itertools.repeat(int(time.time())))
+
+        assignments = ', '.join(f'{column} = excluded.{column}' for column in columns[1:] + ['updatedAt'])
+        sql = (f"INSERT INTO videos ({', '.join(columns)}, updatedAt) VALUES ({', '.join('?' * (len(columns) + 1))}) "
+               f"ON CONFLICT(videoId) DO UPDATE SET {assignments}")
+        with contextlib.closing(self.connect()) as connection:
+            with connection:
+                connection.executemany(sql, rows)
+
+    def sync(self):
+        """
+        Upsert the videoStore part files written since the last sync. Parts
+        are never modified, so a compaction's merged part is the only full
+        re-read.
+        """
+        if videoStore is None or not videoStore.isAvailable():
+            return
+        partPaths = videoStore.partPaths()
+        with contextlib.closing(self.connect()) as connection:
+            synced = {name for name, in connection.execute('SELECT name FROM syncedParts')}
+        newPaths = [partPath for partPath in partPaths if os.path.basename(partPath) not in synced]
+        if not newPaths and len(synced) == len(partPaths):
+            return
+
+        for partPath in newPaths:
+            self.upsert(pd.read_parquet(partPath, engine='pyarrow'))
+        with contextlib.closing(self.connect()) as connection:
+            with connection:
+                connection.execute('DELETE FROM syncedParts')
+                connection.executemany('INSERT INTO syncedParts (name) VALUES (?)', [(os.path.basename(partPath),) for partPath in partPaths])
+
+    def buildWhere(self, channelId, categoryId, publishedAfter, publishedBefore):
+        conditions = []
+        params = []
+        for column, value in (('channelId', channelId), ('categoryId', categoryId)):
+            if value is None:
+                continue
+            values = [value] if isinstance(value, str) else list(value)
+            conditions.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+        # publishedAt is an ISO 8601 string, so string order is time order
+        if publishedAfter is not None:
+            conditions.append('publishedAt >= ?')
+            params.append(publishedAfter if isinstance(publishedAfter, str) else publishedAfter.isoformat())
+        if publishedBefore is not None:
+            conditions.append('publishedAt < ?')
+            params.append(publishedBefore if isinstance(publishedBefore, str) else publishedBefore.isoformat())
+
+        return (' WHERE ' + ' AND '.join(conditions) if conditions else ''), params
+
+    def query(self, columns=None, channelId=None, categoryId=None, publishedAfter=None, publishedBefore=None, limit=None, chunksize=None):
+        """
+        Select videos from the catalog.
+
+        Args:
+            columns (list): The columns to return, all of them by default.
+            channelId (str or list): Only these channels.
+            categoryId (str or list): Only these categories.
+            publishedAfter (str or datetime): Only videos published at or after this time.
+            publishedBefore (str or datetime): Only videos published before this time.
+            limit (int): At most this many rows.
+            chunksize (int): Return an iterator of DataFrames of this many rows
+                instead of one DataFrame.
+
+        Returns:
+            pandas.DataFrame, or an iterator of DataFrames with chunksize.
+        """
+        columns = list(VIDEO_COLUMNS) if columns is None else list(columns)
+        unknown = set(columns) - set(VIDEO_COLUMNS) - {'updatedAt'}
+        if unknown:
+            raise ValueError(f"Unknown catalog columns: {sorted(unknown)}")
+
+        self.sync()
+        where, params = self.buildWhere(channelId, categoryId, publishedAfter, publishedBefore)
+        sql = f"SELECT {', '.join(columns)} FROM videos" + where
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(int(limit))
+        if chunksize is not None:
+            return self.iterChunks(sql, params, chunksize)
+        with contextlib.closing(self.connect()) as connection:
+            return pd.read_sql_query(sql, connection, params=params)
+
+    def iterChunks(self, sql, params, chunksize):
+        # The connection stays open until the last chunk is read
+        with contextlib.closing(self.connect()) as connection:
+            yield from pd.read_sql_query(sql, connection, params=params, chunksize=chunksize)
+
+    def count(self, channelId=None, categoryId=None, publishedAfter=None, publishedBefore=None):
+        self.sync()
+        where, params = self.buildWhere(channelId, categoryId, publishedAfter, publishedBefore)
+        with contextlib.closing(self.connect()) as connection:
+            return connection.execute('SELECT COUNT(*) FROM videos' + where, params).fetchone()[0]
+
+    def importDatasets(self, filePaths=None):
+        """
+        Add existing collector files, findDatasetFiles() by default, through
+        videoStore when there is one.
+        """
+        if videoStore is not None and videoStore.isAvailable():
+            videoStore.importDatasets(filePaths)
+            self.sync()
+            return
+        for filePath in findDatasetFiles() if filePaths is None else filePaths:
+            self.upsert(loadVideoRecords(filePath))
+
+
+# Indexes videoStore, and selects the training videos of main()'s --category, --channel and --published-* filters
+videoCatalog = VideoCatalog()
+
+
+class CrawlWriter:
+    """
+    Streams a collector's records to disk and checkpoints its progress.
+
+    Accepted records are appended to <name>.partial.jsonl as they arrive, and
+    the finished crawl steps (channels, pages) and the crawl's inputs are kept
+    in <name>.checkpoint.json. An interrupted crawl resumes from the checkpoint
+    the next time the collector runs. When the crawl finishes, the records are
+    written to filePath (a JSON array, or JSON lines for a .jsonl path).
+
+    With saveFile=False the records are only kept in memory.
+    """
+
+    def __init__(self, filePath, saveFile=True):
+        self.filePath = filePath
+        self.saveFile = saveFile
+        self.records = []
+        self.seenVideoIds = set()
+        self.checkpoint = {'done': [], 'values': {}}
+        self.done = set()
+        self.stream = None
+
+        if saveFile:
+            self.streamPath = streamPathFor(filePath)
+            self.checkpointPath = checkpointPathFor(filePath)
+            if os.path.exists(self.checkpointPath):
+                with open(self.checkpointPath, 'r') as file:
+                    self.checkpoint = json.load(file)
+                self.done = set(self.checkpoint['done'])
+                self.recoverStream()
+                print(f"Resuming crawl of {filePath}: {len(self.done)} steps done, {len(self.seenVideoIds)} videos saved")
+                self.stream = open(self.streamPath, 'a')
+            else:
+                self.stream = open(self.streamPath, 'w')
+                self.saveCheckpoint()
+
+    def recoverStream(self):
+        # Collect the IDs already on disk and cut off a line left half written by a crash
+        if not os.path.exists(self.streamPath):
+            return
+        goodLength = 0
+        with open(self.streamPath, 'rb') as file:
+            for line in file:
+                try:
+                    self.seenVideoIds.add(json.loads(line)['videoId'])
+                except ValueError:
+                    break
+                goodLength += len(line)
+        with open(self.streamPath, 'r+b') as file:
+            file.truncate(goodLength)
+
+    def saveCheckpoint(self):
+        # Records must be on disk before the checkpoint says their step is done
+        if self.stream is not None:
+            os.fsync(self.stream.fileno())
+        self.checkpoint['done'] = list(self.done)
+        tmpPath = self.checkpointPath + '.tmp'
+        with open(tmpPath, 'w') as file:
+            json.dump(self.checkpoint, file)
+        os.replace(tmpPath, self.checkpointPath)
+
+    def isDone(self, key):
+        return key in self.done
+
+    def count(self):
+        return len(self.seenVideoIds)
+
+    def getValue(self, name):
+        return self.checkpoint['values'].get(name)
+
+    def setValue(self, name, value):
+        self.checkpoint['values'][name] = value
+        if self.saveFile:
+            self.saveCheckpoint()
+
+    def write(self, records):
+        # Videos already saved by this crawl (or before an interruption) are skipped
+        for record in records:
+            if record['videoId'] in self.seenVideoIds:
+                continue
+            self.seenVideoIds.add(record['videoId'])
+            if self.stream is not None:
+                self.stream.write(json.dumps(record) + '\n')
+            else:
+                self.records.append(record)
+        if self.stream is not None:
+            self.stream.flush()
+
+    def markDone(self, keys):
+        self.done.update(keys)
+        if self.saveFile:
+            self.saveCheckpoint()
+
+    def finish(self, complete=True):
+        """
+        Close the crawl.
+
+        Args:
+            complete (bool): False leaves the checkpoint in place so that the
+                next run resumes the crawl.
+
+        Returns:
+            list: Every record of the crawl so far.
+        """
+        if not self.saveFile:
+            return self.records
+
+        self.stream.close()
+        if not complete:
+            print(f"Crawl of {self.filePath} is not finished, run it again to resume")
+            return loadVideoRecords(self.streamPath)
+
+        tmpPath = self.filePath + '.tmp'
+        if self.filePath.endswith('.jsonl'):
+            os.replace(self.streamPath, tmpPath)
+        else:
+            # Stream the lines into a JSON array, the format the collectors have always written
+            with open(self.streamPath, 'r') as stream, open(tmpPath, 'w') as file:
+                file.write('[')
+                for i, line in enumerate(stream):
+                    if i > 0:
+                        file.write(', ')
+                    file.write(line.rstrip('\n'))
+                file.write(']')
+        os.replace(tmpPath, self.filePath)
+        os.remove(self.checkpointPath)
+        if os.path.exists(self.streamPath):
+            os.remove(self.streamPath)
+
+        records = loadVideoRecords(self.filePath)
+        if videoStore is not None and videoStore.isAvailable():
+            videoStore.upsert(records)
+            videoStore.markImported([self.filePath])
+        elif videoCatalog is not None:
+            # No store for the catalog to sync from
+            videoCatalog.upsert(records)
+        return records
+
+
+def crawlChannels(writer, channelIds, maxResults, listingMode='search', targetCount=None):
+    """
+    Crawl the videos of every channel that the writer has not finished yet.
+
+    Channels are crawled in groups that fill the concurrent detail batches,
+    and each group is checkpointed once its records are on disk. The crawl
+    ends early once targetCount records are saved. If the quota runs out, the
+    crawl stops and the next run resumes it. Channels the quota could not fit
+    are deferred (see planCrawl) when the writer saves the crawl.
+
+    Returns:
+        list: The records of the crawl.
+    """
+    pendingIds = [channelId for channelId in dict.fromkeys(channelIds) if not writer.isDone(channelId)]
+
+    # Keep the crawl within today's remaining quota
+    plan = planCrawl(writer.filePath, pendingIds, maxResults, listingMode)
+    deferred = plan['deferred']
+
+    try:
+        for group in chunkList(plan['channelIds'], crawlGroupSize(maxResults)):
+            videoIds = listChannelVideoIds(group, maxResults=maxResults, listingMode=listingMode)
+            # Get video details (title, views) for the selected video IDs, 50 per request
+            writer.write(fetchVideoRecords(videoIds))
+            writer.markDone(group)
+            quotaLedger.flush()
+            if targetCount is not None and writer.count() >= targetCount:
+                # The crawl is finished, so nothing is left for the next run
+                deferred = []
+                return writer.finish()
+    except QuotaExceededError as e:
+        print(f"Stopping crawl of {writer.filePath}: {e}")
+        return writer.finish(complete=False)
+    finally:
+        if writer.saveFile:
+            quotaLedger.setDeferred(writer.filePath, deferred)
+        quotaLedger.flush()
+
+    return writer.finish(complete=not deferred)
+
+
+VIEW_HISTORY_PATH = 'viewHistory.csv'
+VIEW_HISTORY_COLUMNS = ['videoId', 'polledAt', 'views']
+
+
+def loadKnownVideoIds(filePaths):
+    """
+    Collect the unique video IDs of existing dataset files (collector output
+    or combineDatasets() output, .json or .jsonl).
+    """
+    videoIds = []
+    for filePath in filePaths:
+        if os.path.exists(filePath):
+            videoIds.extend(video['videoId'] for video in loadVideoRecords(filePath))
+    return list(dict.fromkeys(videoIds))
+
+
+def refreshViewCounts(videos, historyPath=VIEW_HISTORY_PATH):
+    """
+    Re-poll only the view counts of known videos and append them to a time
+    series, instead of crawling again.
+
+    Each videos().list call asks for statistics only, for 50 videos at 1 quota
+    unit, so refreshing 100,000 videos costs about 2,000 units. Snapshots are
+    appended to historyPath as videoId,polledAt,views rows, with polledAt in
+    Unix seconds and one polledAt for the whole refresh.
+
+    Args:
+        videos (list): Video IDs, or dataset records with a 'videoId'.
+        historyPath (str): The CSV file the snapshots are appended to.
+
+    Returns:
+        int: The number of snapshots written. Deleted and private videos are
+        skipped, and a refresh that runs out of quota keeps what it wrote.
+    """
+    videoIds = list(dict.fromkeys(video['videoId'] if isinstance(video, dict) else video for video in videos))
+    batches = chunkList(videoIds, VIDEO_BATCH_SIZE)
+    print(f"Refreshing {len(videoIds)} videos: {len(batches) * API_UNIT_COSTS['videos']} units of {quotaLedger.remaining()} left")
+
+    def fetchBatch(batch):
+        return apiCall(
+            'videos',
+            part='statistics',
+            id=','.join(batch),
+            fields=STATISTICS_FIELDS
+        )
+
+    polledAt = int(time.time())
+    numWritten = 0
+    writeHeader = not os.path.exists(historyPath) or os.path.getsize(historyPath) == 0
+    with open(historyPath, 'a', newline='') as file:
+        writer = csv.writer(file)
+        if writeHeader:
+            writer.writerow(VIEW_HISTORY_COLUMNS)
+
+        # Write every group of concurrent batches as soon as it arrives
+        groupSize = max(1, crawlEngine.maxWorkers) * 4
+        try:
+            for start in range(0, len(batches), groupSize):
+                for response in crawlEngine.map(fetchBatch, batches[start:start + groupSize]):
+                    for video in response.get('items', []):
+                        if 'viewCount' in video.get('statistics', {}):
+                            writer.writerow([video['id'], polledAt, video['statistics']['viewCount']])
+                            numWritten += 1
+                file.flush()
+                quotaLedger.flush()
+        except QuotaExceededError as e:
+            print(f"Stopping refresh of {historyPath}: {e}")
+        finally:
+            quotaLedger.flush()
+
+    print(f"Wrote {numWritten} view snapshots to {historyPath}")
+    return numWritten
+
+
+def loadViewHistory(historyPath=VIEW_HISTORY_PATH):
+    """
+    Load the view snapshots written by refreshViewCounts().
+
+    Returns:
+        pandas.DataFrame: videoId, polledAt (UTC timestamp) and views columns,
+        sorted by video and time.
+    """
+    history = pd.read_csv(historyPath, dtype={'videoId': str, 'polledAt': np.int64, 'views': np.int64})
+    history['polledAt'] = pd.to_datetime(history['polledAt'], unit='s', utc=True)
+    return history.sort_values(['videoId', 'polledAt'], ignore_index=True)
+
+
+def parseFieldMask(fields):
+    """
+    Parse a partial response mask, e.g. 'items(id,snippet/title)', into a
+    nested dict: {'items': {'id': {}, 'snippet': {'title': {}}}}.
+    """
+    tokens = re.findall(r'[^,/()]+|[,/()]', fields.replace(' ', ''))
+    position = 0
+
+    def parseList():
+        nonlocal position
+        tree = {}
+        while position < len(tokens) and tokens[position] != ')':
+            if tokens[position] == ',':
+                position += 1
+                continue
+            # A path like a/b/c, optionally followed by a (sub,selection)
+            node = tree
+            while True:
+                node = node.setdefault(tokens[position], {})
+                position += 1
+                if position < len(tokens) and tokens[position] == '/':
+                    position += 1
+                    continue
+                break
+            if position < len(tokens) and tokens[position] == '(':
+                position += 1
+                for name, subtree in parseList().items():
+                    node.setdefault(name, {}).update(subtree)
+                position += 1  # Skip ')'
+        return tree
+
+    return parseList()
+
+
+def applyFieldMask(value, mask):
+    """
+    Keep only the fields of a parsed mask in a response, the way the API does
+    when `fields=` is sent.
+    """
+    if not mask:
+        return value
+    if isinstance(value, list):
+        return [applyFieldMask(item, mask) for item in value]
+    if isinstance(value, dict):
+        return {name: applyFieldMask(value[name], subtree) for name, subtree in mask.items() if name in value}
+    return value
+
+
+FIXTURE_FIELDS = {
+    'videos': VIDEO_FIELDS,
+    'channels': CHANNEL_FIELDS,
+    'search': SEARCH_VIDEO_FIELDS,
+    'playlistItems': PLAYLIST_FIELDS,
+}
+
+
+def recordFixtures(fixtureDir, videoIds=(), channelIds=()):
+    """
+    Save full (unmasked) videos().list and channels().list responses to
+    fixtureDir, for benchmarkPayloadSizes to compare against.
+    tests/fixtures/apiResponses has a small set of them.
+    """
+    os.makedirs(fixtureDir, exist_ok=True)
+    client = getYoutubeClient()
+    for i, batch in enumerate(chunkList(list(videoIds), VIDEO_BATCH_SIZE)):
+        response = client.videos().list(part='snippet,statistics', id=','.join(batch)).execute()
+        with open(os.path.join(fixtureDir, f'videos-{i}.json'), 'w') as file:
+            json.dump(response, file)
+    for i, batch in enumerate(chunkList(list(channelIds), CHANNEL_BATCH_SIZE)):
+        response = client.channels().list(part=CHANNEL_PARTS, id=','.join(batch)).execute()
+        with open(os.path.join(fixtureDir, f'channels-{i}.json'), 'w') as file:
+            json.dump(response, file)
+
+
+def benchmarkPayloadSizes(fixtureDir, repeats=20):
+    """
+    Compare recorded full responses with the same responses under the
+    collectors' field masks: JSON bytes, gzip bytes on the wire and decode time.
+
+    Fixture files are named <resource>-<anything>.json (see recordFixtures).
+
+    Returns:
+        pandas.DataFrame: One row per resource.
+    """
+    rows = []
+    for resource, fields in FIXTURE_FIELDS.items():
+        fileNames = sorted(name for name in os.listdir(fixtureDir) if name.startswith(resource + '-') and name.endswith('.json'))
+        if not fileNames:
+            continue
+
+        mask = parseFieldMask(fields)
+        full = {'bytes': 0, 'gzipBytes': 0, 'decodeSeconds': 0.0}
+        masked = {'bytes': 0, 'gzipBytes': 0, 'decodeSeconds': 0.0}
+        for fileName in fileNames:
+            with open(os.path.join(fixtureDir, fileName), 'r') as file:
+                response = json.load(file)
+            for totals, payload in ((full, response), (masked, applyFieldMask(response, mask))):
+                encoded = json.dumps(payload).encode('utf-8')
+                totals['bytes'] += len(encoded)
+                totals['gzipBytes'] += len(gzip.compress(encoded))
+                totals['decodeSeconds'] += timeit.timeit(lambda: json.loads(encoded), number=repeats) / repeats
+
+        rows.append({
+            'resource': resource,
+            'responses': len(fileNames),
+            'fullBytes': full['bytes'],
+            'maskedBytes': masked['bytes'],
+            'fullGzipBytes': full['gzipBytes'],
+            'maskedGzipBytes': masked['gzipBytes'],
+            'wireReduction': 1 - masked['gzipBytes'] / full['gzipBytes'],
+            'fullDecodeMs': full['decodeSeconds'] * 1000,
+            'maskedDecodeMs': masked['decodeSeconds'] * 1000,
+        })
+
+    report = pd.DataFrame(rows)
+    print(report.to_string(index=False))
+    return report
+
+
+CHANNEL_BATCH_SIZE = 50  # channels().list accepts at most 50 comma-separated IDs
+CHANNEL_CACHE_PATH = 'channelStatsCache.json'
+CHANNEL_CACHE_TTL = 7 * 24 * 60 * 60  # Seconds before a cached channel is fetched again
+CHANNEL_PARTS = 'statistics,contentDetails'  # contentDetails holds the uploads playlist, at no extra cost
+
+
+class ChannelStatsCache:
+    """
+    In-memory and on-disk cache of channels().list results.
+
+    Entries expire after `ttl` seconds. Misses are fetched together, 50 channel
+    IDs per call, and the file is rewritten after every fetch so that the next
+    crawl starts warm.
+    """
+
+    def __init__(self, filePath=CHANNEL_CACHE_PATH, ttl=CHANNEL_CACHE_TTL):
+        self.filePath = filePath
+        self.ttl = ttl
+        self.entries = None
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def load(self):
+        self.entries = {}
+        if self.filePath and os.path.exists(self.filePath):
+            with open(self.filePath, 'r') as file:
+                self.entries = json.load(file)
+
+    def save(self):
+        if not self.filePath:
+            return
+        tmpPath = self.filePath + '.tmp'
+        with open(tmpPath, 'w') as file:
+            json.dump(self.entries, file)
+        os.replace(tmpPath, self.filePath)
+
+    def isFresh(self, channelId, now):
+        entry = self.entries.get(channelId)
+        return entry is not None and entry.get('parts') == CHANNEL_PARTS and now - entry['fetchedAt'] < self.ttl
+
+    def freshIds(self, channelIds):
+        # The channels getChannels() would answer without a call
+        with self.lock:
+            if self.entries is None:
+                self.load()
+            now = time.time()
+            return {channelId for channelId in channelIds if self.isFresh(channelId, now)}
+
+    def getChannels(self, channelIds):
+        """
+        Get the channels().list resources of channelIds, fetching expired and
+        missing entries in batches.
+
+        Returns:
+            dict: channelId -> channel resource, or None if the API did not
+            return the channel.
+        """
+        with self.lock:
+            if self.entries is None:
+                self.load()
+
+            now = time.time()
+            uniqueIds = list(dict.fromkeys(channelIds))
+            missingIds = [channelId for channelId in uniqueIds if not self.isFresh(channelId, now)]
+            self.hits += len(uniqueIds) - len(missingIds)
+            self.misses += len(missingIds)
+
+        def fetchBatch(batch):
+            try:
+                return apiCall(
+                    'channels',
+                    part=CHANNEL_PARTS,
+                    id=','.join(batch),
+                    fields=CHANNEL_FIELDS
+                )
+            except QuotaExceededError:
+                raise
+            except Exception as e:
+                print(f"Error fetching statistics for channels {', '.join(batch)}: {e}")
+                return None
+
+        batches = chunkList(missingIds, CHANNEL_BATCH_SIZE)
+        responses = crawlEngine.map(fetchBatch, batches)
+
+        with self.lock:
+            fetched = False
+            for batch, channelResponse in zip(batches, responses):
+                if channelResponse is None:
+                    continue
+                itemsById = {item['id']: item for item in channelResponse.get('items', [])}
+                for channelId in batch:
+                    # Unknown channels are cached too, so they are not asked for again
+                    self.entries[channelId] = {'fetchedAt': now, 'parts': CHANNEL_PARTS, 'channel': itemsById.get(channelId)}
+                fetched = True
+
+            if fetched:
+                self.save()
+
+            return {channelId: self.entries[channelId]['channel'] for channelId in uniqueIds if channelId in self.entries}
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self.entries or {})}
+
+
+channelCache = ChannelStatsCache()
+
+
+def get_channel_subscriber_count(channelId):
+    """
+    Get the subscriber count for a YouTube channel.
+
+    Args:
+        channel_id (str): The ID of the YouTube channel.
+
+    Returns:
+        int: The subscriber count of the channel.
+    """
+    channel = channelCache.getChannels([channelId]).get(channelId)
+    if channel is None:
+        print(f"Error fetching subscriber count for channel {channelId}: channel not found")
+        return 0
+
+    try:
+        return int(channel['statistics']['subscriberCount'])
+    except Exception as e:
+        print(f"Error fetching subscriber count for channel {channelId}: {e}")
+        return 0  # Return 0 in case of an error
+
+
+# Preprocessing and cleaning the text data
+PUNCTUATION_TABLE = str.maketrans('', '', string.punctuation)
+
+# Once ASCII punctuation is removed, word_tokenize only changes ASCII text by
+# splitting these contractions (NLTK's MacIntyreContractions), so plain ASCII
+# text can be tokenized with str.split(). Anything else goes through NLTK.
+CONTRACTION_SPLITS = {
+    'cannot': ['can', 'not'],
+    'gimme': ['gim', 'me'],
+    'gonna': ['gon', 'na'],
+    'gotta': ['got', 'ta'],
+    'lemme': ['lem', 'me'],
+    'wanna': ['wan', 'na'],
+}
+FAST_TOKENIZE_PATTERN = re.compile(r'[a-z0-9\s]*', re.ASCII)
+
+PREPROCESS_WORKERS = os.cpu_count() or 1
+PREPROCESS_PARALLEL_MIN = 20000  # Unique texts before preprocessTexts uses a process pool
+
+
+def preprocessBatch(texts):
+    """
+    preprocessText for a list of texts, with the stop words and punctuation
+    table built once and a str.split() tokenizer for plain ASCII text.
+    """
+    stopWords = getStopWords()
+    results = []
+    for text in texts:
+        text = text.lower().translate(PUNCTUATION_TABLE)
+
+        if FAST_TOKENIZE_PATTERN.fullmatch(text):
+            tokens = []
+            for token in text.split():
+                tokens.extend(CONTRACTION_SPLITS.get(token, (token,)))
+        else:
+            from nltk.tokenize import word_tokenize
+            tokens = word_tokenize(text)
+
+        results.append(' '.join(token for token in tokens if token not in stopWords))
+    return results
+
+
+def preprocessTexts(texts, workers=None, parallelMin=None):
+    """
+    Preprocess many texts at once, with the same output as applying
+    preprocessText to each of them.
+
+    Every distinct text is processed once. Inputs with at least parallelMin
+    distinct texts are split across a process pool.
+
+    Args:
+        texts (pandas.Series or list): The texts.
+        workers (int): Processes to use, PREPROCESS_WORKERS by default. 1
+            keeps everything in this process.
+        parallelMin (int): PREPROCESS_PARALLEL_MIN by default.
+
+    Returns:
+        pandas.Series or list: The processed texts, a Series with the index
+        of `texts` if it is one.
+    """
+    workers = PREPROCESS_WORKERS if workers is None else workers
+    parallelMin = PREPROCESS_PARALLEL_MIN if parallelMin is None else parallelMin
+    uniqueTexts = list(dict.fromkeys(texts))
+    ensureNltkResources()
+
+    if workers > 1 and len(uniqueTexts) >= parallelMin:
+        chunks = chunkList(uniqueTexts, -(-len(uniqueTexts) // (workers * 4)))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            processed = [text for chunk in executor.map(preprocessBatch, chunks) for text in chunk]
+    else:
+        processed = preprocessBatch(uniqueTexts)
+
+    processedByText = dict(zip(uniqueTexts, processed))
+    if isinstance(texts, pd.Series):
+        return texts.map(processedByText)
+    return [processedByText[text] for text in texts]
+
+
+def verifyPreprocessing(texts, workers=None):
+    """
+    Check preprocessTexts against preprocessText on a golden corpus, such as
+    the titles and descriptions of a collected dataset.
+
+    Returns:
+        list: (text, expected, actual) for every text that differs.
+    """
+    texts = list(texts)
+    actual = preprocessTexts(texts, workers=workers)
+    mismatches = []
+    for text, processed in zip(texts, actual):
+        expected = preprocessText(text)
+        if processed != expected:
+            mismatches.append((text, expected, processed))
+    print(f"{len(texts) - len(mismatches)} of {len(texts)} texts match preprocessText")
+    return mismatches
+
+
+def benchmarkPreprocessing(texts, workers=None):
+    """
+    Compare the throughput of df[...].apply(preprocessText) with
+    preprocessTexts in this process and with a process pool.
+
+    Returns:
+        dict: Texts per second for 'apply', 'batch' and 'parallel'.
+    """
+    series = pd.Series(list(texts))
+    workers = PREPROCESS_WORKERS if workers is None else workers
+    preprocessTexts(series[:10], workers=1)  # Load the NLTK resources before timing
+
+    runs = {
+        'apply': lambda: series.apply(preprocessText),
+        'batch': lambda: preprocessTexts(series, workers=1),
+        'parallel': lambda: preprocessTexts(series, workers=workers, parallelMin=0),
+    }
+    results = {}
+    for name, run in runs.items():
+        start = time.perf_counter()
+        run()
+        results[name] = len(series) / (time.perf_counter() - start)
+        print(f"{name}: {results[name]:,.0f} texts/s")
+    return results
+
+
+PREPROCESS_VERSION = 1  # Bump when preprocessText changes, so cached results are not reused
+TEXT_CACHE_PATH = 'textCache'
+TEXT_CACHE_QUERY_SIZE = 500  # Keys per SELECT, below SQLite's bound parameter limit
+
+
+def hashText(*parts):
+    hasher = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        hasher.update(str(part).encode('utf-8'))
+        hasher.update(b'\0')
+    return hasher.hexdigest()
+
+
+class TextFeatureCache:
+    """
+    Disk cache of preprocessed texts and tokenized sequences, shared by all
+    the model functions.
+
+    Processed texts are stored per text, keyed by a hash of the text and
+    PREPROCESS_VERSION, so a grown dataset only preprocesses its new rows.
+    A fitted tokenizer and its sequences are stored per column, keyed by a
+    fingerprint of the processed texts and the tokenizer settings, so the six
+    models fit each tokenizer once.
+    """
+
+    def __init__(self, dirPath=TEXT_CACHE_PATH):
+        self.dirPath = dirPath
+        self.hits = 0
+        self.misses = 0
+
+    def connect(self):
+        os.makedirs(self.dirPath, exist_ok=True)
+        connection = sqlite3.connect(os.path.join(self.dirPath, 'processedTexts.db'), timeout=30)
+        connection.execute('CREATE TABLE IF NOT EXISTS processed (textHash TEXT PRIMARY KEY, processed TEXT)')
+        return connection
+
+    def preprocess(self, texts):
+        """
+        preprocessTexts, reading and writing the cache.
+
+        Returns:
+            pandas.Series or list: Like preprocessTexts.
+        """
+        uniqueTexts = list(dict.fromkeys(texts))
+        hashes = [hashText(PREPROCESS_VERSION, text) for text in uniqueTexts]
+
+        cached = {}
+        with contextlib.closing(self.connect()) as connection:
+            for batch in chunkList(hashes, TEXT_CACHE_QUERY_SIZE):
+                sql = f"SELECT textHash, processed FROM processed WHERE textHash IN ({', '.join('?' * len(batch))})"
+                cached.update(connection.execute(sql, batch).fetchall())
+
+            missing = [(textHash, text) for textHash, text in zip(hashes, uniqueTexts) if textHash not in cached]
+            if missing:
+                processed = preprocessTexts([text for _, text in missing])
+                rows = [(textHash, processedText) for (textHash, _), processedText in zip(missing, processed)]
+                with connection:
+                    connection.executemany('INSERT OR REPLACE INTO processed VALUES (?, ?)', rows)
+                cached.update(rows)
+
+        self.hits += len(uniqueTexts) - len(missing)
+        self.misses += len(missing)
+        processedByText = {text: cached[textHash] for textHash, text in zip(hashes, uniqueTexts)}
+        if isinstance(texts, pd.Series):
+            return texts.map(processedByText)
+        return [processedByText[text] for text in texts]
+
+    def tokenize(self, texts, numWords, oovToken='<OOV>', minCount=1, hashBuckets=None):
+        """
+        Fit a Tokenizer(num_words=numWords, oov_token=oovToken) on texts and
+        turn them into sequences, or load both from the cache.
+
+        The tokenizer's num_words is cut to the words seen at least minCount
+        times (see vocabularySize), so it gives the embedding size the
+        sequences need. Rarer words become the OOV index.
+
+        Args:
+            hashBuckets (int): Hash words into this many indices with a
+                HashingTokenizer instead of fitting a vocabulary.
+
+        Returns:
+            tuple: (tokenizer, sequences), sequences being one list of word
+            indices per text.
+        """
+        loadModelLibraries()
+
+        texts = list(texts)
+        if hashBuckets:
+            tokenizer = HashingTokenizer(hashBuckets)
+            return tokenizer, tokenizer.texts_to_sequences(texts)
+
+        fingerprint = hashText(PREPROCESS_VERSION, numWords, oovToken, minCount, len(texts), *texts)
+        cachePath = os.path.join(self.dirPath, f'sequences-{fingerprint}.npz')
+
+        if os.path.exists(cachePath):
+            self.hits += 1
+            with np.load(cachePath) as cached:
+                tokenizer = tokenizerFromJson(str(cached['tokenizer']))
+                values = cached['values'].tolist()
+                offsets = cached['offsets'].tolist()
+            return tokenizer, [values[offsets[i]:offsets[i + 1]] for i in range(len(texts))]
+
+        self.misses += 1
+        tokenizer = Tokenizer(num_words=numWords, oov_token=oovToken)
+        tokenizer.fit_on_texts(texts)
+        tokenizer.num_words = vocabularySize(tokenizer, numWords, minCount)
+        sequences = tokenizer.texts_to_sequences(texts)
+
+        # Sequences are stored flat, with the offset where each one starts
+        os.makedirs(self.dirPath, exist_ok=True)
+        values, offsets = flattenSequences(sequences)
+        tmpPath = cachePath + '.tmp.npz'
+        np.savez(tmpPath, tokenizer=np.array(tokenizer.to_json()), values=values, offsets=offsets)
+        os.replace(tmpPath, cachePath)
+        return tokenizer, sequences
+
+
+# The model functions preprocess and tokenize through textCache
+textCache = TextFeatureCache()
+
+
+HASH_BUCKETS = 2 ** 15  # Embedding rows per text field in the hashed embedding mode
+
+
+def vocabularySize(tokenizer, numWords, minCount=1):
+    """
+    Embedding rows a fitted Tokenizer needs: the padding index, the OOV
+    index and one row per word seen at least minCount times, at most numWords.
+    """
+    # word_index is ordered by count, so the kept words are the first ones
+    keptWords = sum(count >= minCount for count in tokenizer.word_counts.values())
+    return min(numWords, keptWords + 1 + (tokenizer.oov_token is not None))
+
+
+class HashingTokenizer:
+    """
+    Tokenizer for the hashing trick. Every word maps to one of
+    numBuckets - 1 embedding rows by a stable hash, 0 staying the padding
+    index, so there is no vocabulary to fit or store and words first seen at
+    prediction time still get a row, at the cost of some collisions.
+
+    The hash is TensorFlow's FarmHash fingerprint, the one FeaturePipeline
+    hashes words with inside its tf.data map.
+    """
+
+    def __init__(self, numBuckets=HASH_BUCKETS):
+        # Named like Tokenizer.num_words, which the models size their embeddings by
+        self.num_words = numBuckets
+
+    def texts_to_sequences(self, texts):
+        import tensorflow as tf
+
+        # Processed texts are already lower case and free of punctuation
+        words = tf.strings.split(tf.constant(list(texts), dtype=tf.string))
+        return (tf.strings.to_hash_bucket_fast(words, self.num_words - 1) + 1).to_list()
+
+    def to_json(self):
+        return json.dumps({'class_name': 'HashingTokenizer', 'config': {'numBuckets': self.num_words}})
+
+
+CATEGORY_EMBEDDING_MAX_DIM = 16  # Categorical columns have few values, so their vectors stay small
+
+
+class CategoricalEncoder:
+    """
+    Integer ids of categorical columns, such as categoryId and channelId,
+    into one shared embedding table.
+
+    Every column gets its own block of rows. Row 0 of a block is for values
+    not seen in training (or seen fewer than minCount times), the others
+    follow the training values by frequency. A single Embedding and Flatten
+    then give every column its vector, with no tokenizer, padding or
+    recurrent layer in between.
+    """
+
+    def __init__(self, columns=('categoryId',), minCount=1, vocabularies=None):
+        self.columns = list(columns)
+        self.minCount = minCount
+        self.vocabularies = vocabularies or {}
+
+    def fit(self, df):
+        return self.fitCounts({column: df[column].astype(str).value_counts() for column in self.columns})
+
+    def fitCounts(self, counts):
+        """
+        fit() from the value counts of every column, e.g. summed over chunks.
+        """
+        for column in self.columns:
+            columnCounts = counts[column]
+            kept = sorted((value for value, count in columnCounts.items() if count >= self.minCount), key=lambda value: (-columnCounts[value], value))
+            self.vocabularies[column] = {value: i + 1 for i, value in enumerate(kept)}
+        return self
+
+    @property
+    def num_words(self):
+        # Rows of the shared table, named like Tokenizer.num_words
+        return sum(len(self.vocabularies[column]) + 1 for column in self.columns)
+
+    def embeddingDim(self):
+        # The usual rule of thumb for categorical embeddings, 1.6 * rows ** 0.56, capped
+        largest = max(len(self.vocabularies[column]) + 1 for column in self.columns)
+        return min(CATEGORY_EMBEDDING_MAX_DIM, max(2, round(1.6 * largest ** 0.56)))
+
+    def transform(self, df):
+        """
+        Returns:
+            numpy.ndarray: (rows, columns) int32 ids into the shared table.
+        """
+        ids = np.zeros((len(df), len(self.columns)), dtype=np.int32)
+        offset = 0
+        for i, column in enumerate(self.columns):
+            vocabulary = self.vocabularies[column]
+            ids[:, i] = offset + df[column].astype(str).map(vocabulary).fillna(0).to_numpy(dtype=np.int32)
+            offset += len(vocabulary) + 1
+        return ids
+
+    def to_json(self):
+        return json.dumps({'class_name': 'CategoricalEncoder', 'config': {'columns': self.columns, 'minCount': self.minCount, 'vocabularies': self.vocabularies}})
+
+
+def tokenizerFromJson(text):
+    """
+    tokenizer_from_json that also reads HashingTokenizer.to_json() and
+    CategoricalEncoder.to_json().
+    """
+    from tensorflow.keras.preprocessing.text import tokenizer_from_json
+
+    config = json.loads(text)
+    if config.get('class_name') == 'HashingTokenizer':
+        return HashingTokenizer(**config['config'])
+    if config.get('class_name') == 'CategoricalEncoder':
+        return CategoricalEncoder(**config['config'])
+    return tokenizer_from_json(text)
+
+
+def flattenSequences(sequences):
+    """
+    Store sequences flat: sequence i is values[offsets[i]:offsets[i + 1]].
+
+    Returns:
+        tuple: (values, offsets) as int32 and int64 arrays.
+    """
+    offsets = np.zeros(len(sequences) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(sequence) for sequence in sequences])
+    values = np.fromiter(itertools.chain.from_iterable(sequences), dtype=np.int32, count=offsets[-1])
+    return values, offsets
 
-    return videosData
 
+def padRows(values, offsets, rows, maxLen, truncating='pre'):
+    """
+    pad_sequences(..., maxlen=maxLen, padding='post', truncating=truncating)
+    for some rows of flat sequences (see flattenSequences).
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    # Longer sequences keep their last maxLen values ('pre') or their first ('post')
+    kept = np.minimum(offsets[rows + 1] - offsets[rows], maxLen)
+    starts = offsets[rows + 1] - kept if truncating == 'pre' else offsets[rows]
+    padded = np.zeros((len(rows), maxLen), dtype=np.int32)
+    columns = np.arange(kept.sum()) - np.repeat(np.cumsum(kept) - kept, kept)
+    padded[np.repeat(np.arange(len(rows)), kept), columns] = values[np.repeat(starts, kept) + columns]
+    return padded
 
-def getRandomChannelsVideos(saveFile=True, filePath='randomChannelsVideos8.json', numChannels=20, numVideosPerChannel=20):
-    # Check if the file already exists
-    if os.path.exists(filePath):
-        # If the file exists, load and return the data from the file
-        with open(filePath, 'r') as file:
-            videosData = json.load(file)
-        return videosData
 
-    # If the file doesn't exist, fetch videos from specific channels
-    videosData = []
+def padForPrediction(sequences, length, bucketed=False):
+    """
+    Pad token sequences to score them as the model was trained: to the
+    fitted length, or, for models trained on bucketed batches, to the bucket
+    of the longest sequence once cut to that length.
 
-    # Search for videos with the specified criteria
-    searchResponse = youtube.search().list(
-        part='snippet',
-        type='video',
-        relevanceLanguage='en',  # English videos
-        maxResults=numChannels,
-        videoDuration='any',   # Any duration
-        videoDefinition='high',  # High definition
-        safeSearch='strict',
-    ).execute()
+    Args:
+        length (LengthPolicy): The fitted policy of the text field.
+    """
+    if bucketed:
+        sequences = length.truncate(sequences)
+    values, offsets = flattenSequences(sequences)
+    maxLen = bucketLength(int(np.diff(offsets).max(initial=0))) if bucketed else length.maxLen
+    return padRows(values, offsets, np.arange(len(sequences)), maxLen, length.truncating)
 
-    channelIds = [item['snippet']['channelId'] for item in searchResponse['items']]
 
-    for channelID in channelIds:
-        # Get the latest videos from the channel
-        channelResponse = youtube.search().list(
-            channelId=channelID,
-            part='id',
-            type='video',
-            maxResults=numVideosPerChannel
-        ).execute()
-
-        videoIds = [item['id']['videoId'] for item in channelResponse['items']]
-
-        # Get video details (title, views) for the selected video IDs
-        for videoId in videoIds:
-            response = youtube.videos().list(
-                part='snippet,statistics',
-                id=videoId
-            ).execute()
-            snippet = response['items'][0]['snippet']
-            statistics = response['items'][0]['statistics']
-
-            title = snippet['title']
-            description = snippet.get('description', '')
-            channel_title = snippet['channelTitle']
-            channel_id = snippet['channelId']
-            subscriber_count = get_channel_subscriber_count(channel_id)
-            category_id = snippet['categoryId']
-            publication_date = snippet['publishedAt']
-
-            lang_match = True
-            if ('defaultAudioLanguage' in snippet and snippet['defaultAudioLanguage'] != 'en') or ('defaultLanguage' in snippet and snippet['defaultLanguage'] != 'en'):
-                lang_match = False
-
-            # Ensure the video has more than 1,000 views and exists
-            if ('viewCount' in statistics and int(statistics['viewCount']) > 1000 and lang_match):
-                videosData.append({
-                    'videoId': videoId,
-                    'title': title,
-                    'description': description,
-                    'channelTitle': channel_title,
-                    'channelId': channel_id,
-                    'subscriberCount': subscriber_count,
-                    'categoryId': category_id,
-                    'publishedAt': publication_date,
-                    'views': int(statistics['viewCount'])
-                })
+class LengthPolicy:
+    """
+    Sequence length of one text field.
 
-    # Save the data to a file
-    if saveFile:
-        with open(filePath, 'w') as file:
-            json.dump(videosData, file)
+    A policy cuts sequences to a fixed `maxLen`, to a `percentile` of the
+    training lengths (at most maxLen when both are given), or, with neither,
+    to the longest training sequence. Longer sequences keep their first
+    tokens (keep='head') or their last (keep='tail').
 
-    return videosData
+    fit() turns a policy into a fixed length, which is stored in the model's
+    manifest so prediction pads to the shapes the model was trained on.
+    """
 
+    def __init__(self, maxLen=None, percentile=None, keep='head'):
+        if keep not in ('head', 'tail'):
+            raise ValueError(f"keep must be 'head' or 'tail', not {keep!r}")
+        self.maxLen = maxLen
+        self.percentile = percentile
+        self.keep = keep
+
+    def __repr__(self):
+        return f'LengthPolicy(maxLen={self.maxLen}, percentile={self.percentile}, keep={self.keep!r})'
+
+    @classmethod
+    def parse(cls, text):
+        """
+        Parse '<length>[:head|tail]', the length being a token count such as
+        '256' or a percentile such as 'p95'.
+        """
+        limit, _, keep = text.partition(':')
+        if limit.startswith('p'):
+            return cls(percentile=float(limit[1:]), keep=keep or 'head')
+        return cls(maxLen=int(limit), keep=keep or 'head')
+
+    @property
+    def truncating(self):
+        # pad_sequences' name for the side that is cut off
+        return 'post' if self.keep == 'head' else 'pre'
+
+    def fit(self, sequences):
+        """
+        Returns:
+            LengthPolicy: A fixed-length policy for sequences like these.
+        """
+        return self.fitLengths(np.array([len(sequence) for sequence in sequences]))
+
+    def fitLengths(self, lengths):
+        # fit() from the sequence lengths alone
+        lengths = np.asarray(lengths)
+        longest = int(lengths.max()) if len(lengths) else 0
+        maxLen = longest if self.maxLen is None else self.maxLen
+        if self.percentile is not None:
+            maxLen = min(maxLen, int(np.ceil(np.percentile(lengths, self.percentile))) if len(lengths) else 0)
+        return LengthPolicy(maxLen=max(maxLen, 1), keep=self.keep)
+
+    def truncate(self, sequences):
+        # The sequences of a fitted policy, cut to maxLen without padding them
+        if self.keep == 'head':
+            return [sequence[:self.maxLen] for sequence in sequences]
+        return [sequence[-self.maxLen:] for sequence in sequences]
+
+    def toDict(self):
+        return {'maxLen': self.maxLen, 'percentile': self.percentile, 'keep': self.keep}
+
+    @classmethod
+    def fromDict(cls, params):
+        return cls(**params)
+
+
+# Length policy of each text field, unless a model function is given others.
+# Every field keeps its longest training sequence; cutting descriptions, e.g. to
+# LengthPolicy(maxLen=512, percentile=95), is opt-in through --length-policy.
+LENGTH_POLICIES = {
+    'title': LengthPolicy(),
+    'description': LengthPolicy(),
+    'channelTitle': LengthPolicy(),
+}
+
+
+FEATURE_STORE_PATH = 'featureStore'
+FEATURE_WRITE_ROWS = 65536  # Rows padded at a time when writing a matrix
+
+
+class FeatureStore:
+    """
+    Memory-mapped store of the model features.
+
+    Padded sequence matrices are written straight to .npy files and opened
+    read-only with mmap, so they never have to fit in process memory and
+    every process on a host shares one page-cached copy. Each model also
+    writes a manifest naming its arrays, its scaler parameters and its
+    tokenizer vocabularies, which load() reopens for scoring or training in
+    another process.
+    """
 
-def combineDatasets(saveFile=True):
-    # Check if the file already exists
-    dataFiles = ['combinedVideos', 'allVideos', 'popularChannelsVideos', 'channelsVideos', 'randomChannelsVideos', 'categoryVideos']
-    # dataFiles = ['popularChannelsVideos', 'channelsVideos', 'randomChannelsVideos', 'categoryVideos']
-    
-    videosData = []
-    
-    for filePath in dataFiles:
-        exists = True
-        i = 2
-        while exists and i < 10:
-            if i != 1:
-                if i == 2:
-                    filePath += str(i)
-                else:
-                    filePath = filePath[:len(filePath)-1]
-                    filePath += str(i)
-            print(filePath)
-            if os.path.exists(filePath+'.json'):
-                # If the file exists, load and return the data from the file
-                with open(filePath+'.json', 'r') as file:
-                    videosData.append(json.load(file))
-                    i += 1
+    def __init__(self, dirPath=FEATURE_STORE_PATH):
+        self.dirPath = dirPath
+
+    def pad(self, sequences, maxLen, truncating='pre'):
+        """
+        pad_sequences(sequences, maxlen=maxLen, padding='post', truncating=truncating)
+        as a read-only memmap. The matrix is reused for as long as the
+        sequences are unchanged.
+        """
+        values, offsets = flattenSequences(sequences)
+        lengths = np.diff(offsets)
+        if len(sequences) == 0 or maxLen == 0:
+            return np.zeros((len(sequences), maxLen), dtype=np.int32)
+
+        hasher = hashlib.blake2b(digest_size=16)
+        for array in (np.array([maxLen]), lengths, values):
+            hasher.update(array.tobytes())
+        hasher.update(truncating.encode())
+        arrayPath = os.path.join(self.dirPath, f'padded-{hasher.hexdigest()}.npy')
+        if os.path.exists(arrayPath):
+            return np.load(arrayPath, mmap_mode='r')
+
+        os.makedirs(self.dirPath, exist_ok=True)
+        tmpPath = arrayPath + '.tmp'
+        matrix = np.lib.format.open_memmap(tmpPath, mode='w+', dtype=np.int32, shape=(len(sequences), maxLen))
+        for start in range(0, len(sequences), FEATURE_WRITE_ROWS):
+            end = min(start + FEATURE_WRITE_ROWS, len(sequences))
+            matrix[start:end] = padRows(values, offsets, np.arange(start, end), maxLen, truncating)
+        matrix.flush()
+        del matrix
+        os.replace(tmpPath, arrayPath)
+        return np.load(arrayPath, mmap_mode='r')
+
+    def manifestPath(self, name):
+        return os.path.join(self.dirPath, f'{name}.manifest.json')
+
+    def saveManifest(self, name, arrays, scalers=None, tokenizers=None, lengths=None):
+        """
+        Record a model's features. Memmaps from pad() are referenced in place,
+        other arrays are saved next to them.
+
+        Args:
+            arrays (dict): Feature name to array.
+            scalers (dict): Feature name to fitted StandardScaler.
+            tokenizers (dict): Feature name to fitted Tokenizer.
+            lengths (dict): Feature name to fitted LengthPolicy.
+        """
+        os.makedirs(self.dirPath, exist_ok=True)
+        manifest = {'arrays': {}, 'scalers': {}, 'tokenizers': {}, 'lengths': {}, 'createdAt': time.time()}
+
+        for key, array in arrays.items():
+            fileName = getattr(array, 'filename', None)
+            if fileName and os.path.dirname(os.path.abspath(fileName)) == os.path.abspath(self.dirPath):
+                manifest['arrays'][key] = os.path.basename(fileName)
             else:
-                exists = False
-            
-    
-    # Combine the lists of sets into one list with unique videoIds
-    combinedList = []
-    uniqueVideoIds = set()
+                manifest['arrays'][key] = f'{name}-{key}.npy'
+                np.save(os.path.join(self.dirPath, manifest['arrays'][key]), np.asarray(array))
 
-    for videoList in videosData:
-        for video in videoList:
-            videoId = video["videoId"]
-            if videoId not in uniqueVideoIds:
-                uniqueVideoIds.add(videoId)
-                combinedList.append(video)
+        for key, scaler in (scalers or {}).items():
+            manifest['scalers'][key] = {
+                'mean': scaler.mean_.tolist(),
+                'scale': scaler.scale_.tolist(),
+                'var': scaler.var_.tolist(),
+                'nSamplesSeen': int(scaler.n_samples_seen_),
+            }
 
+        for key, tokenizer in (tokenizers or {}).items():
+            manifest['tokenizers'][key] = f'{name}-{key}.tokenizer.json'
+            with open(os.path.join(self.dirPath, manifest['tokenizers'][key]), 'w') as file:
+                file.write(tokenizer.to_json())
 
+        for key, policy in (lengths or {}).items():
+            manifest['lengths'][key] = policy.toDict()
 
-    # Save the data to a file
-    if saveFile:
-        with open('combinedVideos3.json', 'w') as file:
-            json.dump(combinedList, file)
+        # The manifest goes last, so it only ever names complete files
+        tmpPath = self.manifestPath(name) + '.tmp'
+        with open(tmpPath, 'w') as file:
+            json.dump(manifest, file)
+        os.replace(tmpPath, self.manifestPath(name))
 
-    return combinedList
+    def load(self, name):
+        """
+        Open a model's features.
 
-def getAllVideos(saveFile=True, filePath='allVideos2.json', numChannels=20, numVideosPerChannel=15):
-    # Check if the file already exists
-    if os.path.exists(filePath):
-        # If the file exists, load and return the data from the file
-        with open(filePath, 'r') as file:
-            videosData = json.load(file)
-        return videosData
+        Returns:
+            dict: 'arrays' (read-only memmaps), 'scalers' (StandardScaler),
+            'tokenizers' (Tokenizer) and 'lengths' (fitted LengthPolicy), each
+            by feature name.
+        """
+        from sklearn.preprocessing import StandardScaler
 
-    # If the file doesn't exist, fetch videos from specific channels
-    videosData = []
+        with open(self.manifestPath(name), 'r') as file:
+            manifest = json.load(file)
 
-    # Search for videos with the specified criteria
-    searchResponse = youtube.search().list(
-        part='snippet',
-        type='video',
-        relevanceLanguage='en',  # English videos
-        maxResults=numChannels,
-        videoDuration='any',   # Any duration
-        videoDefinition='high',  # High definition
-        safeSearch='strict',
-    ).execute()
+        arrays = {key: np.load(os.path.join(self.dirPath, fileName), mmap_mode='r') for key, fileName in manifest['arrays'].items()}
 
-    randomChannelIds = [item['snippet']['channelId'] for item in searchResponse['items']]
+        scalers = {}
+        for key, params in manifest['scalers'].items():
+            scaler = StandardScaler()
+            scaler.mean_ = np.array(params['mean'])
+            scaler.scale_ = np.array(params['scale'])
+            scaler.var_ = np.array(params['var'])
+            scaler.n_samples_seen_ = params['nSamplesSeen']
+            scaler.n_features_in_ = len(params['mean'])
+            scalers[key] = scaler
 
-    # specChannelIds = ['UCgRQHK8Ttr1j9xCEpCAlgbQ', 'UCHnyfMqiRRG1u-2MsSQLbXA', 'UCGfUuxBzB8E30XjCjOvji2w', 'UCBJycsmduvYEL83R_U4JriQ', 'UCvK4bOhULCpmLabd2pDMtnA',
-    #                   'UCc9CjaAjsMMvaSghZB7-Kog', 'UCX6OQ3DkcsbYNE6H8uQQuVA', 'UCQJWtTnAHhEG5w4uN0udnUQ', 'UCL6JmiMXKoXS6bpP1D3bk8g', 'UCZB6V9fUov0Mx_us3MWWILg']
+        tokenizers = {}
+        for key, fileName in manifest['tokenizers'].items():
+            with open(os.path.join(self.dirPath, fileName), 'r') as file:
+                tokenizers[key] = tokenizerFromJson(file.read())
 
-    specChannelIds = ['UCgRQHK8Ttr1j9xCEpCAlgbQ', 'UCHnyfMqiRRG1u-2MsSQLbXA', 'UCGfUuxBzB8E30XjCjOvji2w', 'UCBJycsmduvYEL83R_U4JriQ', 
-                  'UCvK4bOhULCpmLabd2pDMtnA', 'UCc9CjaAjsMMvaSghZB7-Kog', 'UCX6OQ3DkcsbYNE6H8uQQuVA', 'UCQJWtTnAHhEG5w4uN0udnUQ', 
-                  'UCL6JmiMXKoXS6bpP1D3bk8g', 'UCZB6V9fUov0Mx_us3MWWILg', 'UClyGlKOhDUooPJFy4v_mqPg', 'UCw1SQ6QRRtfAhrN_cjkrOgA', 
-                  'UCTkXRDQl0luXxVQrRQvWS6w', 'UCLXo7UDZvByw2ixzpQCufnA', 'UCAuk798iHprjTtwlClkFxMA', 'UCimiUgDLbi6P17BdaCZpVbg', 
-                  'UCDogdKl7t7NHzQ95aEwkdMw', 'UC2C_jShtL725hvbm1arSV9w', 'UCftwRNsjfRo08xYE31tkiyw', 'UCyps-v4WNjWDnYRKmZ4BUGw', 
-                  'UCsEukrAd64fqA7FjwkmZ_Dw', 'UCq6VFHwMzcMXbuKyG7SQYIg', 'UCTSRIY3GLFYIpkR2QwyeklA']
+        lengths = {key: LengthPolicy.fromDict(params) for key, params in manifest.get('lengths', {}).items()}
 
+        return {'arrays': arrays, 'scalers': scalers, 'tokenizers': tokenizers, 'lengths': lengths}
 
-    trendingList = youtube.videos().list(
-        part='snippet',
-        chart='mostPopular',
-        regionCode='US',  # Adjust the region code as needed
-        maxResults=20
-    ).execute()
 
-    trendingChannelIds = [item['snippet']['channelId'] for item in trendingList['items']]
+# The model functions pad their sequences into featureStore
+featureStore = FeatureStore()
 
-    channelIds = list(set(randomChannelIds + specChannelIds + trendingChannelIds))
 
-    for channelID in channelIds:
-        # Get the latest videos from the channel
-        channelResponse = youtube.search().list(
-            channelId=channelID,
-            part='id',
-            type='video',
-            maxResults=numVideosPerChannel
-        ).execute()
-
-        videoIds = [item['id']['videoId'] for item in channelResponse['items']]
-
-        # Get video details (title, views) for the selected video IDs
-        for videoId in videoIds:
-            response = youtube.videos().list(
-                part='snippet,statistics',
-                id=videoId
-            ).execute()
-            snippet = response['items'][0]['snippet']
-            statistics = response['items'][0]['statistics']
-
-            title = snippet['title']
-            description = snippet.get('description', '')
-            channel_title = snippet['channelTitle']
-            channel_id = snippet['channelId']
-            subscriber_count = get_channel_subscriber_count(channel_id)
-            category_id = snippet['categoryId']
-            publication_date = snippet['publishedAt']
-
-            lang_match = True
-            if ('defaultAudioLanguage' in snippet and snippet['defaultAudioLanguage'] != 'en') or ('defaultLanguage' in snippet and snippet['defaultLanguage'] != 'en'):
-                lang_match = False
-
-            # Ensure the video has more than 1,000 views and exists
-            if ('viewCount' in statistics and int(statistics['viewCount']) > 1000 and lang_match):
-                videosData.append({
-                    'videoId': videoId,
-                    'title': title,
-                    'description': description,
-                    'channelTitle': channel_title,
-                    'channelId': channel_id,
-                    'subscriberCount': subscriber_count,
-                    'categoryId': category_id,
-                    'publishedAt': publication_date,
-                    'views': int(statistics['viewCount'])
-                })
+def predictInBatches(model, inputs, batchSize=1024):
+    """
+    Score memory-mapped inputs batch by batch, so only one batch of each
+    input is ever copied into memory.
 
-    # Save the data to a file
-    if saveFile:
-        with open(filePath, 'w') as file:
-            json.dump(videosData, file)
+    Args:
+        inputs (list): The model's input arrays, e.g. from FeatureStore.load().
 
-    return videosData
+    Returns:
+        numpy.ndarray: The predictions.
+    """
+    predictions = []
+    for start in range(0, len(inputs[0]), batchSize):
+        batch = [np.asarray(array[start:start + batchSize]) for array in inputs]
+        predictions.append(model.predict_on_batch(batch if len(batch) > 1 else batch[0]))
+    return np.concatenate(predictions) if predictions else np.empty((0, 1))
 
 
+BUCKET_MIN_LENGTH = 8  # Shortest padded length of a bucketed batch
+BUCKET_POOL_BATCHES = 50  # Batches per shuffled pool that is sorted by length
 
 
+def bucketLength(length):
+    # Round up to a power of two, so batches come in a handful of shapes that each trace once
+    return max(BUCKET_MIN_LENGTH, 1 << max(length - 1, 0).bit_length())
 
 
-def get_channel_subscriber_count(channelId):
+class LengthBucketedBatches:
+    """
+    Batches of similar-length rows, each padded only to its own longest
+    sequence (rounded up by bucketLength) instead of the corpus maximum, so
+    the work per batch follows the real lengths.
+
+    Rows are shuffled, cut into pools of BUCKET_POOL_BATCHES batches and
+    sorted by length within each pool, so batch compositions still change
+    every epoch. Models fed these batches take Input(shape=(None,)) and
+    Embedding(mask_zero=True), so the LSTMs skip the padding.
     """
-    Get the subscriber count for a YouTube channel.
 
-    Args:
-        channel_id (str): The ID of the YouTube channel.
+    def __init__(self, inputs, y=None, rows=None, batchSize=32, shuffle=True, seed=42):
+        """
+        Args:
+            inputs (list): The model's inputs in order, token sequences as
+                lists of lists and other features as 2D arrays.
+            rows (array-like): Rows to batch, all rows by default.
+        """
+        self.inputs = [flattenSequences(values) if isinstance(values, list) else np.asarray(values, dtype=np.float32) for values in inputs]
+        self.y = None if y is None else np.asarray(y, dtype=np.float32)
+        numRows = len(inputs[0])
+        self.rows = np.arange(numRows) if rows is None else np.asarray(rows, dtype=np.int64)
+        self.batchSize = batchSize
+        self.shuffle = shuffle
+        self.random = np.random.default_rng(seed)
+
+        # Rows are sorted by the total length of their sequences
+        self.lengths = np.zeros(numRows, dtype=np.int64)
+        for values in self.inputs:
+            if isinstance(values, tuple):
+                self.lengths += np.diff(values[1])
+
+    def __len__(self):
+        return -(-len(self.rows) // self.batchSize)
+
+    def batchRows(self):
+        """
+        Rows of every batch of one epoch.
+        """
+        rows = self.random.permutation(self.rows) if self.shuffle else self.rows
+        poolSize = self.batchSize * BUCKET_POOL_BATCHES if self.shuffle else len(rows)
+        batches = []
+        for start in range(0, len(rows), max(poolSize, 1)):
+            pool = rows[start:start + poolSize]
+            pool = pool[np.argsort(self.lengths[pool], kind='stable')]
+            batches.extend(pool[i:i + self.batchSize] for i in range(0, len(pool), self.batchSize))
+        if self.shuffle:
+            self.random.shuffle(batches)
+        return batches
+
+    def batch(self, rows):
+        features = []
+        for values in self.inputs:
+            if isinstance(values, tuple):
+                sequenceValues, offsets = values
+                maxLen = bucketLength(int((offsets[rows + 1] - offsets[rows]).max()))
+                features.append(padRows(sequenceValues, offsets, rows, maxLen))
+            else:
+                features.append(values[rows])
+        return tuple(features)
+
+    def __iter__(self):
+        for rows in self.batchRows():
+            yield self.batch(rows) if self.y is None else (self.batch(rows), self.y[rows])
+
+    def dataset(self):
+        """
+        The batches as a tf.data.Dataset, reshuffled on every pass.
+        """
+        import tensorflow as tf
+
+        signature = tuple(
+            tf.TensorSpec((None, None), tf.int32) if isinstance(values, tuple) else tf.TensorSpec((None, values.shape[1]), tf.float32)
+            for values in self.inputs
+        )
+        if self.y is not None:
+            signature = (signature, tf.TensorSpec((None,), tf.float32))
+        dataset = tf.data.Dataset.from_generator(self.__iter__, output_signature=signature)
+        return dataset.apply(tf.data.experimental.assert_cardinality(len(self))).prefetch(tf.data.AUTOTUNE)
+
+    def predict(self, model):
+        """
+        Predictions for the rows, in row order.
+        """
+        predictions = np.empty(len(self.rows), dtype=np.float32)
+        position = {row: i for i, row in enumerate(self.rows.tolist())}
+        for rows in self.batchRows():
+            output = model.predict_on_batch(self.batch(rows))
+            predictions[[position[row] for row in rows.tolist()]] = np.ravel(output)
+        return predictions
+
+
+VALIDATION_SPLIT = 0.2  # The model functions' fit(validation_split=...)
+
+
+def bucketedSplits(inputs, y, validationSplit=VALIDATION_SPLIT, batchSize=32):
+    """
+    Length-bucketed train, validation and test datasets over the rows that
+    train_test_split(..., test_size=0.2, random_state=42) and
+    fit(validation_split=validationSplit) would pick from the padded arrays.
 
     Returns:
-        int: The subscriber count of the channel.
+        tuple: (train, validation, test) datasets, validation being None
+        when validationSplit is 0.
+    """
+    loadModelLibraries()
+    trainRows, testRows = train_test_split(np.arange(len(y)), test_size=0.2, random_state=42)
+    # fit() holds out the last rows of the training split, before shuffling, splitting at the floor
+    splitAt = int(len(trainRows) * (1 - validationSplit))
+    train = LengthBucketedBatches(inputs, y, trainRows[:splitAt], batchSize).dataset()
+    validation = None
+    if validationSplit:
+        validation = LengthBucketedBatches(inputs, y, trainRows[splitAt:], batchSize, shuffle=False).dataset()
+    test = LengthBucketedBatches(inputs, y, testRows, batchSize, shuffle=False).dataset()
+    return train, validation, test
+
+
+PIPELINE_CACHE_PATH = 'pipelineCache'
+PIPELINE_CHUNK_SIZE = 50000  # Records per chunk, enough for preprocessTexts to use its process pool
+PIPELINE_SHUFFLE_BUFFER = 10000  # Training examples shuffled at a time
+# Hash buckets of videoId (out of 100) in each split: 20% for testing, and 20% of the rest for validation
+PIPELINE_SPLITS = {'train': (36, 100), 'validation': (20, 36), 'test': (0, 20)}
+PIPELINE_TEXT_FIELDS = ['title', 'description', 'channelTitle']
+PIPELINE_NUMERIC_FIELDS = {'subscriber': 'subscriberCount', 'daysSincePublication': 'daysSincePublication'}
+
+
+class FeaturePipeline:
+    """
+    tf.data input for the model functions, streamed from dataset files so
+    the training data no longer has to fit in memory.
+
+    fit() makes one pass over the files, chunk by chunk, for the tokenizers,
+    length policies, categorical vocabularies and scalers the model
+    functions otherwise fit on a DataFrame. dataset() streams the records
+    again: processed texts (through textCache) come from a generator, while
+    tokenization, truncation and scaling run in a parallel map. Encoded
+    examples are cached to a file per split, so later epochs, and the other
+    models trained on the same pipeline, skip the records altogether.
+
+    Records are split by a hash of their videoId (see PIPELINE_SPLITS), so
+    a video stays in the same split across passes, processes and grown
+    datasets.
     """
-    try:
-        channelResponse = youtube.channels().list(
-            part='statistics',
-            id=channelId
-        ).execute()
 
-        subscriberCount = int(channelResponse['items'][0]['statistics']['subscriberCount'])
-        return subscriberCount
+    def __init__(self, filePaths, lengthPolicies=None, minWordCount=1, hashBuckets=None, channelIdEmbedding=False, maxWords=100000, chunksize=PIPELINE_CHUNK_SIZE, cacheDir=PIPELINE_CACHE_PATH):
+        """
+        Args:
+            filePaths (list): Dataset files, see iterDatasetRecords.
+            cacheDir (str): Directory of the encoded example caches, or None
+                to encode the records on every pass.
+
+        The other arguments are those of the model functions, which take them
+        from the pipeline when given one.
+        """
+        self.filePaths = [filePaths] if isinstance(filePaths, str) else list(filePaths)
+        self.policies = {**LENGTH_POLICIES, **(lengthPolicies or {})}
+        self.minWordCount = minWordCount
+        self.hashBuckets = hashBuckets
+        self.categoryColumns = ['categoryId', 'channelId'] if channelIdEmbedding else ['categoryId']
+        self.maxWords = maxWords
+        self.chunksize = chunksize
+        self.cacheDir = cacheDir
+        # Days since publication are counted from the same moment in every pass
+        self.today = pd.to_datetime('today').tz_localize('UTC')
+        self.tokenizers = {}
+        self.lengths = {}
+        self.scalers = {}
+        self.categoryEncoder = None
+        self.splitSizes = {}
+
+    def iterChunks(self):
+        """
+        Yield the records as DataFrames with processed_<field> text columns
+        and a daysSincePublication column.
+        """
+        columns = ['videoId', *PIPELINE_TEXT_FIELDS, *self.categoryColumns, 'subscriberCount', 'publishedAt', 'views']
+        for filePath in self.filePaths:
+            for chunk in iterDatasetChunks(filePath, self.chunksize, columns):
+                for field in PIPELINE_TEXT_FIELDS:
+                    chunk['processed_' + field] = textCache.preprocess(chunk[field].fillna(''))
+                chunk['daysSincePublication'] = (self.today - pd.to_datetime(chunk['publishedAt'])).dt.days
+                yield chunk
+
+    def fit(self):
+        """
+        Fit the features on every record of the files.
+
+        Returns:
+            FeaturePipeline: self.
+        """
+        import tensorflow as tf
+
+        loadModelLibraries()
+        tokenizers = {field: Tokenizer(num_words=self.maxWords, oov_token='<OOV>') for field in PIPELINE_TEXT_FIELDS}
+        lengths = {field: [] for field in PIPELINE_TEXT_FIELDS}
+        scalers = {key: StandardScaler() for key in PIPELINE_NUMERIC_FIELDS}
+        categoryCounts = {column: pd.Series(dtype='float64') for column in self.categoryColumns}
+        splitSizes = dict.fromkeys(PIPELINE_SPLITS, 0)
+
+        for chunk in self.iterChunks():
+            for field in PIPELINE_TEXT_FIELDS:
+                texts = chunk['processed_' + field]
+                if not self.hashBuckets:
+                    tokenizers[field].fit_on_texts(texts)
+                # Every word becomes one index, from the vocabulary, OOV or a hash bucket
+                lengths[field].append(texts.str.split().str.len().to_numpy())
+            for key, column in PIPELINE_NUMERIC_FIELDS.items():
+                scalers[key].partial_fit(chunk[[column]].astype('float64'))
+            for column in self.categoryColumns:
+                categoryCounts[column] = categoryCounts[column].add(chunk[column].astype(str).value_counts(), fill_value=0)
+            buckets = tf.strings.to_hash_bucket_fast(chunk['videoId'].astype(str).tolist(), 100).numpy()
+            for split, (low, high) in PIPELINE_SPLITS.items():
+                splitSizes[split] += int(((buckets >= low) & (buckets < high)).sum())
+
+        if not sum(splitSizes.values()):
+            raise ValueError(f'No records in {self.filePaths}')
+
+        for field in PIPELINE_TEXT_FIELDS:
+            if self.hashBuckets:
+                tokenizers[field] = HashingTokenizer(self.hashBuckets)
+            else:
+                tokenizers[field].num_words = vocabularySize(tokenizers[field], self.maxWords, self.minWordCount)
+            self.lengths[field] = self.policies[field].fitLengths(np.concatenate(lengths[field]))
+        self.tokenizers = tokenizers
+        self.scalers = scalers
+        self.categoryEncoder = CategoricalEncoder(self.categoryColumns).fitCounts(categoryCounts)
+        self.splitSizes = splitSizes
+        return self
+
+    def saveManifest(self, name):
+        # The fitted features of a model trained on the pipeline, for FeatureStore.load()
+        featureStore.saveManifest(
+            name,
+            {},
+            scalers=self.scalers,
+            tokenizers={**self.tokenizers, 'category': self.categoryEncoder},
+            lengths=self.lengths
+        )
+
+    def cachePath(self, split):
+        # Changes with the files, the settings and the day, so a stale cache is never read
+        files = [(os.path.abspath(filePath), os.path.getsize(filePath), os.path.getmtime(filePath)) for filePath in self.filePaths]
+        lengths = {field: policy.toDict() for field, policy in self.lengths.items()}
+        fingerprint = hashText(PREPROCESS_VERSION, files, self.today.date(), lengths, self.minWordCount, self.hashBuckets, self.categoryColumns, self.maxWords)
+        return os.path.join(self.cacheDir, f'{fingerprint}-{split}')
+
+    def records(self):
+        import tensorflow as tf
+
+        def generate():
+            for chunk in self.iterChunks():
+                record = {'videoId': chunk['videoId'].astype(str).to_numpy(dtype=object), 'views': chunk['views'].to_numpy(dtype=np.float32)}
+                for field in PIPELINE_TEXT_FIELDS:
+                    record['processed_' + field] = chunk['processed_' + field].to_numpy(dtype=object)
+                for column in self.categoryColumns:
+                    record[column] = chunk[column].astype(str).to_numpy(dtype=object)
+                for column in PIPELINE_NUMERIC_FIELDS.values():
+                    record[column] = chunk[column].to_numpy(dtype=np.float32)
+                yield record
+
+        signature = {'videoId': tf.TensorSpec((None,), tf.string), 'views': tf.TensorSpec((None,), tf.float32)}
+        signature.update({'processed_' + field: tf.TensorSpec((None,), tf.string) for field in PIPELINE_TEXT_FIELDS})
+        signature.update({column: tf.TensorSpec((None,), tf.string) for column in self.categoryColumns})
+        signature.update({column: tf.TensorSpec((None,), tf.float32) for column in PIPELINE_NUMERIC_FIELDS.values()})
+        # Chunks from the generator, records from there on
+        return tf.data.Dataset.from_generator(generate, output_signature=signature).unbatch()
+
+    def encoder(self):
+        """
+        The map function from a record to its (features, views) example.
+        """
+        import tensorflow as tf
+
+        wordIds = {}
+        for field, tokenizer in self.tokenizers.items():
+            if isinstance(tokenizer, HashingTokenizer):
+                numBuckets = tokenizer.num_words
+                wordIds[field] = lambda words, numBuckets=numBuckets: tf.strings.to_hash_bucket_fast(words, numBuckets - 1) + 1
+            else:
+                # Words past num_words get the OOV index, as texts_to_sequences gives them
+                words = [word for word, index in tokenizer.word_index.items() if index < tokenizer.num_words]
+                initializer = tf.lookup.KeyValueTensorInitializer(
+                    tf.constant(words, dtype=tf.string), tf.constant([tokenizer.word_index[word] for word in words], dtype=tf.int64))
+                wordIds[field] = tf.lookup.StaticHashTable(initializer, default_value=1).lookup
+
+        categoryTables = []
+        offset = 0
+        for column in self.categoryColumns:
+            vocabulary = self.categoryEncoder.vocabularies[column]
+            initializer = tf.lookup.KeyValueTensorInitializer(
+                tf.constant(list(vocabulary), dtype=tf.string), tf.constant([offset + i for i in vocabulary.values()], dtype=tf.int64))
+            categoryTables.append((column, tf.lookup.StaticHashTable(initializer, default_value=offset)))
+            offset += len(vocabulary) + 1
+
+        def encode(record):
+            features = {}
+            for field in PIPELINE_TEXT_FIELDS:
+                ids = wordIds[field](tf.strings.split(record['processed_' + field]))
+                length = self.lengths[field]
+                ids = ids[:length.maxLen] if length.keep == 'head' else ids[-length.maxLen:]
+                features[field] = tf.cast(ids, tf.int32)
+            for key, column in PIPELINE_NUMERIC_FIELDS.items():
+                scaler = self.scalers[key]
+                features[key] = tf.reshape((record[column] - float(scaler.mean_[0])) / float(scaler.scale_[0]), [1])
+            features['category'] = tf.cast(tf.stack([table.lookup(record[column]) for column, table in categoryTables]), tf.int32)
+            return features, record['views']
+
+        return encode
+
+    def dataset(self, split, inputs, batchSize=32, padded=True, seed=42):
+        """
+        Batches of one split as a tf.data.Dataset of (inputs, views).
+
+        Args:
+            split (str): 'train' (shuffled by seed), 'validation' or 'test'.
+            inputs (list): The model's inputs in order, each a feature name
+                ('title', 'description', 'channelTitle', 'category',
+                'subscriber' or 'daysSincePublication') or a list of them
+                concatenated into one input.
+            padded (bool): Pad texts to their fitted lengths. Otherwise
+                records of similar lengths are batched together and each text
+                is padded to its longest in the batch, rounded up by
+                bucketLength, the tf.data take on LengthBucketedBatches.
+        """
+        import tensorflow as tf
+
+        low, high = PIPELINE_SPLITS[split]
+        dataset = self.records().filter(lambda record: tf.logical_and(
+            tf.strings.to_hash_bucket_fast(record['videoId'], 100) >= low,
+            tf.strings.to_hash_bucket_fast(record['videoId'], 100) < high))
+        dataset = dataset.map(self.encoder(), num_parallel_calls=tf.data.AUTOTUNE)
+        if self.cacheDir:
+            os.makedirs(self.cacheDir, exist_ok=True)
+            dataset = dataset.cache(self.cachePath(split))
+        if split == 'train':
+            dataset = dataset.shuffle(PIPELINE_SHUFFLE_BUFFER, seed=seed, reshuffle_each_iteration=True)
+
+        shapes = {field: [self.lengths[field].maxLen if padded else None] for field in PIPELINE_TEXT_FIELDS}
+        shapes.update({key: [1] for key in PIPELINE_NUMERIC_FIELDS})
+        shapes['category'] = [len(self.categoryColumns)]
+        if padded:
+            dataset = dataset.padded_batch(batchSize, padded_shapes=(shapes, []))
+        else:
+            longest = sum(self.lengths[field].maxLen for field in PIPELINE_TEXT_FIELDS)
+            boundaries = [BUCKET_MIN_LENGTH * 2 ** i for i in range(32) if BUCKET_MIN_LENGTH * 2 ** i < longest]
+            dataset = dataset.bucket_by_sequence_length(
+                lambda features, views: tf.add_n([tf.shape(features[field])[0] for field in PIPELINE_TEXT_FIELDS]),
+                boundaries,
+                [batchSize] * (len(boundaries) + 1),
+                padded_shapes=(shapes, [])
+            )
+            # The bucketLength() of every width up to each field's fitted length
+            bucketSizes = {}
+            for field in PIPELINE_TEXT_FIELDS:
+                sizes = [BUCKET_MIN_LENGTH]
+                while sizes[-1] < self.lengths[field].maxLen:
+                    sizes.append(sizes[-1] * 2)
+                bucketSizes[field] = tf.constant(sizes, dtype=tf.int32)
+
+            def padToBucket(features, views):
+                # So batches come in a handful of shapes, and a batch of empty texts still has timesteps
+                features = dict(features)
+                for field, sizes in bucketSizes.items():
+                    width = tf.shape(features[field])[1]
+                    size = tf.gather(sizes, tf.searchsorted(sizes, tf.reshape(width, [1]))[0])
+                    features[field] = tf.pad(features[field], [[0, 0], [0, size - width]])
+                return features, views
+
+            dataset = dataset.map(padToBucket, num_parallel_calls=tf.data.AUTOTUNE)
+
+        def toInputs(features, views):
+            values = []
+            for entry in inputs:
+                if isinstance(entry, str):
+                    values.append(features[entry])
+                else:
+                    values.append(tf.concat([tf.cast(features[name], tf.float32) for name in entry], axis=1))
+            return (tuple(values) if len(values) > 1 else values[0]), views
 
-    except Exception as e:
-        print(f"Error fetching subscriber count for channel {channelId}: {e}")
-        return 0  # Return 0 in case of an error
+        return dataset.map(toInputs, num_parallel_calls=tf.data.AUTOTUNE).prefetch(tf.data.AUTOTUNE)
+
+
+def benchmarkBucketing(df, column='description', epochs=1, batchSize=32, maxWords=100000):
+    """
+    Time training epochs of a one-column BiLSTM regressor (the description
+    branch of the models) on sequences padded to the corpus maximum and on
+    length-bucketed batches.
+
+    Returns:
+        pandas.DataFrame: Seconds per epoch and padded timesteps per mode.
+    """
+    import tensorflow as tf
+    loadModelLibraries()
+
+    processed = textCache.preprocess(df[column])
+    tokenizer, sequences = textCache.tokenize(processed, maxWords)
+    maxLen = max(max((len(sequence) for sequence in sequences), default=0), 1)
+    y = df['views'].to_numpy(dtype=np.float32)
+
+    rows = []
+    for inputMode in ('padded', 'bucketed'):
+        bucketed = inputMode == 'bucketed'
+        tf.keras.utils.set_random_seed(42)
+        inputs = Input(shape=(None if bucketed else maxLen,))
+        embedded = Embedding(input_dim=tokenizer.num_words, output_dim=300, mask_zero=bucketed)(inputs)
+        pooled = MaskedGlobalMaxPooling1D()(Bidirectional(LSTM(units=128, return_sequences=True))(embedded))
+        model = Model(inputs=inputs, outputs=Dense(units=1, activation='linear')(pooled))
+        model.compile(optimizer='adam', loss='mean_squared_error')
+
+        if bucketed:
+            batches = LengthBucketedBatches([sequences], y, batchSize=batchSize)
+            data = batches.dataset().map(lambda features, target: (features[0], target))
+            timesteps = sum(bucketLength(int(batches.lengths[batchRows].max())) * len(batchRows) for batchRows in batches.batchRows())
+        else:
+            data = tf.data.Dataset.from_tensor_slices((featureStore.pad(sequences, maxLen), y)).batch(batchSize)
+            timesteps = maxLen * len(sequences)
+
+        # The first epoch also traces the model, so it is timed separately
+        epochStart = time.perf_counter()
+        model.fit(data, epochs=1, verbose=0)
+        firstEpoch = time.perf_counter() - epochStart
+        epochStart = time.perf_counter()
+        model.fit(data, epochs=epochs, verbose=0)
+        rows.append({
+            'inputMode': inputMode,
+            'firstEpochSeconds': firstEpoch,
+            'epochSeconds': (time.perf_counter() - epochStart) / epochs,
+            'paddedTimesteps': timesteps,
+            'realTimesteps': int(sum(len(sequence) for sequence in sequences)),
+        })
+
+    report = pd.DataFrame(rows)
+    print(report.to_string(index=False))
+    return report
+
+
+def benchmarkCategoryBranch(df, batchSize=32, repeats=50):
+    """
+    Time the category branch of neuralAllModel as it was (Tokenizer, padded
+    sequences, 300-wide embedding, Bidirectional LSTM and max pooling)
+    against the CategoricalEncoder lookup and small embedding: milliseconds
+    per training step of batchSize rows and per single-row prediction.
+
+    Returns:
+        pandas.DataFrame: One row per branch.
+    """
+    loadModelLibraries()
+    y = df['views'].to_numpy(dtype=np.float32)
+
+    tokenizer, sequences = textCache.tokenize(df['categoryId'].astype(str), 100000)
+    maxLen = max(len(sequence) for sequence in sequences)
+    sequenceInput = Input(shape=(maxLen,))
+    recurrent = GlobalMaxPooling1D()(Bidirectional(LSTM(units=128, return_sequences=True))(Embedding(input_dim=tokenizer.num_words, output_dim=300)(sequenceInput)))
+
+    encoder = CategoricalEncoder().fit(df)
+    idInput = Input(shape=(1,))
+    lookup = Flatten()(Embedding(input_dim=encoder.num_words, output_dim=encoder.embeddingDim())(idInput))
+
+    branches = {
+        'lstm': (Model(sequenceInput, Dense(units=1)(recurrent)), featureStore.pad(sequences, maxLen)),
+        'lookup': (Model(idInput, Dense(units=1)(lookup)), encoder.transform(df)),
+    }
+    rows = []
+    for name, (model, X) in branches.items():
+        model.compile(optimizer='adam', loss='mean_squared_error')
+        batch, target, single = np.asarray(X[:batchSize]), y[:batchSize], np.asarray(X[:1])
+        # The first calls trace the functions
+        model.train_on_batch(batch, target)
+        model.predict_on_batch(single)
+        rows.append({
+            'branch': name,
+            'params': model.count_params(),
+            'stepMs': timeit.timeit(lambda: model.train_on_batch(batch, target), number=repeats) / repeats * 1000,
+            'latencyMs': timeit.timeit(lambda: model.predict_on_batch(single), number=repeats) / repeats * 1000,
+        })
+
+    report = pd.DataFrame(rows)
+    print(report.to_string(index=False))
+    return report
 
 
-# Preprocessing and cleaning the text data
 def preprocessText(text):
     # Convert to lowercase
     text = text.lower()
     
     # Remove punctuation
-    text = text.translate(str.maketrans('', '', string.punctuation))
+    text = text.translate(PUNCTUATION_TABLE)
     
     # Tokenization
+    ensureNltkResources()
+    from nltk.tokenize import word_tokenize
     tokens = word_tokenize(text)
     
     # Remove stop words
-    stopWords2 = set(stopwords.words('english') + list(ENGLISH_STOP_WORDS))
+    stopWords2 = getStopWords()
     tokens = [token for token in tokens if token not in stopWords2]
     
     return ' '.join(tokens)
 
 
-# Creates a model based only on title using neural network
-def neuralTitleModel(df):
-        
-    #PART 2
-    df['processed_title'] = df['title'].apply(preprocessText)
-    print(df)
+PERFORMANCE_INTER_OP_THREADS = 2  # Independent ops at a time, e.g. the text branches' LSTMs
 
-    # Tokenize titles
-    max_words = 100000  # Adjust based on your dataset
-    tokenizer = Tokenizer(num_words=max_words, oov_token="<OOV>")
-    tokenizer.fit_on_texts(df['processed_title'])
-    sequences = tokenizer.texts_to_sequences(df['processed_title'])
 
-    # Pad sequences
-    max_len = max(len(seq) for seq in sequences)
-    padded_sequences = pad_sequences(sequences, maxlen=max_len, padding='post')
+class PerformanceMode:
+    """
+    Opt-in CPU tuning of TensorFlow for the models.
+
+    enable() turns on XLA for the train and predict steps of every model
+    compiled afterwards (compile(jit_compile=True)), and sizes TensorFlow's
+    intra-op (within one op) and inter-op (ops at a time) thread pools. With
+    bfloat16, it also sets Keras' mixed_bfloat16 policy, which oneDNN runs
+    on the bfloat16 units of recent Xeons (AVX512-BF16, AMX), while the
+    models keep their output layer and loss in float32.
 
+    TensorFlow fixes its thread pools when it runs its first op, so enable()
+    has to be called before any model is built.
+    """
 
-    #PART 4
-    # Split the dataset into training and testing sets
-    X = padded_sequences  # Features
-    y = df['views']  # Target variable
+    def __init__(self):
+        self.jitCompile = False
+        self.bfloat16 = False
 
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    def enable(self, jitCompile=True, tuneThreads=True, intraOpThreads=None, interOpThreads=PERFORMANCE_INTER_OP_THREADS, bfloat16=False):
+        """
+        Args:
+            tuneThreads (bool): Size the thread pools, or leave TensorFlow's defaults.
+            intraOpThreads (int): Threads within one op, all cores by default.
+            interOpThreads (int): Ops run at a time.
+        """
+        # oneDNN kernels are on by default on x86 Linux; TensorFlow reads this once at import
+        os.environ.setdefault('TF_ENABLE_ONEDNN_OPTS', '1')
+        import tensorflow as tf
 
+        if tuneThreads:
+            try:
+                tf.config.threading.set_intra_op_parallelism_threads(intraOpThreads or os.cpu_count() or 1)
+                tf.config.threading.set_inter_op_parallelism_threads(interOpThreads)
+            except RuntimeError as e:
+                raise RuntimeError('performanceMode.enable() must be called before TensorFlow runs anything') from e
+        if bfloat16:
+            tf.keras.mixed_precision.set_global_policy('mixed_bfloat16')
+        self.jitCompile = jitCompile
+        self.bfloat16 = bfloat16
 
-    #PART 5
-    # Build a neural network model
-    embedding_dim = 300  # You can adjust this based on your dataset and experiment
-    lstm_units = 128  # You can adjust this based on your dataset and experiment
 
-    model = Sequential()
-    model.add(Embedding(input_dim=max_words, output_dim=embedding_dim, input_length=max_len))
-    model.add(Bidirectional(LSTM(units=lstm_units, return_sequences=True)))
-    model.add(GlobalMaxPooling1D())
-    model.add(Dense(units=128, activation='relu'))
-    model.add(Dropout(0.5))
-    model.add(Dense(units=1, activation='linear'))
+# The model functions and buildModel compile with performanceMode.jitCompile
+performanceMode = PerformanceMode()
 
-    # Compile the model
-    model.compile(optimizer='adam', loss='mean_squared_error')
 
-    # Display the model summary
-    model.summary()
+# The Keras model each model function built last, by function name (by variant for trainAllVariants)
+trainedModels = {}
 
-    #PART 6
-    # Train the model
-    model.fit(X_train, y_train, epochs=10, batch_size=32, validation_split=0.2)
 
-    # Evaluate the model on the test set
-    loss = model.evaluate(X_test, y_test)
+def trainModelFunction(name, variant, df, inputMode='padded', lengthPolicies=None, minWordCount=1, hashBuckets=None, channelIdEmbedding=False, pipeline=None,
+                       epochs=10, runName=None):
+    """
+    What every model function does before its example predictions: fit the
+    features of its MODEL_SPECS variant on df (or take the pipeline's),
+    keep them in featureStore under the function's name, and train and
+    evaluate the variant with trainVariant.
+
+    Args:
+        epochs (int): Most epochs, which stops early (see TrainingRun).
+        runName (str): Checkpoint training as this run, and resume it if an
+            earlier call was interrupted.
+
+    Returns:
+        tuple: (model, features).
+    """
+    spec = MODEL_SPECS[variant]
+    if pipeline is not None:
+        # Features were fitted by the pipeline's pass over its files, with its own settings
+        features = pipeline
+    else:
+        features = FeatureSet(df, lengthPolicies, minWordCount, hashBuckets, channelIdEmbedding, textFields=spec['text'])
+    # Keep the features for batch scoring and other training processes
+    features.saveManifest(name)
+
+    model, loss = trainVariant(spec, features, inputMode, epochs, run=TrainingRun(runName))
+    trainedModels[name] = model
+    model.summary()
     print(f'Mean Squared Error on Test Set: {loss}')
+    return model, features
+
+
+def predictViewCount(model, features, variant, video, inputMode='padded'):
+    """
+    Predict the views of one new video with a model trained by
+    trainModelFunction.
+
+    Args:
+        video (dict): The video's title, description, channelTitle,
+            categoryId, channelId, subscriberCount and daysSincePublication,
+            or those of them the variant reads.
+
+    Returns:
+        float: The predicted view count.
+    """
+    values = {}
+    for field in MODEL_SPECS[variant]['text']:
+        sequences = features.tokenizers[field].texts_to_sequences([preprocessText(video[field])])
+        values[field] = padForPrediction(sequences, features.lengths[field], inputMode == 'bucketed')
+    for key, column in PIPELINE_NUMERIC_FIELDS.items():
+        if column in video:
+            values[key] = features.scalers[key].transform(pd.DataFrame({column: [video[column]]}))
+    values['category'] = features.categoryEncoder.transform(pd.DataFrame([{column: video.get(column) for column in features.categoryEncoder.columns}]))
+
+    inputs = []
+    for entry in modelInputs(MODEL_SPECS[variant]):
+        if isinstance(entry, str):
+            inputs.append(values[entry])
+        else:
+            # Features appended to one another, as in FeatureSet.inputArray
+            inputs.append(np.concatenate([np.asarray(values[name], dtype=np.float32) for name in entry], axis=1))
+    prediction = model.predict(inputs if len(inputs) > 1 else inputs[0])
+    return prediction[0][0]
+
+
+# Creates a model based only on title using neural network
+def neuralTitleModel(df, lengthPolicies=None, minWordCount=1, hashBuckets=None, pipeline=None, epochs=10, runName=None):
+    model, features = trainModelFunction('neuralTitleModel', 'title', df, lengthPolicies=lengthPolicies, minWordCount=minWordCount, hashBuckets=hashBuckets, pipeline=pipeline, epochs=epochs, runName=runName)
 
-    #PART 7
     # Make predictions on new data
     def predict_view_count(title):
-        processed_title = preprocessText(title)
-        sequence = tokenizer.texts_to_sequences([processed_title])
-        padded_sequence = pad_sequences(sequence, maxlen=max_len, padding='post')
-        # scaled_sequence = scaler.transform(padded_sequence)
-        # prediction = model.predict(scaled_sequence)
-        prediction = model.predict(padded_sequence)
-        return prediction[0][0]
+        return predictViewCount(model, features, 'title', {'title': title})
 
     # Example usage
     new_title = "I Survived 100 Days in Canada"
@@ -729,69 +3181,17 @@ def neuralTitleModel(df):
     new_title = "$1 VS $1,000 Water"
     predicted_views = predict_view_count(new_title)
     print(f'Predicted Views for "{new_title}": {predicted_views}')
-    
-    
+
     return predicted_views
 
 
 # Creates a model based on title and subscriber count using neural network
-def neuralTitleSubscriberModel(df):
-    # Part 2: Preprocessing
-    df['processed_title'] = df['title'].apply(preprocessText)
-
-    # Tokenize titles
-    max_words = 100000  # Adjust based on your dataset
-    tokenizer = Tokenizer(num_words=max_words, oov_token="<OOV>")
-    tokenizer.fit_on_texts(df['processed_title'])
-    sequences = tokenizer.texts_to_sequences(df['processed_title'])
-    max_len = max(len(seq) for seq in sequences)
-    padded_sequences = pad_sequences(sequences, maxlen=max_len, padding='post')
-
-    # Part 2.1: Add subscriber count as a feature
-    scaler = StandardScaler()
-    subscriber_count_scaled = scaler.fit_transform(df[['subscriberCount']])
-
-    # Combine title and subscriber count features
-    X = np.concatenate([padded_sequences, subscriber_count_scaled], axis=1)
-
-    y = df['views']  # Target variable
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-    # Part 3: Build a neural network model
-    embedding_dim = 300
-    lstm_units = 128
-
-    model = Sequential()
-    model.add(Embedding(input_dim=max_words, output_dim=embedding_dim, input_length=max_len + 1))  # +1 for subscriber count
-    model.add(Bidirectional(LSTM(units=lstm_units, return_sequences=True)))
-    model.add(GlobalMaxPooling1D())
-    model.add(Dense(units=128, activation='relu'))
-    model.add(Dropout(0.5))
-    model.add(Dense(units=1, activation='linear'))
-
-    # Compile the model
-    model.compile(optimizer='adam', loss='mean_squared_error')
-
-    # Display the model summary
-    model.summary()
-
-    # Part 4: Train the model
-    model.fit(X_train, y_train, epochs=10, batch_size=32, validation_split=0.2)
-
-    # Part 5: Evaluate the model on the test set
-    loss = model.evaluate(X_test, y_test)
-    print(f'Mean Squared Error on Test Set: {loss}')
+def neuralTitleSubscriberModel(df, lengthPolicies=None, minWordCount=1, hashBuckets=None, pipeline=None, epochs=10, runName=None):
+    model, features = trainModelFunction('neuralTitleSubscriberModel', 'titleSubscriber', df, lengthPolicies=lengthPolicies, minWordCount=minWordCount, hashBuckets=hashBuckets, pipeline=pipeline, epochs=epochs, runName=runName)
 
-    # Part 6: Make predictions on new data
+    # Make predictions on new data
     def predict_view_count(title, subscriber_count):
-        processed_title = preprocessText(title)
-        sequence = tokenizer.texts_to_sequences([processed_title])
-        padded_sequence = pad_sequences(sequence, maxlen=max_len, padding='post')
-        subscriber_count_scaled = scaler.transform([[subscriber_count]])
-        # Combine title and subscriber count features
-        features = np.concatenate([padded_sequence, subscriber_count_scaled], axis=1)
-        prediction = model.predict(features)
-        return prediction[0][0]
+        return predictViewCount(model, features, 'titleSubscriber', {'title': title, 'subscriberCount': subscriber_count})
 
     # Example usage
     new_title = "I Survived 100 Days in Canada"
@@ -808,94 +3208,12 @@ def neuralTitleSubscriberModel(df):
 
 
 # New function to train the model based on title, subscribers, and days since publication
-def neuralTSDateModel(df):
-    # Part 2: Preprocessing
-    df['processed_title'] = df['title'].apply(preprocessText)
-
-
-    # Tokenize titles
-    max_words = 100000  # Adjust based on your dataset
-    tokenizer = Tokenizer(num_words=max_words, oov_token="<OOV>")
-    tokenizer.fit_on_texts(df['processed_title'])
-    sequences = tokenizer.texts_to_sequences(df['processed_title'])
-    max_len = max(len(seq) for seq in sequences)
-    padded_sequences = pad_sequences(sequences, maxlen=max_len, padding='post')
-
-    # Add subscriber count as a feature
-    scaler_subscriber = StandardScaler()
-    subscriber_count_scaled = scaler_subscriber.fit_transform(df[['subscriberCount']])
-
-    # Add days since publication as a feature
-    df['publishedAt'] = pd.to_datetime(df['publishedAt'])
-    df['daysSincePublication'] = (pd.to_datetime('today').tz_localize('UTC') - df['publishedAt']).dt.days
-    scaler_days_since_publication = StandardScaler()
-    days_since_publication_scaled = scaler_days_since_publication.fit_transform(df[['daysSincePublication']])
-
-    # Combine title, subscriber count, and days since publication features
-    X_title = padded_sequences
-    X_subscriber = subscriber_count_scaled
-    X_days_since_publication = days_since_publication_scaled
-
-    # Define inputs using Keras Functional API
-    input_title = Input(shape=(max_len,), name='title_input')
-    input_subscriber = Input(shape=(1,), name='subscriber_input')
-    input_days_since_publication = Input(shape=(1,), name='days_since_publication_input')
-
-    # Embedding layer for title
-    embedding_dim = 300
-    title_embedding = Embedding(input_dim=max_words, output_dim=embedding_dim, input_length=max_len)(input_title)
-    title_lstm = Bidirectional(LSTM(units=128, return_sequences=True))(title_embedding)
-    title_pooled = GlobalMaxPooling1D()(title_lstm)
-
-    # Fully connected layer for subscriber count
-    subscriber_dense = Dense(units=64, activation='relu')(input_subscriber)
-
-    # Fully connected layer for days since publication
-    days_dense = Dense(units=64, activation='relu')(input_days_since_publication)
-
-    # Concatenate the outputs from different branches
-    merged = Concatenate()([title_pooled, subscriber_dense, days_dense])
-
-    # Final fully connected layers
-    merged_dense = Dense(units=128, activation='relu')(merged)
-    merged_dropout = Dropout(0.5)(merged_dense)
-    output_layer = Dense(units=1, activation='linear')(merged_dropout)
-
-    # Build the model using the Functional API
-    model = Model(inputs=[input_title, input_subscriber, input_days_since_publication], outputs=output_layer)
-
-    # Compile the model
-    model.compile(optimizer='adam', loss='mean_squared_error')
-
-    # Display the model summary
-    model.summary()
-
-    y = df['views']  # Target variable
-    # Split each input separately
-    X_title_train, X_title_test, X_subscriber_train, X_subscriber_test, X_days_train, X_days_test, y_train, y_test = train_test_split(
-        X_title, X_subscriber, X_days_since_publication, y, test_size=0.2, random_state=42)
+def neuralTSDateModel(df, lengthPolicies=None, minWordCount=1, hashBuckets=None, pipeline=None, epochs=10, runName=None):
+    model, features = trainModelFunction('neuralTSDateModel', 'tsDate', df, lengthPolicies=lengthPolicies, minWordCount=minWordCount, hashBuckets=hashBuckets, pipeline=pipeline, epochs=epochs, runName=runName)
 
-    # Train the model
-    model.fit([X_title_train, X_subscriber_train, X_days_train], y_train, epochs=10, batch_size=32, validation_split=0.2)
-
-    # Evaluate the model on the test set
-    loss = model.evaluate([X_title_test, X_subscriber_test, X_days_test], y_test)
-    print(f'Mean Squared Error on Test Set: {loss}')
-
-        
     # Make predictions on new data
     def predict_view_count(title, subscriber_count, days_since_publication):
-        processed_title = preprocessText(title)
-        sequence = tokenizer.texts_to_sequences([processed_title])
-        padded_sequence = pad_sequences(sequence, maxlen=max_len, padding='post')
-        subscriber_count_scaled = scaler_subscriber.transform([[subscriber_count]])
-        days_since_publication_scaled = scaler_days_since_publication.transform([[days_since_publication]])
-        
-        # Prepare input for prediction
-        X_pred = [padded_sequence, subscriber_count_scaled, days_since_publication_scaled]
-
-        prediction = model.predict(X_pred)
-        return prediction[0][0]
+        return predictViewCount(model, features, 'tsDate', {'title': title, 'subscriberCount': subscriber_count, 'daysSincePublication': days_since_publication})
 
     # Example usage
     published_at = pd.to_datetime('2023-01-01')  # Assuming the videos were published at the start of the year
@@ -915,119 +3233,14 @@ def neuralTSDateModel(df):
     return predicted_views
 
 
-
 # New function to train the model based on title, subscribers, days since publication, and description
-def neuralTSDDescriptionModel(df):
-    # Part 2: Preprocessing
-    df['processed_title'] = df['title'].apply(preprocessText)
-    df['processed_description'] = df['description'].apply(preprocessText)
-
-
-    # Tokenize titles and descriptions
-    max_words_title = 100000  # Adjust based on your dataset
-    max_words_description = 100000  # Adjust based on your dataset
-
-    tokenizer_title = Tokenizer(num_words=max_words_title, oov_token="<OOV>")
-    tokenizer_description = Tokenizer(num_words=max_words_description, oov_token="<OOV>")
-
-    tokenizer_title.fit_on_texts(df['processed_title'])
-    tokenizer_description.fit_on_texts(df['processed_description'])
-
-    sequences_title = tokenizer_title.texts_to_sequences(df['processed_title'])
-    sequences_description = tokenizer_description.texts_to_sequences(df['processed_description'])
-
-    max_len_title = max(len(seq) for seq in sequences_title)
-    max_len_description = max(len(seq) for seq in sequences_description)
-
-    padded_sequences_title = pad_sequences(sequences_title, maxlen=max_len_title, padding='post')
-    padded_sequences_description = pad_sequences(sequences_description, maxlen=max_len_description, padding='post')
-
-    # Add subscriber count as a feature
-    scaler_subscriber = StandardScaler()
-    subscriber_count_scaled = scaler_subscriber.fit_transform(df[['subscriberCount']])
-
-    # Add days since publication as a feature
-    df['publishedAt'] = pd.to_datetime(df['publishedAt'])
-    df['daysSincePublication'] = (pd.to_datetime('today').tz_localize('UTC') - df['publishedAt']).dt.days
-    scaler_days_since_publication = StandardScaler()
-    days_since_publication_scaled = scaler_days_since_publication.fit_transform(df[['daysSincePublication']])
-
-    # Combine title, description, subscriber count, and days since publication features
-    X_title = padded_sequences_title
-    X_description = padded_sequences_description
-    X_subscriber = subscriber_count_scaled
-    X_days_since_publication = days_since_publication_scaled
-
-    # Define inputs using Keras Functional API
-    input_title = Input(shape=(max_len_title,), name='title_input')
-    input_description = Input(shape=(max_len_description,), name='description_input')
-    input_subscriber = Input(shape=(1,), name='subscriber_input')
-    input_days_since_publication = Input(shape=(1,), name='days_since_publication_input')
-
-    # Embedding layer for title and description
-    embedding_dim = 300
-    title_embedding = Embedding(input_dim=max_words_title, output_dim=embedding_dim, input_length=max_len_title)(input_title)
-    description_embedding = Embedding(input_dim=max_words_description, output_dim=embedding_dim, input_length=max_len_description)(input_description)
-
-    title_lstm = Bidirectional(LSTM(units=128, return_sequences=True))(title_embedding)
-    description_lstm = Bidirectional(LSTM(units=128, return_sequences=True))(description_embedding)
-
-    title_pooled = GlobalMaxPooling1D()(title_lstm)
-    description_pooled = GlobalMaxPooling1D()(description_lstm)
-
-    # Fully connected layer for subscriber count
-    subscriber_dense = Dense(units=64, activation='relu')(input_subscriber)
-
-    # Fully connected layer for days since publication
-    days_dense = Dense(units=64, activation='relu')(input_days_since_publication)
-
-    # Concatenate the outputs from different branches
-    merged = Concatenate()([title_pooled, description_pooled, subscriber_dense, days_dense])
-
-    # Final fully connected layers
-    merged_dense = Dense(units=128, activation='relu')(merged)
-    merged_dropout = Dropout(0.5)(merged_dense)
-    output_layer = Dense(units=1, activation='linear')(merged_dropout)
-
-    # Build the model using the Functional API
-    model = Model(inputs=[input_title, input_description, input_subscriber, input_days_since_publication], outputs=output_layer)
-
-    # Compile the model
-    model.compile(optimizer='adam', loss='mean_squared_error')
-
-    # Display the model summary
-    model.summary()
-
-    y = df['views']  # Target variable
-    # Split each input separately
-    X_title_train, X_title_test, X_description_train, X_description_test, X_subscriber_train, X_subscriber_test, X_days_train, X_days_test, y_train, y_test = train_test_split(
-        X_title, X_description, X_subscriber, X_days_since_publication, y, test_size=0.2, random_state=42)
-
-    # Train the model
-    model.fit([X_title_train, X_description_train, X_subscriber_train, X_days_train], y_train, epochs=10, batch_size=32, validation_split=0.2)
-
-    # Evaluate the model on the test set
-    loss = model.evaluate([X_title_test, X_description_test, X_subscriber_test, X_days_test], y_test)
-    print(f'Mean Squared Error on Test Set: {loss}')
+def neuralTSDDescriptionModel(df, inputMode='padded', lengthPolicies=None, minWordCount=1, hashBuckets=None, pipeline=None, epochs=10, runName=None):
+    model, features = trainModelFunction('neuralTSDDescriptionModel', 'tsdDescription', df, inputMode, lengthPolicies, minWordCount, hashBuckets, pipeline=pipeline, epochs=epochs, runName=runName)
 
     # Make predictions on new data
     def predict_view_count(title, description, subscriber_count, days_since_publication):
-        processed_title = preprocessText(title)
-        processed_description = preprocessText(description)
-        sequence_title = tokenizer_title.texts_to_sequences([processed_title])
-        sequence_description = tokenizer_description.texts_to_sequences([processed_description])
-
-        padded_sequence_title = pad_sequences(sequence_title, maxlen=max_len_title, padding='post')
-        padded_sequence_description = pad_sequences(sequence_description, maxlen=max_len_description, padding='post')
-
-        subscriber_count_scaled = scaler_subscriber.transform([[subscriber_count]])
-        days_since_publication_scaled = scaler_days_since_publication.transform([[days_since_publication]])
-
-        # Prepare input for prediction
-        X_pred = [padded_sequence_title, padded_sequence_description, subscriber_count_scaled, days_since_publication_scaled]
-
-        prediction = model.predict(X_pred)
-        return prediction[0][0]
+        video = {'title': title, 'description': description, 'subscriberCount': subscriber_count, 'daysSincePublication': days_since_publication}
+        return predictViewCount(model, features, 'tsdDescription', video, inputMode)
 
     # Example usage
     published_at = pd.to_datetime('2023-01-01')  # Assuming the videos were published at the start of the year
@@ -1048,130 +3261,13 @@ def neuralTSDDescriptionModel(df):
 
 
 # New function to train the model based on title, subscribers, days since publication, description, and channel title
-def neuralTSDDChannelModel(df):
-    # Part 2: Preprocessing
-    df['processed_title'] = df['title'].apply(preprocessText)
-    df['processed_description'] = df['description'].apply(preprocessText)
-    df['processed_channel_title'] = df['channelTitle'].apply(preprocessText)
-
-
-    # Tokenize titles, descriptions, and channel titles
-    max_words_title = 100000  # Adjust based on your dataset
-    max_words_description = 100000  # Adjust based on your dataset
-    max_words_channel_title = 100000  # Adjust based on your dataset
-
-    tokenizer_title = Tokenizer(num_words=max_words_title, oov_token="<OOV>")
-    tokenizer_description = Tokenizer(num_words=max_words_description, oov_token="<OOV>")
-    tokenizer_channel_title = Tokenizer(num_words=max_words_channel_title, oov_token="<OOV>")
-
-    tokenizer_title.fit_on_texts(df['processed_title'])
-    tokenizer_description.fit_on_texts(df['processed_description'])
-    tokenizer_channel_title.fit_on_texts(df['processed_channel_title'])
-
-    sequences_title = tokenizer_title.texts_to_sequences(df['processed_title'])
-    sequences_description = tokenizer_description.texts_to_sequences(df['processed_description'])
-    sequences_channel_title = tokenizer_channel_title.texts_to_sequences(df['processed_channel_title'])
-
-    max_len_title = max(len(seq) for seq in sequences_title)
-    max_len_description = max(len(seq) for seq in sequences_description)
-    max_len_channel_title = max(len(seq) for seq in sequences_channel_title)
-
-    padded_sequences_title = pad_sequences(sequences_title, maxlen=max_len_title, padding='post')
-    padded_sequences_description = pad_sequences(sequences_description, maxlen=max_len_description, padding='post')
-    padded_sequences_channel_title = pad_sequences(sequences_channel_title, maxlen=max_len_channel_title, padding='post')
-
-    # Add subscriber count as a feature
-    scaler_subscriber = StandardScaler()
-    subscriber_count_scaled = scaler_subscriber.fit_transform(df[['subscriberCount']])
-
-    # Add days since publication as a feature
-    df['publishedAt'] = pd.to_datetime(df['publishedAt'])
-    df['daysSincePublication'] = (pd.to_datetime('today').tz_localize('UTC') - df['publishedAt']).dt.days
-    scaler_days_since_publication = StandardScaler()
-    days_since_publication_scaled = scaler_days_since_publication.fit_transform(df[['daysSincePublication']])
-
-    # Combine title, description, subscriber count, days since publication, and channel title features
-    X_title = padded_sequences_title
-    X_description = padded_sequences_description
-    X_channel_title = padded_sequences_channel_title
-    X_subscriber = subscriber_count_scaled
-    X_days_since_publication = days_since_publication_scaled
-
-    # Define inputs using Keras Functional API
-    input_title = Input(shape=(max_len_title,), name='title_input')
-    input_description = Input(shape=(max_len_description,), name='description_input')
-    input_channel_title = Input(shape=(max_len_channel_title,), name='channel_title_input')
-    input_subscriber = Input(shape=(1,), name='subscriber_input')
-    input_days_since_publication = Input(shape=(1,), name='days_since_publication_input')
-
-    # Embedding layer for title, description, and channel title
-    embedding_dim = 300
-    title_embedding = Embedding(input_dim=max_words_title, output_dim=embedding_dim, input_length=max_len_title)(input_title)
-    description_embedding = Embedding(input_dim=max_words_description, output_dim=embedding_dim, input_length=max_len_description)(input_description)
-    channel_title_embedding = Embedding(input_dim=max_words_channel_title, output_dim=embedding_dim, input_length=max_len_channel_title)(input_channel_title)
-
-    title_lstm = Bidirectional(LSTM(units=128, return_sequences=True))(title_embedding)
-    description_lstm = Bidirectional(LSTM(units=128, return_sequences=True))(description_embedding)
-    channel_title_lstm = Bidirectional(LSTM(units=128, return_sequences=True))(channel_title_embedding)
-
-    title_pooled = GlobalMaxPooling1D()(title_lstm)
-    description_pooled = GlobalMaxPooling1D()(description_lstm)
-    channel_title_pooled = GlobalMaxPooling1D()(channel_title_lstm)
-
-    # Fully connected layer for subscriber count
-    subscriber_dense = Dense(units=64, activation='relu')(input_subscriber)
-
-    # Fully connected layer for days since publication
-    days_dense = Dense(units=64, activation='relu')(input_days_since_publication)
-
-    # Concatenate the outputs from different branches
-    merged = Concatenate()([title_pooled, description_pooled, channel_title_pooled, subscriber_dense, days_dense])
-
-    # Final fully connected layers
-    merged_dense = Dense(units=128, activation='relu')(merged)
-    merged_dropout = Dropout(0.5)(merged_dense)
-    output_layer = Dense(units=1, activation='linear')(merged_dropout)
-
-    # Build the model using the Functional API
-    model = Model(inputs=[input_title, input_description, input_channel_title, input_subscriber, input_days_since_publication], outputs=output_layer)
-
-    # Compile the model
-    model.compile(optimizer='adam', loss='mean_squared_error')
-
-    # Display the model summary
-    model.summary()
-
-    y = df['views']  # Target variable
-    # Split each input separately
-    X_title_train, X_title_test, X_description_train, X_description_test, X_channel_title_train, X_channel_title_test, X_subscriber_train, X_subscriber_test, X_days_train, X_days_test, y_train, y_test = train_test_split(
-        X_title, X_description, X_channel_title, X_subscriber, X_days_since_publication, y, test_size=0.2, random_state=42)
-
-    # Train the model
-    model.fit([X_title_train, X_description_train, X_channel_title_train, X_subscriber_train, X_days_train], y_train, epochs=10, batch_size=32, validation_split=0.2)
-
-    # Evaluate the model on the test set
-    loss = model.evaluate([X_title_test, X_description_test, X_channel_title_test, X_subscriber_test, X_days_test], y_test)
-    print(f'Mean Squared Error on Test Set: {loss}')
+def neuralTSDDChannelModel(df, inputMode='padded', lengthPolicies=None, minWordCount=1, hashBuckets=None, pipeline=None, epochs=10, runName=None):
+    model, features = trainModelFunction('neuralTSDDChannelModel', 'tsddChannel', df, inputMode, lengthPolicies, minWordCount, hashBuckets, pipeline=pipeline, epochs=epochs, runName=runName)
 
     # Make predictions on new data
     def predict_view_count(title, description, channel_title, subscriber_count, days_since_publication):
-        processed_title = preprocessText(title)
-        processed_description = preprocessText(description)
-        processed_channel_title = preprocessText(channel_title)
-
-        sequences_title = tokenizer_title.texts_to_sequences([processed_title])
-        sequences_description = tokenizer_description.texts_to_sequences([processed_description])
-        sequences_channel_title = tokenizer_channel_title.texts_to_sequences([processed_channel_title])
-
-        padded_sequences_title = pad_sequences(sequences_title, maxlen=max_len_title, padding='post')
-        padded_sequences_description = pad_sequences(sequences_description, maxlen=max_len_description, padding='post')
-        padded_sequences_channel_title = pad_sequences(sequences_channel_title, maxlen=max_len_channel_title, padding='post')
-
-        subscriber_count_scaled = scaler_subscriber.transform([[subscriber_count]])
-        days_since_publication_scaled = scaler_days_since_publication.transform([[days_since_publication]])
-
-        prediction = model.predict([padded_sequences_title, padded_sequences_description, padded_sequences_channel_title, subscriber_count_scaled, days_since_publication_scaled])[0][0]
-        return prediction
+        video = {'title': title, 'description': description, 'channelTitle': channel_title, 'subscriberCount': subscriber_count, 'daysSincePublication': days_since_publication}
+        return predictViewCount(model, features, 'tsddChannel', video, inputMode)
 
     # Example usage:
     published_at = pd.to_datetime('2023-01-01')  # Assuming the videos were published at the start of the year
@@ -1190,146 +3286,16 @@ def neuralTSDDChannelModel(df):
     print(f'Predicted Views for "{new_title}": {predicted_views}')
     return predicted_views
 
-# New function to train the model based on title, subscribers, days since publication, description, channel title, and categoryID
-def neuralAllModel(df):
-    # Part 2: Preprocessing
-    df['processed_title'] = df['title'].apply(preprocessText)
-    df['processed_description'] = df['description'].apply(preprocessText)
-    df['processed_channel_title'] = df['channelTitle'].apply(preprocessText)
-
-    # Tokenize titles, descriptions, and channel titles
-    max_words_title = 100000  # Adjust based on your dataset
-    max_words_description = 100000  # Adjust based on your dataset
-    max_words_channel_title = 100000  # Adjust based on your dataset
-    max_words_category = 100000  # Adjust based on your dataset
-
-    tokenizer_title = Tokenizer(num_words=max_words_title, oov_token="<OOV>")
-    tokenizer_description = Tokenizer(num_words=max_words_description, oov_token="<OOV>")
-    tokenizer_channel_title = Tokenizer(num_words=max_words_channel_title, oov_token="<OOV>")
-    tokenizer_category = Tokenizer(num_words=max_words_category, oov_token="<OOV>")
-
-    tokenizer_title.fit_on_texts(df['processed_title'])
-    tokenizer_description.fit_on_texts(df['processed_description'])
-    tokenizer_channel_title.fit_on_texts(df['processed_channel_title'])
-    tokenizer_category.fit_on_texts(df['categoryId'].astype(str))
-
-    sequences_title = tokenizer_title.texts_to_sequences(df['processed_title'])
-    sequences_description = tokenizer_description.texts_to_sequences(df['processed_description'])
-    sequences_channel_title = tokenizer_channel_title.texts_to_sequences(df['processed_channel_title'])
-    sequences_category = tokenizer_category.texts_to_sequences(df['categoryId'].astype(str))
-
-    max_len_title = max(len(seq) for seq in sequences_title)
-    max_len_description = max(len(seq) for seq in sequences_description)
-    max_len_channel_title = max(len(seq) for seq in sequences_channel_title)
-    max_len_category = max(len(seq) for seq in sequences_category)
-
-    padded_sequences_title = pad_sequences(sequences_title, maxlen=max_len_title, padding='post')
-    padded_sequences_description = pad_sequences(sequences_description, maxlen=max_len_description, padding='post')
-    padded_sequences_channel_title = pad_sequences(sequences_channel_title, maxlen=max_len_channel_title, padding='post')
-    padded_sequences_category = pad_sequences(sequences_category, maxlen=max_len_category, padding='post')
-
-    # Add subscriber count as a feature
-    scaler_subscriber = StandardScaler()
-    subscriber_count_scaled = scaler_subscriber.fit_transform(df[['subscriberCount']])
-
-    # Add days since publication as a feature
-    df['publishedAt'] = pd.to_datetime(df['publishedAt'])
-    df['daysSincePublication'] = (pd.to_datetime('today').tz_localize('UTC') - df['publishedAt']).dt.days
-    scaler_days_since_publication = StandardScaler()
-    days_since_publication_scaled = scaler_days_since_publication.fit_transform(df[['daysSincePublication']])
-
-    # Combine title, description, channel title, subscriber count, days since publication, and category features
-    X_title = padded_sequences_title
-    X_description = padded_sequences_description
-    X_channel_title = padded_sequences_channel_title
-    X_category = padded_sequences_category
-    X_subscriber = subscriber_count_scaled
-    X_days_since_publication = days_since_publication_scaled
-
-    # Define inputs using Keras Functional API
-    input_title = Input(shape=(max_len_title,), name='title_input')
-    input_description = Input(shape=(max_len_description,), name='description_input')
-    input_channel_title = Input(shape=(max_len_channel_title,), name='channel_title_input')
-    input_category = Input(shape=(max_len_category,), name='category_input')
-    input_subscriber = Input(shape=(1,), name='subscriber_input')
-    input_days_since_publication = Input(shape=(1,), name='days_since_publication_input')
-
-    # Embedding layer for title, description, channel title, and category
-    embedding_dim = 300
-    title_embedding = Embedding(input_dim=max_words_title, output_dim=embedding_dim, input_length=max_len_title)(input_title)
-    description_embedding = Embedding(input_dim=max_words_description, output_dim=embedding_dim, input_length=max_len_description)(input_description)
-    channel_title_embedding = Embedding(input_dim=max_words_channel_title, output_dim=embedding_dim, input_length=max_len_channel_title)(input_channel_title)
-    category_embedding = Embedding(input_dim=max_words_category, output_dim=embedding_dim, input_length=max_len_category)(input_category)
-
-    title_lstm = Bidirectional(LSTM(units=128, return_sequences=True))(title_embedding)
-    description_lstm = Bidirectional(LSTM(units=128, return_sequences=True))(description_embedding)
-    channel_title_lstm = Bidirectional(LSTM(units=128, return_sequences=True))(channel_title_embedding)
-    category_lstm = Bidirectional(LSTM(units=128, return_sequences=True))(category_embedding)
-
-    # Global Max Pooling layer for title, description, and channel title
-    title_pooling = GlobalMaxPooling1D()(title_lstm)
-    description_pooling = GlobalMaxPooling1D()(description_lstm)
-    channel_title_pooling = GlobalMaxPooling1D()(channel_title_lstm)
-    category_pooling = GlobalMaxPooling1D()(category_lstm)
-
-    # Concatenate all input features
-    concat = Concatenate()([title_pooling, description_pooling, channel_title_pooling, category_pooling, input_subscriber, input_days_since_publication])
-
-    # Dense layers for final prediction
-    dense1 = Dense(512, activation='relu')(concat)
-    dropout1 = Dropout(0.3)(dense1)
-    dense2 = Dense(256, activation='relu')(dropout1)
-    dropout2 = Dropout(0.3)(dense2)
-    output = Dense(1, activation='linear')(dropout2)
-
-    # Define the model
-    model = Model(inputs=[input_title, input_description, input_channel_title, input_category, input_subscriber, input_days_since_publication], outputs=output)
-
-    # Compile the model
-    model.compile(optimizer='adam', loss='mean_squared_error')
-
-    # Split the data into training and testing sets
-    X_train_title, X_test_title, X_train_description, X_test_description, X_train_channel_title, X_test_channel_title, \
-    X_train_category, X_test_category, X_train_subscriber, X_test_subscriber, X_train_days, X_test_days, \
-    y_train, y_test = train_test_split(X_title, X_description, X_channel_title, X_category, X_subscriber,
-                                       X_days_since_publication, df['views'], test_size=0.2, random_state=42)
-
-    # Train the model
-    model.fit(
-        [X_train_title, X_train_description, X_train_channel_title, X_train_category, X_train_subscriber, X_train_days],
-        y_train,
-        validation_data=([X_test_title, X_test_description, X_test_channel_title, X_test_category, X_test_subscriber, X_test_days], y_test),
-        epochs=10,
-        batch_size=32,
-        verbose=1
-    )
-
-    # Evaluate the model on the test set
-    loss = model.evaluate([X_test_title, X_test_description, X_test_channel_title, X_test_category, X_test_subscriber, X_test_days], y_test, verbose=0)
-    print(f'Mean Squared Error on Test Set: {loss}')
 
+# New function to train the model based on title, subscribers, days since publication, description, channel title, and categoryID
+def neuralAllModel(df, inputMode='padded', lengthPolicies=None, minWordCount=1, hashBuckets=None, channelIdEmbedding=False, pipeline=None, epochs=10, runName=None):
+    model, features = trainModelFunction('neuralAllModel', 'all', df, inputMode, lengthPolicies, minWordCount, hashBuckets, channelIdEmbedding, pipeline, epochs, runName)
 
     # Make predictions on new data
-    def predict_view_count(title, description, channel_title, category, subscriber_count, days_since_publication):
-        processed_title = preprocessText(title)
-        processed_description = preprocessText(description)
-        processed_channel_title = preprocessText(channel_title)
-
-        sequences_title = tokenizer_title.texts_to_sequences([processed_title])
-        sequences_description = tokenizer_description.texts_to_sequences([processed_description])
-        sequences_channel_title = tokenizer_channel_title.texts_to_sequences([processed_channel_title])
-        sequences_category = tokenizer_category.texts_to_sequences([category])
-
-        padded_sequences_title = pad_sequences(sequences_title, maxlen=max_len_title, padding='post')
-        padded_sequences_description = pad_sequences(sequences_description, maxlen=max_len_description, padding='post')
-        padded_sequences_channel_title = pad_sequences(sequences_channel_title, maxlen=max_len_channel_title, padding='post')
-        padded_sequences_category = pad_sequences(sequences_category, maxlen=max_len_category, padding='post')
-
-        subscriber_count_scaled = scaler_subscriber.transform([[subscriber_count]])
-        days_since_publication_scaled = scaler_days_since_publication.transform([[days_since_publication]])
-
-        prediction = model.predict([padded_sequences_title, padded_sequences_description, padded_sequences_channel_title, padded_sequences_category, subscriber_count_scaled, days_since_publication_scaled])[0][0]
-        return prediction
+    def predict_view_count(title, description, channel_title, category, subscriber_count, days_since_publication, channel_id=None):
+        video = {'title': title, 'description': description, 'channelTitle': channel_title, 'categoryId': category, 'channelId': channel_id,
+                 'subscriberCount': subscriber_count, 'daysSincePublication': days_since_publication}
+        return predictViewCount(model, features, 'all', video, inputMode)
 
     # Example usage:
     published_at = pd.to_datetime('2023-01-01')  # Assuming the videos were published at the start of the year
@@ -1351,9 +3317,8 @@ def neuralAllModel(df):
     category = "20"
     predicted_views = predict_view_count(new_title, new_description, new_channel_title, category, subscriber_count, days_since_publication)
     print(f'Predicted Views for "{new_title}": {predicted_views}')
-    
-    
-    published_at = pd.to_datetime('2019-06-10') 
+
+    published_at = pd.to_datetime('2019-06-10')
     days_since_publication = (pd.to_datetime('today').tz_localize('UTC') - published_at.tz_localize('UTC')).days
     new_title = "Worlds Craziest Invention"
     new_description = "I created the worlds most insane invention!"
@@ -1362,55 +3327,880 @@ def neuralAllModel(df):
     category = "28"
     predicted_views = predict_view_count(new_title, new_description, new_channel_title, category, subscriber_count, days_since_publication)
     print(f'Predicted Views for "{new_title}": {predicted_views}')
-    
-    
+
     new_description = "This video contains me making a really cool object"
     predicted_views = predict_view_count(new_title, new_description, new_channel_title, category, subscriber_count, days_since_publication)
     print(f'Predicted Views for "{new_title}, with different description": {predicted_views}')
-    
+
     new_title = "$1 VS $100,000 Invention"
     predicted_views = predict_view_count(new_title, new_description, new_channel_title, category, subscriber_count, days_since_publication)
     print(f'Predicted Views for "{new_title}, with different title": {predicted_views}')
-    
+
     new_channel_title = "Tim Smith"
     predicted_views = predict_view_count(new_title, new_description, new_channel_title, category, subscriber_count, days_since_publication)
     print(f'Predicted Views for "{new_title}, with different channel title": {predicted_views}')
-    
+
     subscriber_count = 9000000
     predicted_views = predict_view_count(new_title, new_description, new_channel_title, category, subscriber_count, days_since_publication)
     print(f'Predicted Views for "{new_title}, with 90x subscribers": {predicted_views}')
-    
+
     category = "20"
     predicted_views = predict_view_count(new_title, new_description, new_channel_title, category, subscriber_count, days_since_publication)
     print(f'Predicted Views for "{new_title}, with different category": {predicted_views}')
-    
-    published_at = pd.to_datetime('2016-02-03') 
+
+    published_at = pd.to_datetime('2016-02-03')
     days_since_publication = (pd.to_datetime('today').tz_localize('UTC') - published_at.tz_localize('UTC')).days
     predicted_views = predict_view_count(new_title, new_description, new_channel_title, category, subscriber_count, days_since_publication)
     print(f'Predicted Views for "{new_title}, with different date": {predicted_views}')
-    
-    
+
     return predicted_views
 
 
-#PART 1
-# Create a DataFrame from the obtained data
-# df = pd.DataFrame(getRandomVideos())
-# df = pd.DataFrame(getPopularVideos())
-# df = pd.DataFrame(getCategoryVideos())
-# df = pd.DataFrame(getChannelsVideos())
-# df = pd.DataFrame(getPopularChannelsVideos())
-df = pd.DataFrame(getRandomChannelsVideos())
-# df = pd.DataFrame(getAllVideos())
-# Display the loaded data
-print(df)
+# Input branches and dense head of every model variant, the same architectures
+# as the model functions (see buildModel). Text branches embed and pool a
+# sequence; numeric features go through Dense(units), or as they are when units is None.
+MODEL_SPECS = {
+    'title': {'text': ['title'], 'head': [(128, 0.5)]},
+    'titleSubscriber': {'text': ['title'], 'appendToText': ['subscriber'], 'head': [(128, 0.5)]},
+    'tsDate': {'text': ['title'], 'numeric': {'subscriber': 64, 'daysSincePublication': 64}, 'head': [(128, 0.5)]},
+    'tsdDescription': {'text': ['title', 'description'], 'numeric': {'subscriber': 64, 'daysSincePublication': 64}, 'head': [(128, 0.5)]},
+    'tsddChannel': {'text': ['title', 'description', 'channelTitle'], 'numeric': {'subscriber': 64, 'daysSincePublication': 64}, 'head': [(128, 0.5)]},
+    'all': {'text': ['title', 'description', 'channelTitle'], 'category': True, 'numeric': {'subscriber': None, 'daysSincePublication': None},
+            'head': [(512, 0.3), (256, 0.3)]},
+}
+MODEL_EMBEDDING_DIM = 300  # Unless a spec sets embeddingDim
+MODEL_LSTM_UNITS = 128  # Unless a spec sets lstmUnits
+
+
+class FeatureSet:
+    """
+    Every feature the model variants use, computed once from a DataFrame,
+    with one train/validation/test split of its rows. It is the in-memory
+    counterpart of FeaturePipeline, with the same fitted attributes and
+    dataset() method, so buildModel and trainVariant take either.
+
+    The splits are the model functions': train_test_split(..., test_size=0.2,
+    random_state=42), the last 20% of the training rows being held out for
+    validation as fit(validation_split=0.2) does.
+    """
+
+    def __init__(self, df, lengthPolicies=None, minWordCount=1, hashBuckets=None, channelIdEmbedding=False, maxWords=100000, textFields=PIPELINE_TEXT_FIELDS):
+        """
+        Args:
+            textFields (list): The text features to compute, e.g. only the
+                title for the title models, so no other text is preprocessed.
+        """
+        loadModelLibraries()
+        policies = {**LENGTH_POLICIES, **(lengthPolicies or {})}
+        self.tokenizers = {}
+        self.lengths = {}
+        self.sequences = {}  # Truncated, unpadded, for length-bucketed batches
+        self.arrays = {}
+        for field in textFields:
+            tokenizer, sequences = textCache.tokenize(textCache.preprocess(df[field]), maxWords, minCount=minWordCount, hashBuckets=hashBuckets)
+            length = policies[field].fit(sequences)
+            self.tokenizers[field] = tokenizer
+            self.lengths[field] = length
+            self.sequences[field] = length.truncate(sequences)
+            self.arrays[field] = featureStore.pad(sequences, length.maxLen, length.truncating)
+
+        self.categoryEncoder = CategoricalEncoder(['categoryId', 'channelId'] if channelIdEmbedding else ['categoryId']).fit(df)
+        self.arrays['category'] = self.categoryEncoder.transform(df)
+
+        numeric = df[['subscriberCount']].assign(daysSincePublication=(pd.to_datetime('today').tz_localize('UTC') - pd.to_datetime(df['publishedAt'])).dt.days)
+        self.scalers = {}
+        for key, column in PIPELINE_NUMERIC_FIELDS.items():
+            self.scalers[key] = StandardScaler()
+            self.arrays[key] = self.scalers[key].fit_transform(numeric[[column]])
+        self.views = df['views'].to_numpy(dtype=np.float32)
+        self.splitRows(len(df))
+
+    @classmethod
+    def fromStore(cls, name):
+        """
+        Reopen a FeatureSet saved with saveManifest(name), its arrays
+        memory-mapped from featureStore. The unpadded sequences are not
+        saved, so it only makes padded batches.
+        """
+        loadModelLibraries()
+        saved = featureStore.load(name)
+        features = cls.__new__(cls)
+        features.tokenizers = {field: saved['tokenizers'][field] for field in PIPELINE_TEXT_FIELDS if field in saved['tokenizers']}
+        features.lengths = saved['lengths']
+        features.sequences = {}
+        features.arrays = {key: array for key, array in saved['arrays'].items() if key != 'views'}
+        features.categoryEncoder = saved['tokenizers']['category']
+        features.scalers = saved['scalers']
+        features.views = saved['arrays']['views']
+        features.splitRows(len(features.views))
+        return features
+
+    def splitRows(self, count):
+        trainRows, testRows = train_test_split(np.arange(count), test_size=0.2, random_state=42)
+        splitAt = int(len(trainRows) * (1 - VALIDATION_SPLIT))
+        self.rows = {'train': trainRows[:splitAt], 'validation': trainRows[splitAt:], 'test': testRows}
+        self.splitSizes = {split: len(rows) for split, rows in self.rows.items()}
+
+    def saveManifest(self, name):
+        # The features of a model trained on the set, for FeatureStore.load()
+        featureStore.saveManifest(
+            name,
+            {**self.arrays, 'views': self.views},
+            scalers=self.scalers,
+            tokenizers={**self.tokenizers, 'category': self.categoryEncoder},
+            lengths=self.lengths
+        )
+
+    def inputArray(self, entry, rows):
+        if isinstance(entry, str):
+            return np.asarray(self.arrays[entry][rows])
+        # Features appended to one another, as neuralTitleSubscriberModel appends the subscriber count to the title
+        return np.concatenate([np.asarray(self.arrays[name][rows], dtype=np.float32) for name in entry], axis=1)
+
+    def dataset(self, split, inputs, batchSize=32, padded=True, seed=42):
+        """
+        Batches of one split as a tf.data.Dataset of (inputs, views), like
+        FeaturePipeline.dataset().
+        """
+        import tensorflow as tf
+
+        rows = self.rows[split]
+        if not padded:
+            if not all(isinstance(entry, str) for entry in inputs):
+                raise ValueError('Appended features need padded inputs')
+            if not self.sequences:
+                raise ValueError('A FeatureSet reopened from the store only has padded inputs')
+            values = [self.sequences[entry] if entry in self.sequences else self.arrays[entry] for entry in inputs]
+            return LengthBucketedBatches(values, self.views, rows, batchSize, shuffle=split == 'train', seed=seed).dataset()
+
+        values = tuple(self.inputArray(entry, rows) for entry in inputs)
+        dataset = tf.data.Dataset.from_tensor_slices((values if len(values) > 1 else values[0], self.views[rows]))
+        if split == 'train':
+            dataset = dataset.shuffle(len(rows), seed=seed, reshuffle_each_iteration=True)
+        return dataset.batch(batchSize).prefetch(tf.data.AUTOTUNE)
+
+
+def inputName(feature):
+    # The model functions' input names, e.g. channelTitle -> channel_title_input
+    return re.sub(r'(?<!^)(?=[A-Z])', '_', feature).lower() + '_input'
+
+
+def modelInputs(spec):
+    """
+    The inputs of a MODEL_SPECS entry's model, in order, as features.dataset()
+    takes them.
+    """
+    appended = spec.get('appendToText', [])
+    inputs = [[field, *appended] if appended else field for field in spec['text']]
+    if spec.get('category'):
+        inputs.append('category')
+    inputs.extend(spec.get('numeric', {}))
+    return inputs
+
+
+def buildModel(spec, features, inputMode='padded'):
+    """
+    Build and compile the Keras model of a MODEL_SPECS entry.
+
+    Args:
+        spec (dict): 'text' (text features, each a BiLSTM branch),
+            'appendToText' (numeric features appended to the one text
+            sequence), 'category' (embed the categorical columns), 'numeric'
+            (feature to Dense units or None), 'head' ((units, dropout) of each
+            dense layer), and optionally 'embeddingDim' and 'lstmUnits'.
+        features (FeatureSet or FeaturePipeline): The fitted features.
+
+    Returns:
+        tuple: (model, inputs), inputs naming the model's inputs for
+        features.dataset() (see modelInputs).
+    """
+    loadModelLibraries()
+    bucketed = inputMode == 'bucketed'
+    appended = spec.get('appendToText', [])
+    if appended and (bucketed or len(spec['text']) != 1):
+        raise ValueError('appendToText needs one text feature and padded inputs')
+
+    layers, branches = [], []
+    for field in spec['text']:
+        # Bucketed batches have their own length, and the embeddings mask their padding
+        layer = Input(shape=(None if bucketed else features.lengths[field].maxLen + len(appended),), name=inputName(field))
+        embedding = Embedding(input_dim=features.tokenizers[field].num_words, output_dim=spec.get('embeddingDim', MODEL_EMBEDDING_DIM), mask_zero=bucketed)(layer)
+        lstm = Bidirectional(LSTM(units=spec.get('lstmUnits', MODEL_LSTM_UNITS), return_sequences=True))(embedding)
+        layers.append(layer)
+        branches.append(MaskedGlobalMaxPooling1D()(lstm))
+
+    if spec.get('category'):
+        encoder = features.categoryEncoder
+        layer = Input(shape=(len(encoder.columns),), name=inputName('category'))
+        layers.append(layer)
+        branches.append(Flatten()(Embedding(input_dim=encoder.num_words, output_dim=encoder.embeddingDim())(layer)))
+
+    for feature, units in spec.get('numeric', {}).items():
+        layer = Input(shape=(1,), name=inputName(feature))
+        layers.append(layer)
+        branches.append(layer if units is None else Dense(units=units, activation='relu')(layer))
+
+    merged = Concatenate()(branches) if len(branches) > 1 else branches[0]
+    for units, dropout in spec['head']:
+        merged = Dropout(dropout)(Dense(units=units, activation='relu')(merged))
+    output = Dense(units=1, activation='linear', dtype='float32')(merged)
+
+    model = Model(inputs=layers, outputs=output)
+    model.compile(optimizer='adam', loss='mean_squared_error', jit_compile=performanceMode.jitCompile)
+    return model, modelInputs(spec)
+
+
+TRAINING_RUNS_PATH = 'trainingRuns'
+EARLY_STOPPING_PATIENCE = 3  # Epochs without a lower validation loss before training stops
+TRAINING_SEED = 42  # Epoch e of a run is seeded with TRAINING_SEED + e
+
+
+class TrainingRun:
+    """
+    Epoch loop with early stopping on the validation loss, and checkpoints
+    that let an interrupted run resume.
+
+    Training stops after `patience` epochs without a lower validation loss,
+    and the model keeps the weights of its best epoch. A named run keeps
+    trainingRuns/<name>/ with model.keras (the model and its optimizer
+    state), best.weights.npz and state.json (the last completed epoch, the
+    best loss, and the history with each epoch's losses and seconds),
+    written every checkpointEvery epochs. Fitting under the name of an
+    unfinished run continues after its last checkpoint, and a finished run
+    returns its best model without training.
+
+    Every epoch is seeded from its number rather than from the state the
+    epochs before it left (see seedEpoch), so a resumed run trains its
+    remaining epochs as an uninterrupted run does.
+    """
+
+    def __init__(self, name=None, patience=EARLY_STOPPING_PATIENCE, checkpointEvery=1, runsDir=TRAINING_RUNS_PATH, seed=TRAINING_SEED):
+        self.dirPath = os.path.join(runsDir, name) if name else None
+        self.patience = patience
+        self.checkpointEvery = checkpointEvery
+        self.seed = seed
+        self.state = None
+
+    def path(self, fileName):
+        return os.path.join(self.dirPath, fileName)
+
+    def loadState(self):
+        if self.dirPath is None or not os.path.exists(self.path('state.json')):
+            return None
+        with open(self.path('state.json'), 'r') as file:
+            return json.load(file)
+
+    def saveState(self):
+        if self.dirPath is None:
+            return
+        tmpPath = self.path('state.json.tmp')
+        with open(tmpPath, 'w') as file:
+            json.dump(self.state, file)
+        os.replace(tmpPath, self.path('state.json'))
+
+    def seedEpoch(self, model, epoch):
+        """
+        Seed what epoch `epoch` draws from: the Python, NumPy, TensorFlow and
+        Keras global generators, and the SeedGenerator of every layer, such
+        as Dropout's, whose state otherwise carries over from the last epoch.
+        """
+        import tensorflow as tf
+
+        tf.keras.utils.set_random_seed(self.seed + epoch)
+        generators = [variable for variable in model.non_trainable_variables if variable.path.endswith('seed_generator_state')]
+        seeds = np.random.default_rng([self.seed, epoch]).integers(0, 2 ** 31, size=len(generators))
+        for variable, seed in zip(generators, seeds):
+            variable.assign(np.array([seed, 0], dtype=variable.dtype))
+
+    def saveCheckpoint(self, model, bestWeights):
+        # The state goes last, so it only ever names complete files
+        if self.dirPath is None:
+            return
+        os.makedirs(self.dirPath, exist_ok=True)
+        model.save(self.path('model.tmp.keras'))
+        os.replace(self.path('model.tmp.keras'), self.path('model.keras'))
+        if bestWeights is not None:
+            np.savez(self.path('best.weights.tmp.npz'), *bestWeights)
+            os.replace(self.path('best.weights.tmp.npz'), self.path('best.weights.npz'))
+        self.saveState()
+
+    def fit(self, model, trainData, validationData, epochs=10):
+        """
+        Train model for at most epochs epochs.
+
+        Args:
+            trainData: The training dataset, or a function of the epoch
+                returning it, e.g. shuffled by a seed derived from the epoch
+                so that a resumed run sees the same order.
+
+        Returns:
+            keras.Model: The model with the weights of its best epoch. When
+            the run resumes, this is the checkpointed model, not the one given.
+        """
+        from tensorflow.keras.models import load_model
+
+        bestWeights = None
+        self.state = self.loadState()
+        if self.state is None:
+            self.state = {'epoch': 0, 'bestLoss': None, 'bestEpoch': 0, 'history': [], 'done': False}
+        else:
+            model = load_model(self.path('model.keras'))
+            if not self.state['done']:
+                print(f"Resuming {self.dirPath} after epoch {self.state['epoch']}")
+
+        while not self.state['done'] and self.state['epoch'] < epochs:
+            epoch = self.state['epoch']
+            self.seedEpoch(model, epoch)
+            epochData = trainData(epoch) if callable(trainData) else trainData
+            start = time.perf_counter()
+            history = model.fit(epochData, validation_data=validationData, initial_epoch=epoch, epochs=epoch + 1).history
+            loss, validationLoss = float(history['loss'][-1]), float(history['val_loss'][-1])
+            self.state['history'].append({'epoch': epoch + 1, 'loss': loss, 'validationLoss': validationLoss, 'seconds': time.perf_counter() - start})
+            self.state['epoch'] = epoch + 1
+            if self.state['bestLoss'] is None or validationLoss < self.state['bestLoss']:
+                self.state['bestLoss'], self.state['bestEpoch'] = validationLoss, epoch + 1
+                bestWeights = model.get_weights()
+
+            stopping = self.state['epoch'] - self.state['bestEpoch'] >= self.patience
+            if stopping or self.state['epoch'] == epochs or self.state['epoch'] % self.checkpointEvery == 0:
+                self.saveCheckpoint(model, bestWeights)
+            if stopping:
+                print(f"Early stopping after epoch {self.state['epoch']}, the best validation loss was at epoch {self.state['bestEpoch']}")
+                break
+
+        if bestWeights is not None:
+            model.set_weights(bestWeights)
+        elif self.state['bestEpoch']:
+            with np.load(self.path('best.weights.npz')) as saved:
+                model.set_weights([saved[f'arr_{i}'] for i in range(len(saved.files))])
+        self.state['done'] = True
+        self.saveState()
+        return model
+
+
+def trainVariant(spec, features, inputMode='padded', epochs=10, batchSize=32, run=None):
+    """
+    Build a MODEL_SPECS entry with buildModel, train it on the features'
+    train split and evaluate it.
+
+    Args:
+        run (TrainingRun): Trains the model, with early stopping and
+            checkpoints. Without one, a new unnamed run only stops early.
+
+    Returns:
+        tuple: (model, test MSE).
+    """
+    import tensorflow as tf
+
+    run = run or TrainingRun()
+    # The initial weights come from the run's seed too
+    tf.keras.utils.set_random_seed(run.seed)
+    model, inputs = buildModel(spec, features, inputMode)
+    padded = inputMode != 'bucketed'
+
+    def trainData(epoch):
+        # Shuffled by epoch, so a resumed run sees the order an uninterrupted one does
+        return features.dataset('train', inputs, batchSize, padded, seed=run.seed + epoch)
+
+    model = run.fit(model, trainData, features.dataset('validation', inputs, batchSize, padded), epochs)
+    loss = model.evaluate(features.dataset('test', inputs, batchSize, padded), verbose=0)
+    return model, loss
+
+
+def trainAllVariants(df, inputMode='padded', lengthPolicies=None, minWordCount=1, hashBuckets=None, channelIdEmbedding=False, pipeline=None,
+                     specs=None, epochs=10, batchSize=32, runName=None):
+    """
+    Train every model variant on one FeatureSet (or the given pipeline), so
+    preprocessing, tokenizing, scaling and splitting run once for all of
+    them instead of once per model function.
+
+    Variants that append features to their text sequence are trained on
+    padded inputs whatever the inputMode.
+
+    Args:
+        specs (dict): Variant name to spec, MODEL_SPECS by default.
+        epochs (int): Most epochs per variant, which stops early (see TrainingRun).
+        runName (str): Checkpoint each variant as the run <runName>/<variant>,
+            and resume the variants of an interrupted call.
+
+    Returns:
+        pandas.DataFrame: One row per variant, with its parameter count,
+        epochs, training wall time and test MSE. report.attrs['featureSeconds']
+        holds the time of the shared feature pass.
+    """
+    start = time.perf_counter()
+    if pipeline is not None:
+        features = pipeline
+    else:
+        features = FeatureSet(df, lengthPolicies, minWordCount, hashBuckets, channelIdEmbedding)
+    featureSeconds = time.perf_counter() - start
+
+    rows = []
+    for variant, spec in (specs or MODEL_SPECS).items():
+        variantMode = 'padded' if spec.get('appendToText') else inputMode
+        run = TrainingRun(os.path.join(runName, variant) if runName else None)
+        start = time.perf_counter()
+        model, loss = trainVariant(spec, features, variantMode, epochs, batchSize, run)
+        trainedModels[variant] = model
+        rows.append({'variant': variant, 'inputMode': variantMode, 'params': model.count_params(), 'epochs': run.state['epoch'], 'bestEpoch': run.state['bestEpoch'],
+                     'seconds': time.perf_counter() - start, 'mse': loss})
+
+    report = pd.DataFrame(rows)
+    report.attrs['featureSeconds'] = featureSeconds
+    print(f'Shared features: {featureSeconds:.1f}s for {sum(features.splitSizes.values())} rows')
+    print(report.to_string(index=False))
+    return report
+
+
+# Knobs of sweep() and the values tried. Model knobs override the spec of
+# the variant: headUnits (widths of the dense head), dropout (of every head
+# layer) and numericUnits (of every numeric Dense branch). Feature knobs
+# (maxWords, minWordCount, hashBuckets) change the FeatureSet.
+SWEEP_SPACE = {
+    'embeddingDim': [128, 300],
+    'lstmUnits': [64, 128],
+    'headUnits': [[128], [512, 256]],
+    'dropout': [0.3, 0.5],
+    'batchSize': [32, 128],
+    'maxWords': [20000, 100000],
+}
+SWEEP_MODEL_KNOBS = ['variant', 'embeddingDim', 'lstmUnits', 'headUnits', 'dropout', 'numericUnits', 'batchSize']
+SWEEP_FEATURE_KNOBS = ['maxWords', 'minWordCount', 'hashBuckets']
+SWEEP_THREADS_PER_WORKER = 2  # intra-op threads of each trial process
+SWEEP_RESULTS_PATH = 'sweepResults.csv'
+SWEEP_SEED = 42
+
+
+def sweepTrials(space, trials=None, seed=SWEEP_SEED):
+    """
+    Every combination of the space's values, or `trials` of them sampled
+    without replacement.
+
+    Returns:
+        list: One dict of knob values per trial.
+    """
+    unknown = set(space) - set(SWEEP_MODEL_KNOBS) - set(SWEEP_FEATURE_KNOBS)
+    if unknown:
+        raise ValueError(f"Unknown sweep knobs: {', '.join(sorted(unknown))}")
+    combinations = [dict(zip(space, values)) for values in itertools.product(*space.values())]
+    if trials is not None and trials < len(combinations):
+        combinations = random.Random(seed).sample(combinations, trials)
+    return combinations
+
+
+def sweepSpec(spec, trial):
+    # A MODEL_SPECS entry with the trial's model knobs applied
+    spec = dict(spec)
+    for knob in ('embeddingDim', 'lstmUnits'):
+        if knob in trial:
+            spec[knob] = trial[knob]
+    if 'headUnits' in trial or 'dropout' in trial:
+        widths = trial.get('headUnits', [units for units, _ in spec['head']])
+        spec['head'] = [(units, trial.get('dropout', spec['head'][0][1])) for units in widths]
+    if 'numericUnits' in trial:
+        spec['numeric'] = {feature: None if units is None else trial['numericUnits'] for feature, units in spec.get('numeric', {}).items()}
+    return spec
+
+
+def startSweepWorker(threads, jitCompile, bfloat16):
+    # Each trial process gets `threads` intra-op threads and runs its ops one at a time
+    performanceMode.enable(jitCompile=jitCompile, intraOpThreads=threads, interOpThreads=1, bfloat16=bfloat16)
+
+
+@functools.lru_cache(maxsize=None)
+def sweepFeatures(name):
+    # Opened once per process, the arrays are memmaps shared through the page cache
+    return FeatureSet.fromStore(name)
+
+
+def runSweepTrial(index, trial, featureName, variant, epochs, runName):
+    features = sweepFeatures(featureName)
+    spec = sweepSpec(MODEL_SPECS[trial.get('variant', variant)], trial)
+    run = TrainingRun(os.path.join(runName, f'trial{index}') if runName else None, seed=SWEEP_SEED)
+    model, loss = trainVariant(spec, features, 'padded', epochs, trial.get('batchSize', 32), run)
+    return {
+        'trial': index,
+        **trial,
+        'params': model.count_params(),
+        'epochs': run.state['epoch'],
+        'bestEpoch': run.state['bestEpoch'],
+        'validationLoss': run.state['bestLoss'],
+        # The first epoch also traces the model
+        'secondsPerEpoch': statistics.median(entry['seconds'] for entry in run.state['history'][1:] or run.state['history']),
+        'mse': loss,
+    }
+
+
+def rankSweep(rows):
+    report = pd.DataFrame(rows).sort_values(['validationLoss', 'secondsPerEpoch'], ignore_index=True)
+    report.insert(0, 'rank', np.arange(1, len(report) + 1))
+    return report
+
+
+def sweep(df, space=None, variant='all', trials=None, workers=None, threadsPerWorker=SWEEP_THREADS_PER_WORKER, epochs=10,
+          lengthPolicies=None, minWordCount=1, hashBuckets=None, channelIdEmbedding=False, runName=None, resultsPath=SWEEP_RESULTS_PATH):
+    """
+    Train a model variant once per point of a search space over its sizes,
+    batch size and vocabulary, the trials spread over a process pool.
+
+    The features of each distinct vocabulary setting are computed once,
+    here, and saved to featureStore; every trial process memory-maps them.
+    Each process is limited to threadsPerWorker intra-op threads, and
+    inherits performanceMode's XLA and bfloat16 settings.
+
+    Args:
+        space (dict): Knob to the values to try, SWEEP_SPACE by default (see
+            there for the knobs).
+        variant (str): The MODEL_SPECS entry the model knobs apply to,
+            unless the space has a 'variant' knob.
+        trials (int): Trials sampled from the space, every combination by default.
+        workers (int): Trial processes, by default as many as the cores fit
+            threadsPerWorker threads.
+        epochs (int): Most epochs per trial, which stops early (see TrainingRun).
+        runName (str): Checkpoint each trial as the run <runName>/trial<i>, so
+            an interrupted sweep resumes.
+        resultsPath (str): CSV the ranked results are written to, after each trial.
+
+    Returns:
+        pandas.DataFrame: One row per trial, ranked by best validation loss,
+        then by median seconds per epoch after the first.
+    """
+    trialList = sweepTrials(SWEEP_SPACE if space is None else space, trials)
+    workers = workers or max(1, (os.cpu_count() or 1) // threadsPerWorker)
+
+    featureNames = []
+    for trial in trialList:
+        featureArgs = {'minWordCount': minWordCount, 'hashBuckets': hashBuckets, 'maxWords': 100000,
+                       **{knob: trial[knob] for knob in SWEEP_FEATURE_KNOBS if knob in trial}}
+        featureName = 'sweep-' + hashText(sorted(featureArgs.items()), lengthPolicies, channelIdEmbedding)
+        if featureName not in featureNames:
+            FeatureSet(df, lengthPolicies, channelIdEmbedding=channelIdEmbedding, **featureArgs).saveManifest(featureName)
+        featureNames.append(featureName)
+    print(f'Sweep: {len(trialList)} trials over {len(set(featureNames))} feature sets, {workers} processes of {threadsPerWorker} threads')
+
+    rows = []
+    # Spawned, as TensorFlow's threads do not survive a fork
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'), initializer=startSweepWorker,
+                             initargs=(threadsPerWorker, performanceMode.jitCompile, performanceMode.bfloat16)) as executor:
+        futures = [executor.submit(runSweepTrial, index, trial, featureName, variant, epochs, runName)
+                   for index, (trial, featureName) in enumerate(zip(trialList, featureNames))]
+        for future in as_completed(futures):
+            rows.append(future.result())
+            print(f"Trial {rows[-1]['trial']}: validation loss {rows[-1]['validationLoss']:.6g}, {rows[-1]['secondsPerEpoch']:.1f}s per epoch ({len(rows)}/{len(futures)})")
+            rankSweep(rows).to_csv(resultsPath, index=False)
+
+    report = rankSweep(rows)
+    print(report.to_string(index=False))
+    return report
+
+
+MODELS = {
+    'title': neuralTitleModel,
+    'titleSubscriber': neuralTitleSubscriberModel,
+    'tsDate': neuralTSDateModel,
+    'tsdDescription': neuralTSDDescriptionModel,
+    'tsddChannel': neuralTSDDChannelModel,
+    'all': neuralAllModel,
+}
+
+COLLECTORS = {
+    'random': getRandomVideos,
+    'popular': getPopularVideos,
+    'category': getCategoryVideos,
+    'channels': getChannelsVideos,
+    'popularChannels': getPopularChannelsVideos,
+    'randomChannels': getRandomChannelsVideos,
+    'all': getAllVideos,
+    'combined': combineDatasets,
+}
+
+
+def benchmarkImportTime(repeats=5):
+    """
+    Time `import projectFinal` in fresh interpreters, against the same import
+    followed by the TensorFlow, scikit-learn, NLTK and googleapiclient imports
+    that importing the module used to run.
+
+    Returns:
+        dict: Median seconds for 'lazy' and 'eager' imports.
+    """
+    moduleDir = os.path.dirname(os.path.abspath(__file__))
+    statements = {
+        'lazy': 'import projectFinal',
+        'eager': 'import projectFinal, nltk.corpus, nltk.tokenize, googleapiclient.discovery; projectFinal.loadModelLibraries()',
+    }
+
+    results = {}
+    for name, statement in statements.items():
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, '-c', statement], cwd=moduleDir, check=True, capture_output=True)
+            timings.append(time.perf_counter() - start)
+        results[name] = statistics.median(timings)
+
+    print(f"import projectFinal: {results['lazy']:.2f}s lazy, {results['eager']:.2f}s with every dependency loaded")
+    return results
+
+
+EMBEDDING_VARIANTS = {
+    'vocabulary': {},
+    'minCount2': {'minWordCount': 2},
+    'hashed': {'hashBuckets': HASH_BUCKETS},
+    'hashed100k': {'hashBuckets': 100000},  # Same table size as the old fixed input_dim=100000
+}
+
+
+def benchmarkModelMemory(df, modelName='all', variants=EMBEDDING_VARIANTS):
+    """
+    Train a model once per embedding variant, each in a fresh interpreter,
+    and report its parameter count and the peak RSS of the process.
+
+    Args:
+        modelName (str): A key of MODELS.
+        variants (dict): Variant name to keyword arguments of the model function.
+
+    Returns:
+        pandas.DataFrame: One row per variant.
+    """
+    moduleDir = os.path.dirname(os.path.abspath(__file__))
+    modelFunction = MODELS[modelName]
+    script = (
+        'import json, resource, sys, pandas as pd, projectFinal\n'
+        'modelFunction = projectFinal.MODELS[sys.argv[2]]\n'
+        'modelFunction(pd.read_pickle(sys.argv[1]), **json.loads(sys.argv[3]))\n'
+        'model = projectFinal.trainedModels[modelFunction.__name__]\n'
+        'embeddings = [layer for layer in model.layers if isinstance(layer, projectFinal.Embedding)]\n'
+        'print(json.dumps({"params": model.count_params(), "embeddingParams": sum(layer.count_params() for layer in embeddings),\n'
+        '                  "embeddingRows": [int(layer.input_dim) for layer in embeddings],\n'
+        '                  "peakRssMB": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))\n'
+    )
+
+    rows = []
+    dataPath = f'benchmarkModelMemory-{os.getpid()}.pkl'
+    df.to_pickle(dataPath)
+    try:
+        for variant, modelArgs in variants.items():
+            start = time.perf_counter()
+            env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [moduleDir, os.environ.get('PYTHONPATH')])))
+            result = subprocess.run([sys.executable, '-c', script, dataPath, modelName, json.dumps(modelArgs)],
+                                    env=env, check=True, capture_output=True, text=True)
+            # The model functions print their progress, the report is the last line
+            rows.append({'model': modelFunction.__name__, 'variant': variant, **json.loads(result.stdout.strip().splitlines()[-1]),
+                         'seconds': time.perf_counter() - start})
+    finally:
+        os.remove(dataPath)
+
+    report = pd.DataFrame(rows)
+    print(report.to_string(index=False))
+    return report
+
+
+# performanceMode.enable() arguments of each benchmarked mode, None leaving TensorFlow's defaults
+PERFORMANCE_MODES = {
+    'default': None,
+    'xla': {'tuneThreads': False},
+    'xlaThreads': {},
+    'xlaThreadsBfloat16': {'bfloat16': True},
+}
+
+
+def timeModelSteps(features, variants=None, batchSize=32, steps=20):
+    """
+    Time the train and predict steps of model variants on one batch of the
+    features' train split, under the current performanceMode.
 
+    Returns:
+        list: One dict per variant: the first train step (tracing and any
+        XLA compilation), and the median train and predict step times.
+    """
+    rows = []
+    for variant in variants or list(MODEL_SPECS):
+        model, inputs = buildModel(MODEL_SPECS[variant], features)
+        x, y = next(iter(features.dataset('train', inputs, batchSize)))
+
+        start = time.perf_counter()
+        model.train_on_batch(x, y)
+        firstStep = time.perf_counter() - start
+        trainTimes = []
+        for _ in range(steps):
+            start = time.perf_counter()
+            model.train_on_batch(x, y)
+            trainTimes.append(time.perf_counter() - start)
+
+        model.predict_on_batch(x)
+        predictTimes = []
+        for _ in range(steps):
+            start = time.perf_counter()
+            model.predict_on_batch(x)
+            predictTimes.append(time.perf_counter() - start)
+
+        rows.append({
+            'variant': variant,
+            'firstStepSeconds': firstStep,
+            'trainStepMs': statistics.median(trainTimes) * 1000,
+            'trainSamplesPerSecond': batchSize / statistics.median(trainTimes),
+            'predictStepMs': statistics.median(predictTimes) * 1000,
+            'predictSamplesPerSecond': batchSize / statistics.median(predictTimes),
+        })
+    return rows
+
+
+def benchmarkPerformanceMode(df, variants=None, modes=PERFORMANCE_MODES, batchSize=32, steps=20):
+    """
+    Compare step times and samples per second of model variants with
+    performanceMode off and on. Each mode runs in a fresh interpreter, as
+    thread pools and precision policies are fixed once TensorFlow starts.
 
+    Args:
+        variants (list): Keys of MODEL_SPECS, all of them by default.
+        modes (dict): Mode name to performanceMode.enable() arguments, or None
+            to leave it off.
 
+    Returns:
+        pandas.DataFrame: One row per variant and mode.
+    """
+    moduleDir = os.path.dirname(os.path.abspath(__file__))
+    script = (
+        'import json, sys, pandas as pd, projectFinal\n'
+        'mode = json.loads(sys.argv[2])\n'
+        'if mode is not None:\n'
+        '    projectFinal.performanceMode.enable(**mode)\n'
+        'features = projectFinal.FeatureSet(pd.read_pickle(sys.argv[1]))\n'
+        'print(json.dumps(projectFinal.timeModelSteps(features, json.loads(sys.argv[3]), int(sys.argv[4]), int(sys.argv[5]))))\n'
+    )
 
-# neuralTitleModel(df)
-# neuralTitleSubscriberModel(df)
-# neuralTSDateModel(df)
-# neuralTSDDescriptionModel(df)
-# neuralTSDDChannelModel(df)
-neuralAllModel(df)
+    rows = []
+    dataPath = f'benchmarkPerformanceMode-{os.getpid()}.pkl'
+    df.to_pickle(dataPath)
+    try:
+        for modeName, modeArgs in modes.items():
+            env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [moduleDir, os.environ.get('PYTHONPATH')])))
+            result = subprocess.run([sys.executable, '-c', script, dataPath, json.dumps(modeArgs), json.dumps(variants), str(batchSize), str(steps)],
+                                    env=env, check=True, capture_output=True, text=True)
+            # The report is the last line
+            rows.extend({'mode': modeName, **row} for row in json.loads(result.stdout.strip().splitlines()[-1]))
+    finally:
+        os.remove(dataPath)
+
+    report = pd.DataFrame(rows)
+    print(report.to_string(index=False))
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Collect YouTube videos and train a view count model on them.')
+    parser.add_argument('--collector', choices=COLLECTORS, default='randomChannels', help='Which dataset to collect or load')
+    parser.add_argument('--file', help="The collector's filePath")
+    parser.add_argument('--listing-mode', choices=['search', 'uploads'], help='How channel collectors list videos')
+    parser.add_argument('--target-count', type=int, help='Keep crawling until this many videos are saved')
+    parser.add_argument('--model', choices=list(MODELS) + ['variants', 'sweep', 'none'], default='all',
+                        help='Which model to train, variants to train every MODEL_SPECS variant from one feature pass, or sweep to search hyperparameters')
+    parser.add_argument('--input-mode', choices=['padded', 'bucketed'], help='Pad sequences to the longest one, or batch them by length')
+    parser.add_argument('--length-policy', action='append', default=[], metavar='FIELD=LENGTH[:head|tail]',
+                        help="Sequence length of a text field, e.g. description=p95 or title=24:tail (repeatable). Fields keep their longest sequence by default")
+    parser.add_argument('--min-word-count', type=int, help='Words seen fewer times in training share the OOV embedding')
+    parser.add_argument('--hash-buckets', type=int, help='Embed words by hashing them into this many rows instead of by vocabulary')
+    parser.add_argument('--channel-id-embedding', action='store_true', default=None, help='Also embed the channel ID as a categorical feature')
+    parser.add_argument('--stream', action='store_true', help='Train from a tf.data pipeline over the file instead of loading it into memory')
+    parser.add_argument('--epochs', type=int, help='Most epochs per model variant, which stops early on the validation loss')
+    parser.add_argument('--run', help='Checkpoint training as this run under trainingRuns/, resuming it if it was interrupted')
+    parser.add_argument('--resume', metavar='RUN', help='Resume a run with the arguments it was started with')
+    parser.add_argument('--performance-mode', action='store_true', help='Compile the models with XLA and size the thread pools to the cores')
+    parser.add_argument('--bfloat16', action='store_true', help='With --performance-mode, train in mixed bfloat16 precision')
+    parser.add_argument('--category', action='append', metavar='CATEGORY_ID', help='Train only on collected videos of this category (repeatable)')
+    parser.add_argument('--channel', action='append', metavar='CHANNEL_ID', help='Train only on collected videos of this channel (repeatable)')
+    parser.add_argument('--published-after', metavar='DATE', help='Train only on collected videos published on or after this ISO 8601 date')
+    parser.add_argument('--published-before', metavar='DATE', help='Train only on collected videos published before this ISO 8601 date')
+    parser.add_argument('--sweep-space', metavar='FILE', help='JSON search space of --model sweep, SWEEP_SPACE by default')
+    parser.add_argument('--sweep-variant', choices=MODEL_SPECS, help='The variant --model sweep tunes')
+    parser.add_argument('--sweep-trials', type=int, help='Trials sampled from the search space, every combination by default')
+    parser.add_argument('--sweep-workers', type=int, help='Trial processes of --model sweep')
+    args = parser.parse_args(argv)
+
+    if args.resume:
+        with open(os.path.join(TRAINING_RUNS_PATH, args.resume, 'command.json'), 'r') as file:
+            return main(json.load(file))
+    if args.bfloat16 and not args.performance_mode:
+        parser.error('--bfloat16 needs --performance-mode')
+    if args.performance_mode:
+        performanceMode.enable(bfloat16=args.bfloat16)
+
+    collector = COLLECTORS[args.collector]
+    options = {'filePath': ('--file', args.file), 'listingMode': ('--listing-mode', args.listing_mode), 'targetCount': ('--target-count', args.target_count)}
+    collectorArgs = {name: value for name, (flag, value) in options.items() if value is not None}
+    unsupported = [options[name][0] for name in collectorArgs if name not in inspect.signature(collector).parameters]
+    if unsupported:
+        parser.error(f"--collector {args.collector} does not take {', '.join(unsupported)}")
+    filters = {'categoryId': args.category, 'channelId': args.channel, 'publishedAfter': args.published_after, 'publishedBefore': args.published_before}
+    catalogFilters = {name: value for name, value in filters.items() if value is not None}
+    if catalogFilters and (args.stream or videoCatalog is None):
+        parser.error('--category, --channel and --published-* select from videoCatalog, and cannot be used with --stream or without the catalog')
+    modelOptions = {'inputMode': args.input_mode, 'minWordCount': args.min_word_count, 'hashBuckets': args.hash_buckets, 'channelIdEmbedding': args.channel_id_embedding,
+                    'epochs': args.epochs, 'runName': args.run, 'space': args.sweep_space, 'variant': args.sweep_variant, 'trials': args.sweep_trials,
+                    'workers': args.sweep_workers}
+    modelArgs = {name: value for name, value in modelOptions.items() if value is not None}
+    if 'space' in modelArgs:
+        with open(modelArgs['space'], 'r') as file:
+            modelArgs['space'] = json.load(file)
+    if args.length_policy:
+        try:
+            modelArgs['lengthPolicies'] = {field: LengthPolicy.parse(text) for field, _, text in (spec.partition('=') for spec in args.length_policy)}
+        except ValueError as e:
+            parser.error(f"--length-policy: {e}")
+        unknown = set(modelArgs['lengthPolicies']) - set(LENGTH_POLICIES)
+        if unknown:
+            parser.error(f"--length-policy fields are {', '.join(LENGTH_POLICIES)}, not {', '.join(sorted(unknown))}")
+    modelFlags = {'inputMode': '--input-mode', 'lengthPolicies': '--length-policy', 'minWordCount': '--min-word-count', 'hashBuckets': '--hash-buckets',
+                  'channelIdEmbedding': '--channel-id-embedding', 'epochs': '--epochs', 'runName': '--run', 'space': '--sweep-space',
+                  'variant': '--sweep-variant', 'trials': '--sweep-trials', 'workers': '--sweep-workers'}
+    modelFunction = {'variants': trainAllVariants, 'sweep': sweep}.get(args.model, MODELS.get(args.model))
+    unsupported = [modelFlags[name] for name in modelArgs if modelFunction is None or name not in inspect.signature(modelFunction).parameters]
+    if args.stream and modelFunction is not None and 'pipeline' not in inspect.signature(modelFunction).parameters:
+        unsupported.append('--stream')
+    if unsupported:
+        parser.error(f"--model {args.model} does not take {', '.join(unsupported)}")
+    if args.run:
+        # What --resume runs again
+        os.makedirs(os.path.join(TRAINING_RUNS_PATH, args.run), exist_ok=True)
+        with open(os.path.join(TRAINING_RUNS_PATH, args.run, 'command.json'), 'w') as file:
+            json.dump(sys.argv[1:] if argv is None else list(argv), file)
+
+    #PART 1
+    # Create a DataFrame from the obtained data, streaming it from the file if the crawl already finished
+    filePathParameter = inspect.signature(collector).parameters.get('filePath')
+    filePath = collectorArgs.get('filePath', filePathParameter.default if filePathParameter is not None else None)
+    if args.stream:
+        # The model reads the file through a FeaturePipeline, which takes the feature settings
+        if filePath is None:
+            parser.error(f"--collector {args.collector} writes no file for --stream to read")
+        if not isCrawlComplete(filePath):
+            collector(**collectorArgs)
+        pipelineArgs = {name: value for name, value in modelArgs.items() if name in inspect.signature(FeaturePipeline).parameters}
+        modelArgs = {name: value for name, value in modelArgs.items() if name not in pipelineArgs}
+        modelArgs['pipeline'] = FeaturePipeline(filePath, **pipelineArgs).fit()
+        df = None
+    elif catalogFilters:
+        # The videos of every collection that match, selected through the catalog's indexes once the collector has run
+        if not (isinstance(filePath, str) and isCrawlComplete(filePath)):
+            collector(**collectorArgs)
+        else:
+            # A file collected before the store or catalog existed
+            videoCatalog.importDatasets([filePath])
+        df = videoCatalog.query(columns=['videoId'] + MODEL_COLUMNS, **catalogFilters)
+    elif isinstance(filePath, str) and isCrawlComplete(filePath):
+        df = readDataset(filePath)
+    elif collector is combineDatasets:
+        # Deduplicated in videoStore, and read as a frame of the model columns only
+        df = combineDatasets(columns=MODEL_COLUMNS)
+    else:
+        df = pd.DataFrame(collector(**collectorArgs))
+    # Display the loaded data
+    print(df if df is not None else modelArgs['pipeline'].splitSizes)
+
+    if modelFunction is not None:
+        modelFunction(df, **modelArgs)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+import copy
+import threading
+
+import pytest
+
+import projectFinal
+
+
+class StubHttpError(Exception):
+    """
+    What the stub raises for a request the YouTube Data API would reject.
+    """
+
+
+class StubRequest:
+    def __init__(self, execute):
+        self.execute = execute
+
+
+class StubResource:
+    def __init__(self, youtube, name):
+        self.youtube = youtube
+        self.name = name
+
+    def list(self, **params):
+        with self.youtube.lock:
+            self.youtube.calls.append((self.name, params))
+        return StubRequest(lambda: self.youtube.respond(self.name, params))
+
+
+class StubYoutube:
+    """
+    Offline stand-in for the googleapiclient youtube client, with
+    numChannels channels of videosPerChannel videos each.
+
+    It serves search(), videos(), channels() and playlistItems() list()
+    calls: full resources as the API returns them, pages of at most 50
+    items linked by nextPageToken, and `fields=` masks applied. Like the
+    API, it rejects more than 50 IDs per call and maxResults alongside id.
+    Every call is recorded in `calls` as (resource, params).
+    """
+
+    def __init__(self, numChannels=4, videosPerChannel=60):
+        self.calls = []
+        self.lock = threading.Lock()
+        self.channelResources = {}
+        self.videoResources = {}
+        for c in range(numChannels):
+            channelId = f'UCstub{c:04d}'
+            self.channelResources[channelId] = {
+                'kind': 'youtube#channel',
+                'etag': f'etag-{channelId}',
+                'id': channelId,
+                'statistics': {'viewCount': str(10 ** 6 * (c + 1)), 'subscriberCount': str(1000 * (c + 1)), 'hiddenSubscriberCount': False, 'videoCount': str(videosPerChannel)},
+                'contentDetails': {'relatedPlaylists': {'likes': '', 'uploads': 'UU' + channelId[2:]}},
+            }
+            for v in range(videosPerChannel):
+                videoId = f'{channelId}-v{v:03d}'
+                self.videoResources[videoId] = {
+                    'kind': 'youtube#video',
+                    'etag': f'etag-{videoId}',
+                    'id': videoId,
+                    'snippet': {
+                        'publishedAt': f'2023-{v % 12 + 1:02d}-{c % 28 + 1:02d}T12:00:00Z',
+                        'channelId': channelId,
+                        'title': f"Video {v} of channel {c}: can't miss it!",
+                        'description': 'A description ' * (v % 5),
+                        'thumbnails': {size: {'url': f'https://i.ytimg.com/vi/{videoId}/{size}.jpg', 'width': 120, 'height': 90} for size in ('default', 'medium', 'high')},
+                        'channelTitle': f'Channel {c}',
+                        'tags': ['stub', 'video'],
+                        'categoryId': ['20', '24', '28'][v % 3],
+                        'liveBroadcastContent': 'none',
+                        'localized': {'title': f'Video {v}', 'description': 'A description'},
+                        # Every seventh video is in French, and dropped by the collectors
+                        'defaultAudioLanguage': 'fr' if v % 7 == 6 else 'en',
+                    },
+                    # Every fifth video has too few views to be kept
+                    'statistics': {'viewCount': str(500 if v % 5 == 4 else 2000 + 100 * v), 'likeCount': '10', 'favoriteCount': '0', 'commentCount': '3'},
+                }
+
+    def search(self):
+        return StubResource(self, 'search')
+
+    def videos(self):
+        return StubResource(self, 'videos')
+
+    def channels(self):
+        return StubResource(self, 'channels')
+
+    def playlistItems(self):
+        return StubResource(self, 'playlistItems')
+
+    def callsTo(self, resource):
+        return [params for name, params in self.calls if name == resource]
+
+    @staticmethod
+    def page(items, params):
+        # Page tokens are the offset of the page's first item
+        start = int(params.get('pageToken') or 0)
+        size = min(params.get('maxResults', 5), 50)
+        response = {'kind': 'youtube#listResponse', 'items': items[start:start + size], 'pageInfo': {'totalResults': len(items), 'resultsPerPage': size}}
+        if start + size < len(items):
+            response['nextPageToken'] = str(start + size)
+        return response
+
+    def byId(self, resources, params):
+        ids = params['id'].split(',')
+        if len(ids) > 50:
+            raise StubHttpError(f'{len(ids)} IDs in one call, the API takes at most 50')
+        if 'maxResults' in params:
+            raise StubHttpError('maxResults is not supported with the id parameter')
+        return {'kind': 'youtube#listResponse', 'items': [copy.deepcopy(resources[i]) for i in ids if i in resources]}
+
+    def respond(self, name, params):
+        if name == 'videos':
+            response = self.byId(self.videoResources, params) if 'id' in params else self.page(copy.deepcopy(list(self.videoResources.values())), params)
+        elif name == 'channels':
+            response = self.byId(self.channelResources, params)
+        elif name == 'search':
+            videoIds = [videoId for videoId, video in self.videoResources.items() if params.get('channelId') in (None, video['snippet']['channelId'])]
+            items = [{'kind': 'youtube#searchResult', 'id': {'kind': 'youtube#video', 'videoId': videoId}, 'snippet': copy.deepcopy(self.videoResources[videoId]['snippet'])} for videoId in videoIds]
+            response = self.page(items, params)
+        elif name == 'playlistItems':
+            channelId = 'UC' + params['playlistId'][2:]
+            items = [{'kind': 'youtube#playlistItem', 'snippet': {'title': video['snippet']['title']}, 'contentDetails': {'videoId': videoId}}
+                     for videoId, video in self.videoResources.items() if video['snippet']['channelId'] == channelId]
+            response = self.page(items, params)
+        else:
+            raise StubHttpError(f'Unknown resource {name}')
+
+        if params.get('fields'):
+            response = projectFinal.applyFieldMask(response, projectFinal.parseFieldMask(params['fields']))
+        return response
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """
+    Run in tmp_path, with fresh module singletons whose files live there.
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(projectFinal, 'quotaLedger', projectFinal.QuotaLedger())
+    monkeypatch.setattr(projectFinal, 'channelCache', projectFinal.ChannelStatsCache())
+    monkeypatch.setattr(projectFinal, 'videoStore', projectFinal.VideoStore())
+    monkeypatch.setattr(projectFinal, 'videoCatalog', projectFinal.VideoCatalog())
+    monkeypatch.setattr(projectFinal, 'textCache', projectFinal.TextFeatureCache())
+    monkeypatch.setattr(projectFinal, 'featureStore', projectFinal.FeatureStore())
+    return tmp_path
+
+
+@pytest.fixture
+def youtube(workdir, monkeypatch):
+    """
+    A StubYoutube that every API call of the collectors goes to.
+    """
+    stub = StubYoutube()
+    monkeypatch.setattr(projectFinal, 'clientFactory', lambda: stub)
+    monkeypatch.setattr(projectFinal, 'clientState', threading.local())
+    monkeypatch.setattr(projectFinal, 'rateLimiter', projectFinal.RateLimiter(ratePerSecond=10 ** 6))
+    return stub
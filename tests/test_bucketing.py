@@ -0,0 +1,92 @@
+import types
+
+import numpy as np
+import pytest
+
+import projectFinal
+from projectFinal import LengthBucketedBatches, LengthPolicy, bucketLength, buildModel, flattenSequences, padForPrediction, padRows
+
+
+def randomSequences(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return [rng.integers(1, 50, size=rng.integers(0, 12)).tolist() for _ in range(count)]
+
+
+@pytest.mark.parametrize('truncating', ['pre', 'post'])
+def testPadRowsMatchesPadSequences(truncating):
+    from tensorflow.keras.preprocessing.sequence import pad_sequences
+
+    sequences = randomSequences(40)
+    values, offsets = flattenSequences(sequences)
+    rows = [5, 0, 39, 5, 17]
+    expected = pad_sequences([sequences[row] for row in rows], maxlen=6, padding='post', truncating=truncating)
+    assert np.array_equal(padRows(values, offsets, rows, 6, truncating), expected)
+    assert padRows(values, offsets, [], 6).shape == (0, 6)
+
+
+def testBucketLength():
+    assert [bucketLength(length) for length in (0, 1, 8, 9, 16, 17, 100)] == [8, 8, 8, 16, 16, 32, 128]
+
+
+def testBatchesArePaddedToTheirBucket():
+    sequences = randomSequences(100) + [list(range(1, 30))]
+    batches = LengthBucketedBatches([sequences], np.arange(101), batchSize=16, seed=3)
+
+    seen = 0
+    for (title,), views in batches.dataset():
+        lengths = [len(sequences[int(row)]) for row in views.numpy()]
+        assert title.shape[1] == bucketLength(max(lengths))
+        assert [int(np.count_nonzero(row)) for row in title.numpy()] == lengths
+        seen += len(lengths)
+    assert seen == 101
+
+
+def testPadForPrediction():
+    length = LengthPolicy(maxLen=20, keep='tail')
+    assert padForPrediction([[1, 2, 3]], length).shape == (1, 20)
+    assert padForPrediction([[1, 2, 3]], length, bucketed=True).tolist() == [[1, 2, 3, 0, 0, 0, 0, 0]]
+    # Cut to the fitted length before picking the bucket
+    assert padForPrediction([list(range(1, 41))], length, bucketed=True).tolist() == [list(range(21, 41)) + [0] * 12]
+
+
+@pytest.fixture(scope='module')
+def bucketedModel():
+    import tensorflow as tf
+
+    tf.keras.utils.set_random_seed(0)
+    features = types.SimpleNamespace(lengths={'title': LengthPolicy(maxLen=20)}, tokenizers={'title': types.SimpleNamespace(num_words=50)})
+    model, _ = buildModel({'text': ['title'], 'head': [(8, 0.0)], 'embeddingDim': 4, 'lstmUnits': 3}, features, 'bucketed')
+    return model
+
+
+def testMaskedPoolingIgnoresThePadding(bucketedModel):
+    sequences = [[4, 9, 2], [7], []]
+    values, offsets = flattenSequences(sequences)
+    padded = bucketedModel.predict_on_batch(padRows(values, offsets, np.arange(3), 16)).ravel()
+
+    # A padded row scores as the unpadded sequence alone, which has no padding to pool
+    unpadded = [bucketedModel.predict_on_batch(np.array([sequence])).ravel()[0] for sequence in sequences[:2]]
+    assert np.allclose(padded[:2], unpadded, atol=1e-6)
+    assert np.isfinite(padded[2])
+
+
+def testMaskedPoolingGivesZerosForEmptyRows():
+    import keras
+
+    projectFinal.loadModelLibraries()
+    inputs = keras.Input(shape=(None,))
+    pooled = projectFinal.MaskedGlobalMaxPooling1D()(keras.layers.Embedding(10, 3, mask_zero=True)(inputs))
+    model = keras.Model(inputs, pooled)
+
+    output = model.predict_on_batch(np.array([[0, 0, 0], [1, 2, 0]]))
+    assert np.array_equal(output[0], np.zeros(3))
+    embeddings = model.layers[1].get_weights()[0]
+    assert np.allclose(output[1], embeddings[[1, 2]].max(axis=0))
+
+
+def testMaskedPoolingSurvivesSaving(bucketedModel, tmp_path):
+    from tensorflow.keras.models import load_model
+
+    bucketedModel.save(tmp_path / 'model.keras')
+    batch = np.array([[4, 9, 2, 0, 0, 0, 0, 0]])
+    assert np.allclose(load_model(tmp_path / 'model.keras').predict_on_batch(batch), bucketedModel.predict_on_batch(batch))
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from projectFinal import CATEGORY_EMBEDDING_MAX_DIM, CategoricalEncoder, tokenizerFromJson
+
+
+TRAINING = pd.DataFrame({
+    'categoryId': ['10', '20', '10', '24', '10', '20'],
+    'channelId': ['UCa', 'UCa', 'UCb', 'UCc', 'UCa', 'UCb'],
+})
+
+
+def testValuesAreNumberedByFrequencyInBlocks():
+    encoder = CategoricalEncoder(['categoryId', 'channelId']).fit(TRAINING)
+
+    assert encoder.vocabularies == {'categoryId': {'10': 1, '20': 2, '24': 3}, 'channelId': {'UCa': 1, 'UCb': 2, 'UCc': 3}}
+    assert encoder.num_words == 8
+    # channelId's block starts after categoryId's four rows
+    assert encoder.transform(TRAINING[:2]).tolist() == [[1, 5], [2, 5]]
+
+
+def testUnknownAndRareValuesShareTheFirstRowOfTheirBlock():
+    encoder = CategoricalEncoder(['categoryId', 'channelId'], minCount=2).fit(TRAINING)
+    new = pd.DataFrame({'categoryId': ['24', '99', 10, None], 'channelId': ['UCa', 'UCnew', 'UCc', 'UCb']})
+
+    assert encoder.vocabularies == {'categoryId': {'10': 1, '20': 2}, 'channelId': {'UCa': 1, 'UCb': 2}}
+    ids = encoder.transform(new)
+    assert ids.dtype == np.int32
+    assert ids.tolist() == [[0, 4], [0, 3], [1, 3], [0, 5]]
+
+
+def testFitCountsMatchesFit():
+    # Summed over chunks, as FeaturePipeline.fit() counts them
+    first, second = TRAINING[:3], TRAINING[3:]
+    counts = {'categoryId': first['categoryId'].value_counts().add(second['categoryId'].value_counts(), fill_value=0)}
+
+    assert CategoricalEncoder().fitCounts(counts).vocabularies == CategoricalEncoder().fit(TRAINING).vocabularies
+
+
+def testEmbeddingDimAndSerialization():
+    encoder = CategoricalEncoder(['categoryId', 'channelId']).fit(TRAINING)
+    assert encoder.embeddingDim() == round(1.6 * 4 ** 0.56)
+    large = CategoricalEncoder(['channelId']).fitCounts({'channelId': {f'UC{i}': 1 for i in range(5000)}})
+    assert large.embeddingDim() == CATEGORY_EMBEDDING_MAX_DIM
+
+    loaded = tokenizerFromJson(encoder.to_json())
+    assert isinstance(loaded, CategoricalEncoder)
+    assert np.array_equal(loaded.transform(TRAINING), encoder.transform(TRAINING))
@@ -0,0 +1,52 @@
+import projectFinal
+from projectFinal import ChannelStatsCache
+
+
+def testChannelsAreFetchedOncePerTtl(youtube, monkeypatch):
+    now = [1700000000.0]
+    monkeypatch.setattr(projectFinal.time, 'time', lambda: now[0])
+    cache = ChannelStatsCache('channels.json', ttl=60)
+    channelIds = list(youtube.channelResources)
+
+    channels = cache.getChannels(channelIds + channelIds[:1] + ['UCunknown'])
+    assert channels['UCstub0001']['statistics']['subscriberCount'] == '2000'
+    assert channels['UCunknown'] is None
+    assert len(youtube.callsTo('channels')) == 1
+
+    # Fresh entries, and unknown channels, are answered from the file
+    now[0] += 59
+    reopened = ChannelStatsCache('channels.json', ttl=60)
+    assert reopened.getChannels(channelIds + ['UCunknown']) == channels
+    assert reopened.freshIds(channelIds + ['UCother']) == set(channelIds)
+    assert len(youtube.callsTo('channels')) == 1
+    assert reopened.stats() == {'hits': 5, 'misses': 0, 'size': 5}
+
+    # Expired entries are fetched again, together
+    now[0] += 1
+    assert reopened.freshIds(channelIds) == set()
+    reopened.getChannels(channelIds[:2])
+    assert youtube.callsTo('channels')[-1]['id'] == ','.join(channelIds[:2])
+
+
+def testChannelsAreFetchedFiftyIdsPerCall(youtube):
+    channelIds = [f'UCmany{i:04d}' for i in range(120)]
+
+    ChannelStatsCache(None).getChannels(channelIds)
+
+    calls = youtube.callsTo('channels')
+    assert [len(params['id'].split(',')) for params in calls] == [50, 50, 20]
+    assert all('maxResults' not in params for params in calls)
+
+
+def testEntriesOfOtherPartsAreFetchedAgain(youtube):
+    cache = ChannelStatsCache(None)
+    cache.getChannels(['UCstub0000'])
+    cache.entries['UCstub0000']['parts'] = 'statistics'
+
+    cache.getChannels(['UCstub0000'])
+    assert len(youtube.callsTo('channels')) == 2
+
+
+def testSubscriberCount(youtube):
+    assert projectFinal.get_channel_subscriber_count('UCstub0002') == 3000
+    assert projectFinal.get_channel_subscriber_count('UCunknown') == 0
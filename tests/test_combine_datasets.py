@@ -0,0 +1,38 @@
+import json
+
+import pytest
+
+import projectFinal
+from projectFinal import COMBINED_DATASET_PATH, combineDatasets, findDatasetFiles
+
+
+def writeDataset(filePath, views):
+    records = [{'videoId': videoId, 'title': f'Title of {videoId}', 'description': '', 'views': count} for videoId, count in views.items()]
+    with open(filePath, 'w') as file:
+        json.dump(records, file)
+
+
+@pytest.fixture(params=['store', 'pandas'])
+def datasets(workdir, monkeypatch, request):
+    if request.param == 'pandas':
+        monkeypatch.setattr(projectFinal, 'videoStore', None)
+    writeDataset('allVideos2.json', {'a': 1000, 'b': 2000})
+    writeDataset('channelsVideos2.json', {'b': 2500, 'c': 3000})
+    # A stale combined file, saved before b and c were crawled again
+    writeDataset(COMBINED_DATASET_PATH, {'b': 1, 'c': 1, 'd': 1})
+
+
+def testCombinedFilesRankLast(datasets):
+    assert findDatasetFiles() == ['./allVideos2.json', './channelsVideos2.json', './' + COMBINED_DATASET_PATH]
+
+
+def testCombineDatasetsIgnoresItsOwnOutput(datasets, capsys):
+    records = combineDatasets()
+
+    assert {record['videoId']: record['views'] for record in records} == {'a': 1000, 'b': 2000, 'c': 3000}
+    assert capsys.readouterr().out == ''
+    with open(COMBINED_DATASET_PATH, 'r') as file:
+        assert sorted(record['videoId'] for record in json.load(file)) == ['a', 'b', 'c']
+
+    # The saved file is not read back on the next call
+    assert len(combineDatasets(columns=['views'])) == 3
@@ -0,0 +1,93 @@
+import time
+
+import pytest
+
+import projectFinal
+from projectFinal import CrawlWriter, crawlChannels, crawlPages, fetchVideoDetails, fetchVideoRecords, searchRecords
+
+
+def assertBatchedById(youtube):
+    for resource, params in youtube.calls:
+        if 'id' in params:
+            assert len(params['id'].split(',')) <= 50, resource
+            assert 'maxResults' not in params, resource
+
+
+def isKept(video):
+    return video['snippet']['defaultAudioLanguage'] == 'en' and int(video['statistics']['viewCount']) > 1000
+
+
+def testVideoDetailsAreFetchedFiftyIdsPerCall(youtube):
+    videoIds = list(youtube.videoResources)[:120]
+    requested = videoIds + videoIds[:10] + ['deleted-video']
+
+    videos = fetchVideoDetails(requested)
+
+    assert [video['id'] for video in videos] == videoIds + videoIds[:10]
+    assert len(youtube.callsTo('videos')) == 3
+    assertBatchedById(youtube)
+
+
+def testFetchVideoRecordsLooksUpEachChannelOnce(youtube):
+    videoIds = [videoId for videoId, video in youtube.videoResources.items() if video['snippet']['channelId'] in ('UCstub0000', 'UCstub0001')]
+
+    records = fetchVideoRecords(videoIds)
+
+    assert [record['videoId'] for record in records] == [videoId for videoId in videoIds if isKept(youtube.videoResources[videoId])]
+    assert {record['subscriberCount'] for record in records} == {1000, 2000}
+    assert len(youtube.callsTo('videos')) == 3
+    assert len(youtube.callsTo('channels')) == 1
+
+    # The channels are cached now
+    fetchVideoRecords(videoIds[:10])
+    assert len(youtube.callsTo('channels')) == 1
+    assertBatchedById(youtube)
+
+
+def testCrawlPagesFollowsPageTokensUntilTheTarget(youtube):
+    writer = CrawlWriter('pages.json')
+
+    complete = crawlPages(writer, 'search', searchRecords, targetCount=100, part='snippet', fields=projectFinal.SEARCH_VIDEO_FIELDS, maxResults=50)
+
+    # Pages of 50 search results, until 100 of their videos are kept
+    kept = [isKept(video) for video in youtube.videoResources.values()]
+    numPages = next(pages for pages in range(1, len(kept) // 50 + 1) if sum(kept[:pages * 50]) >= 100)
+    assert complete and writer.isDone('pages')
+    assert writer.count() == sum(kept[:numPages * 50])
+    assert [params.get('pageToken') for params in youtube.callsTo('search')] == [None] + [str(50 * page) for page in range(1, numPages)]
+    assert len(youtube.callsTo('videos')) == numPages
+    assertBatchedById(youtube)
+
+
+def testCrawlPagesReadsOnePageWithoutATarget(youtube):
+    writer = CrawlWriter('pages.json', saveFile=False)
+
+    crawlPages(writer, 'search', searchRecords, part='snippet', fields=projectFinal.SEARCH_VIDEO_FIELDS, maxResults=20)
+
+    assert len(youtube.callsTo('search')) == 1
+    assert writer.count() == sum(isKept(video) for video in list(youtube.videoResources.values())[:20])
+
+
+@pytest.mark.parametrize('listingMode', ['search', 'uploads'])
+def testChannelCrawlRecordsDoNotDependOnConcurrency(youtube, monkeypatch, listingMode):
+    channelIds = list(youtube.channelResources)
+    expected = [record for record in (projectFinal.buildVideoRecord(video) for video in youtube.videoResources.values() if int(video['id'][-3:]) < 55) if record is not None]
+
+    results = []
+    for maxWorkers in (1, 8):
+        monkeypatch.setattr(projectFinal, 'crawlEngine', projectFinal.CrawlEngine(maxWorkers))
+        results.append(crawlChannels(CrawlWriter(f'channels{maxWorkers}.json', saveFile=False), channelIds, 55, listingMode))
+
+    assert results[0] == results[1] == expected
+    assertBatchedById(youtube)
+
+
+def testRateLimiterSpacesRequestsAfterTheBurst():
+    limiter = projectFinal.RateLimiter(ratePerSecond=50, burst=2)
+
+    start = time.monotonic()
+    for _ in range(7):
+        limiter.acquire()
+
+    # Two requests go at once, the other five wait 1/50 s each
+    assert time.monotonic() - start >= 5 / 50 * 0.9
@@ -0,0 +1,83 @@
+import json
+import os
+
+import pytest
+
+import projectFinal
+from projectFinal import CrawlWriter, QuotaLedger, checkpointPathFor, crawlChannels, isCrawlComplete, loadVideoRecords, streamPathFor
+
+
+def makeRecords(*videoIds):
+    return [{'videoId': videoId, 'title': f'Title of {videoId}', 'views': 5000} for videoId in videoIds]
+
+
+def testInterruptedCrawlResumesFromItsCheckpoint(workdir):
+    writer = CrawlWriter('crawl.json')
+    writer.setValue('channelIds', ['UCa', 'UCb'])
+    writer.write(makeRecords('a1', 'a2'))
+    writer.markDone(['UCa'])
+    # Killed while writing the next record
+    writer.stream.write('{"videoId": "b1", "tit')
+    writer.stream.close()
+    assert not isCrawlComplete('crawl.json')
+
+    resumed = CrawlWriter('crawl.json')
+    assert resumed.getValue('channelIds') == ['UCa', 'UCb']
+    assert resumed.isDone('UCa') and not resumed.isDone('UCb')
+    assert resumed.count() == 2
+
+    resumed.write(makeRecords('a2', 'b1', 'b2'))
+    resumed.markDone(['UCb'])
+    records = resumed.finish()
+
+    assert [record['videoId'] for record in records] == ['a1', 'a2', 'b1', 'b2']
+    assert loadVideoRecords('crawl.json') == records
+    assert isCrawlComplete('crawl.json')
+    assert not os.path.exists(checkpointPathFor('crawl.json'))
+    assert not os.path.exists(streamPathFor('crawl.json'))
+
+
+def testJsonLinesOutput(workdir):
+    writer = CrawlWriter('crawl.jsonl')
+    writer.write(makeRecords('a1', 'a2'))
+    writer.finish()
+
+    with open('crawl.jsonl', 'r') as file:
+        assert [json.loads(line)['videoId'] for line in file] == ['a1', 'a2']
+
+
+def testUnfinishedCrawlKeepsItsCheckpoint(workdir):
+    writer = CrawlWriter('crawl.json')
+    writer.write(makeRecords('a1'))
+
+    assert [record['videoId'] for record in writer.finish(complete=False)] == ['a1']
+    assert not os.path.exists('crawl.json')
+    assert os.path.exists(checkpointPathFor('crawl.json'))
+
+
+def testUnsavedCrawlWritesNothing(workdir):
+    writer = CrawlWriter('crawl.json', saveFile=False)
+    writer.setValue('pageToken', 'next')
+    writer.write(makeRecords('a1', 'a1', 'a2'))
+
+    assert [record['videoId'] for record in writer.finish()] == ['a1', 'a2']
+    assert os.listdir('.') == []
+
+
+@pytest.mark.parametrize('listingMode', ['search', 'uploads'])
+def testCrawlStoppedByTheQuotaResumesToTheSameRecords(youtube, monkeypatch, listingMode):
+    channelIds = list(youtube.channelResources)
+    # One channel per group, so the crawl is checkpointed after each one
+    monkeypatch.setattr(projectFinal, 'crawlGroupSize', lambda numVideosPerChannel: 1)
+    expected = crawlChannels(CrawlWriter('uninterrupted.json', saveFile=False), channelIds, 55, listingMode)
+
+    # Enough quota for about two channels
+    monkeypatch.setattr(projectFinal, 'quotaLedger', QuotaLedger(dailyQuota=projectFinal.quotaLedger.state['unitsUsed'] // 2 + 5))
+    crawlChannels(CrawlWriter('crawl.json'), channelIds, 55, listingMode)
+    assert not isCrawlComplete('crawl.json')
+
+    monkeypatch.setattr(projectFinal, 'quotaLedger', QuotaLedger('resumed.json'))
+    records = crawlChannels(CrawlWriter('crawl.json'), channelIds, 55, listingMode)
+
+    assert isCrawlComplete('crawl.json')
+    assert sorted(records, key=lambda record: record['videoId']) == sorted(expected, key=lambda record: record['videoId'])
@@ -0,0 +1,32 @@
+import io
+import json
+
+import pytest
+
+from projectFinal import iterJsonArray
+
+
+ELEMENTS = [123456789, -1.5e-10, True, False, None, 'a string', {'videoId': 'abc', 'views': 1234567}, [1, 2.5, [3]], 0]
+
+
+@pytest.mark.parametrize('blockSize', [1, 2, 3, 7, 1 << 20])
+def testBlocksSmallerThanTheTokens(blockSize):
+    text = json.dumps(ELEMENTS)
+    assert list(iterJsonArray(io.StringIO(text), blockSize)) == ELEMENTS
+
+
+@pytest.mark.parametrize('blockSize', [1, 4, 1 << 20])
+def testWhitespaceAroundScalars(blockSize):
+    text = '[ 12345 ,\n  678  ,true , null\n]\n'
+    assert list(iterJsonArray(io.StringIO(text), blockSize)) == [12345, 678, True, None]
+
+
+def testNumberCutAtTheEndOfABlock():
+    # The first block ends inside the number: 12 | 345
+    assert list(iterJsonArray(io.StringIO('[12345]'), 3)) == [12345]
+
+
+@pytest.mark.parametrize('text', ['[1, 2', '[{"a": 1}', '[12345'])
+def testTruncatedArray(text):
+    with pytest.raises(ValueError):
+        list(iterJsonArray(io.StringIO(text), 2))
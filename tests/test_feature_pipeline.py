@@ -0,0 +1,46 @@
+import json
+
+import numpy as np
+import pytest
+
+import projectFinal
+from projectFinal import BUCKET_MIN_LENGTH, FeaturePipeline, buildModel
+
+
+TINY_SPEC = {'text': ['title', 'description'], 'numeric': {'subscriber': None}, 'head': [(4, 0.0)], 'embeddingDim': 4, 'lstmUnits': 2}
+
+
+@pytest.fixture
+def pipeline(workdir, monkeypatch):
+    # The records are already lower case and free of punctuation
+    monkeypatch.setattr(projectFinal, 'preprocessTexts', lambda texts: list(texts))
+    with open('videos.jsonl', 'w') as file:
+        for i in range(60):
+            record = {'videoId': f'video{i:03d}', 'title': ' '.join(['word'] * (1 + i % 20)), 'description': '', 'channelTitle': f'channel {i % 3}',
+                      'channelId': f'UC{i % 3}', 'subscriberCount': 1000 * i, 'categoryId': str(10 + i % 2), 'publishedAt': '2024-01-01T00:00:00Z', 'views': 100 * i}
+            file.write(json.dumps(record) + '\n')
+    return FeaturePipeline('videos.jsonl', cacheDir=None).fit()
+
+
+def testPaddedBatchesHaveTheFittedLengths(pipeline):
+    assert (pipeline.lengths['title'].maxLen, pipeline.lengths['description'].maxLen) == (20, 1)
+    for (title, description), _ in pipeline.dataset('train', ['title', 'description'], batchSize=8):
+        assert (title.shape[1], description.shape[1]) == (20, 1)
+
+
+def testBucketedBatchesArePaddedToTheirBucket(pipeline):
+    batches = list(pipeline.dataset('train', ['title', 'description'], batchSize=8, padded=False))
+
+    assert sum(len(views) for _, views in batches) == pipeline.splitSizes['train']
+    for (title, description), _ in batches:
+        longest = int(np.count_nonzero(title.numpy(), axis=1).max())
+        assert title.shape[1] == max(BUCKET_MIN_LENGTH, 1 << (longest - 1).bit_length())
+        # Every description is empty, and still has timesteps for the LSTM
+        assert description.shape[1] == BUCKET_MIN_LENGTH and not description.numpy().any()
+
+
+def testBucketedModelTrainsOnEmptyTexts(pipeline):
+    model, inputs = buildModel(TINY_SPEC, pipeline, 'bucketed')
+
+    history = model.fit(pipeline.dataset('train', inputs, batchSize=8, padded=False), epochs=1, verbose=0)
+    assert np.isfinite(history.history['loss'][-1])
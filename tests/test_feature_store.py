@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from sklearn.preprocessing import StandardScaler
+
+from projectFinal import CategoricalEncoder, FeatureStore, HashingTokenizer, LengthPolicy, TextFeatureCache
+
+
+SEQUENCES = [[1, 2, 3, 4], [5], [], [6, 7]]
+
+
+@pytest.mark.parametrize('truncating, expected', [
+    ('pre', [[2, 3, 4], [5, 0, 0], [0, 0, 0], [6, 7, 0]]),
+    ('post', [[1, 2, 3], [5, 0, 0], [0, 0, 0], [6, 7, 0]]),
+])
+def testPaddedMatricesAreReadOnlyAndReused(workdir, truncating, expected):
+    store = FeatureStore('store')
+    matrix = store.pad(SEQUENCES, 3, truncating)
+
+    assert matrix.tolist() == expected
+    assert isinstance(matrix, np.memmap) and not matrix.flags.writeable
+    assert store.pad(SEQUENCES, 3, truncating).filename == matrix.filename
+    assert store.pad(SEQUENCES, 4, truncating).filename != matrix.filename
+    assert store.pad([], 3).shape == (0, 3)
+
+
+def testManifestRoundTrip(workdir):
+    store = FeatureStore('store')
+    subscribers = np.array([[10.0], [2000.0], [30000.0]])
+    scaler = StandardScaler().fit(subscribers)
+    tokenizer, sequences = TextFeatureCache('cache').tokenize(['red apple', 'green apple', 'pear'], numWords=100)
+    encoder = CategoricalEncoder(['categoryId']).fitCounts({'categoryId': {'10': 2, '20': 1}})
+    padded = store.pad(sequences, 2)
+
+    store.saveManifest('model', {'title': padded, 'subscribers': scaler.transform(subscribers)},
+                       scalers={'subscribers': scaler},
+                       tokenizers={'title': tokenizer, 'hashed': HashingTokenizer(64), 'category': encoder},
+                       lengths={'title': LengthPolicy(maxLen=2, keep='tail')})
+    loaded = FeatureStore('store').load('model')
+
+    # Padded matrices are referenced in place, other arrays are saved next to them
+    assert loaded['arrays']['title'].filename == padded.filename
+    assert np.array_equal(loaded['arrays']['subscribers'], scaler.transform(subscribers))
+    assert np.allclose(loaded['scalers']['subscribers'].transform([[500.0]]), scaler.transform([[500.0]]))
+    assert loaded['tokenizers']['title'].texts_to_sequences(['green pear']) == tokenizer.texts_to_sequences(['green pear'])
+    assert loaded['tokenizers']['hashed'].num_words == 64
+    assert loaded['tokenizers']['category'].vocabularies == encoder.vocabularies
+    assert repr(loaded['lengths']['title']) == repr(LengthPolicy(maxLen=2, keep='tail'))
@@ -0,0 +1,89 @@
+import json
+import os
+import time
+
+import pytest
+
+import projectFinal
+from projectFinal import applyFieldMask, buildVideoRecord, parseFieldMask
+
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), 'fixtures', 'apiResponses')
+
+
+def loadFixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), 'r') as file:
+        return json.load(file)
+
+
+def mask(response, fields):
+    return applyFieldMask(response, parseFieldMask(fields))
+
+
+@pytest.fixture
+def maskedChannels(workdir):
+    # channelCache holding the masked channels().list fixture, as a crawl leaves it
+    now = time.time()
+    projectFinal.channelCache.entries = {
+        channel['id']: {'fetchedAt': now, 'parts': projectFinal.CHANNEL_PARTS, 'channel': channel}
+        for channel in mask(loadFixture('channels-0.json'), projectFinal.CHANNEL_FIELDS)['items']
+    }
+
+
+def testParseFieldMask():
+    assert parseFieldMask('nextPageToken,items(id,snippet(title,channelId),statistics/viewCount)') == {
+        'nextPageToken': {},
+        'items': {'id': {}, 'snippet': {'title': {}, 'channelId': {}}, 'statistics': {'viewCount': {}}},
+    }
+    assert parseFieldMask('items/snippet/channelId') == {'items': {'snippet': {'channelId': {}}}}
+
+
+@pytest.mark.parametrize('fields', [projectFinal.VIDEO_FIELDS, projectFinal.CHART_FIELDS])
+def testMaskedVideosBuildTheSameRecords(maskedChannels, fields):
+    response = loadFixture('videos-0.json')
+    masked = mask(response, fields)
+
+    records = [buildVideoRecord(video) for video in masked['items']]
+    assert records == [buildVideoRecord(video) for video in response['items']]
+    # The fixture has kept, non-English and low-view videos
+    assert [record is not None for record in records] == [True, True, False, False]
+    assert records[0]['subscriberCount'] == 2310000
+    assert 'thumbnails' not in masked['items'][0]['snippet']
+    assert len(json.dumps(masked)) < len(json.dumps(response)) / 2
+
+
+def testChartMaskKeepsThePageToken():
+    masked = mask({**loadFixture('videos-0.json'), 'nextPageToken': 'CAUQAA'}, projectFinal.CHART_FIELDS)
+    assert masked['nextPageToken'] == 'CAUQAA'
+
+
+def testMaskedChannelsHoldWhatTheCrawlsRead(maskedChannels):
+    assert projectFinal.get_channel_subscriber_count('UCfixtureChannelBBBBBBBB') == 104000
+    assert projectFinal.getUploadsPlaylistIds(['UCfixtureChannelAAAAAAAA', 'UCfixtureChannelBBBBBBBB']) == {
+        'UCfixtureChannelAAAAAAAA': 'UUfixtureChannelAAAAAAAA',
+        'UCfixtureChannelBBBBBBBB': 'UUfixtureChannelBBBBBBBB',
+    }
+
+
+def testMaskedListingsHoldWhatTheCrawlsRead():
+    search = loadFixture('search-0.json')
+    videoIds = [item['id']['videoId'] for item in search['items']]
+    masked = mask(search, projectFinal.SEARCH_VIDEO_FIELDS)
+    assert [item['id']['videoId'] for item in masked['items']] == videoIds
+    assert masked['nextPageToken'] == search['nextPageToken']
+
+    masked = mask(search, projectFinal.SEARCH_CHANNEL_FIELDS)
+    assert [item['snippet']['channelId'] for item in masked['items']] == [item['snippet']['channelId'] for item in search['items']]
+
+    playlist = loadFixture('playlistItems-0.json')
+    masked = mask(playlist, projectFinal.PLAYLIST_FIELDS)
+    assert [item['contentDetails']['videoId'] for item in masked['items']] == [item['contentDetails']['videoId'] for item in playlist['items']]
+    assert masked['nextPageToken'] == playlist['nextPageToken']
+
+
+def testBenchmarkPayloadSizes():
+    report = projectFinal.benchmarkPayloadSizes(FIXTURE_DIR, repeats=1)
+
+    assert sorted(report['resource']) == ['channels', 'playlistItems', 'search', 'videos']
+    assert (report['maskedBytes'] < report['fullBytes']).all()
+    assert (report['wireReduction'] > 0).all()
@@ -0,0 +1,42 @@
+import os
+
+from projectFinal import HashingTokenizer, TextFeatureCache, tokenizerFromJson, vocabularySize
+
+
+TEXTS = ['red apple pie', 'apple', '', 'a word never seen in training']
+
+
+def testWordsMapToStableRows():
+    tokenizer = HashingTokenizer(64)
+    sequences = tokenizer.texts_to_sequences(TEXTS)
+
+    assert [len(sequence) for sequence in sequences] == [3, 1, 0, 6]
+    assert sequences[0][1] == sequences[1][0]
+    # Row 0 stays the padding index
+    assert all(1 <= index < 64 for sequence in sequences for index in sequence)
+    assert HashingTokenizer(64).texts_to_sequences(TEXTS) == sequences
+    assert tokenizerFromJson(tokenizer.to_json()).texts_to_sequences(TEXTS) == sequences
+
+
+def testHashedTokenizingFitsNothing(workdir):
+    cache = TextFeatureCache('cache')
+    tokenizer, sequences = cache.tokenize(TEXTS, numWords=100, hashBuckets=64)
+
+    assert isinstance(tokenizer, HashingTokenizer) and tokenizer.num_words == 64
+    assert sequences == HashingTokenizer(64).texts_to_sequences(TEXTS)
+    assert not os.path.exists('cache')
+
+
+def testEmbeddingsAreSizedByTheFittedVocabulary(workdir):
+    texts = ['red apple', 'green apple', 'red pear', 'apple']
+    cache = TextFeatureCache('cache')
+
+    # Padding, OOV and the four words
+    assert cache.tokenize(texts, numWords=100)[0].num_words == 6
+    # Words seen once share the OOV row
+    assert cache.tokenize(texts, numWords=100, minCount=2)[0].num_words == 4
+    assert cache.tokenize(texts, numWords=3)[0].num_words == 3
+
+    tokenizer, _ = cache.tokenize(texts, numWords=100)
+    tokenizer.oov_token = None
+    assert vocabularySize(tokenizer, 100) == 5
@@ -0,0 +1,46 @@
+import pytest
+
+import projectFinal
+from projectFinal import LENGTH_POLICIES, LengthPolicy
+
+
+SEQUENCES = [list(range(1, length + 1)) for length in (2, 4, 6, 8, 40)]
+
+
+def fitted(policy):
+    return repr(policy.fit(SEQUENCES))
+
+
+def testParse():
+    assert repr(LengthPolicy.parse('256')) == repr(LengthPolicy(maxLen=256))
+    assert repr(LengthPolicy.parse('p95')) == repr(LengthPolicy(percentile=95.0))
+    assert repr(LengthPolicy.parse('24:tail')) == repr(LengthPolicy(maxLen=24, keep='tail'))
+    for text in ('p95:middle', 'long', ''):
+        with pytest.raises(ValueError):
+            LengthPolicy.parse(text)
+
+
+def testFit():
+    assert fitted(LengthPolicy()) == repr(LengthPolicy(maxLen=40))
+    assert fitted(LengthPolicy(maxLen=5, keep='tail')) == repr(LengthPolicy(maxLen=5, keep='tail'))
+    assert fitted(LengthPolicy(percentile=50)) == repr(LengthPolicy(maxLen=6))
+    assert fitted(LengthPolicy(maxLen=4, percentile=50)) == repr(LengthPolicy(maxLen=4))
+    # At least one timestep, even for empty fields
+    assert repr(LengthPolicy().fit([[], []])) == repr(LengthPolicy(maxLen=1))
+    assert repr(LengthPolicy(percentile=95).fit([])) == repr(LengthPolicy(maxLen=1))
+
+
+def testTruncate():
+    assert LengthPolicy(maxLen=3).truncate([[1, 2, 3, 4], [5]]) == [[1, 2, 3], [5]]
+    assert LengthPolicy(maxLen=3, keep='tail').truncate([[1, 2, 3, 4], [5]]) == [[2, 3, 4], [5]]
+    assert (LengthPolicy(keep='head').truncating, LengthPolicy(keep='tail').truncating) == ('post', 'pre')
+
+
+def testEveryFieldKeepsItsLongestSequenceByDefault():
+    assert {field: fitted(policy) for field, policy in LENGTH_POLICIES.items()} == {field: repr(LengthPolicy(maxLen=40)) for field in LENGTH_POLICIES}
+
+
+@pytest.mark.parametrize('spec', ['description=p95:middle', 'views=12'])
+def testMainRejectsBadPolicies(spec):
+    with pytest.raises(SystemExit):
+        projectFinal.main(['--length-policy', spec])
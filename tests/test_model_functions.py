@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import projectFinal
+from projectFinal import FeatureSet, modelInputs, predictViewCount, trainModelFunction
+
+
+def makeVideos(count=40):
+    return pd.DataFrame([
+        {'title': ' '.join(['word', f'topic{i % 5}'] * (1 + i % 4)), 'description': f'about topic{i % 3}', 'channelTitle': f'channel {i % 3}',
+         'channelId': f'UC{i % 3}', 'categoryId': str(20 + i % 2), 'subscriberCount': 1000 * i, 'publishedAt': '2024-01-01T00:00:00Z', 'views': 100 * i}
+        for i in range(count)
+    ])
+
+
+@pytest.fixture
+def tinySpecs(workdir, monkeypatch):
+    # The texts are already lower case and free of punctuation
+    monkeypatch.setattr(projectFinal, 'preprocessTexts', lambda texts: list(texts))
+    monkeypatch.setattr(projectFinal, 'preprocessText', lambda text: text)
+    monkeypatch.setattr(projectFinal, 'MODEL_EMBEDDING_DIM', 4)
+    monkeypatch.setattr(projectFinal, 'MODEL_LSTM_UNITS', 2)
+    specs = {variant: {**spec, 'head': [(4, 0.0)]} for variant, spec in projectFinal.MODEL_SPECS.items()}
+    monkeypatch.setattr(projectFinal, 'MODEL_SPECS', specs)
+    monkeypatch.setattr(projectFinal, 'trainedModels', {})
+
+
+@pytest.mark.parametrize('variant', ['titleSubscriber', 'all'])
+def testPredictionsUseTheTrainingFeatures(tinySpecs, variant):
+    df = makeVideos()
+    model, features = trainModelFunction(f'{variant}Model', variant, df)
+
+    assert projectFinal.trainedModels == {f'{variant}Model': model}
+    assert sorted(features.tokenizers) == sorted(projectFinal.MODEL_SPECS[variant]['text'])
+    assert set(projectFinal.featureStore.load(f'{variant}Model')['tokenizers']) == {*features.tokenizers, 'category'}
+
+    # A training row, scored from its raw fields, gets the prediction of its features
+    rows = features.rows['test'][:1]
+    video = df.iloc[rows[0]].to_dict()
+    video['daysSincePublication'] = (pd.to_datetime('today').tz_localize('UTC') - pd.to_datetime(video['publishedAt'])).days
+    inputs = [features.inputArray(entry, rows) for entry in modelInputs(projectFinal.MODEL_SPECS[variant])]
+    expected = model.predict(inputs if len(inputs) > 1 else inputs[0], verbose=0)[0][0]
+    assert np.isclose(predictViewCount(model, features, variant, video), expected, rtol=1e-4)
+
+
+def testModelFunctionsTrainTheirVariant(tinySpecs):
+    projectFinal.neuralTitleModel(makeVideos())
+    projectFinal.neuralAllModel(makeVideos(), inputMode='bucketed')
+
+    assert sorted(projectFinal.trainedModels) == ['neuralAllModel', 'neuralTitleModel']
+    # Reopened features hold only the variant's texts
+    assert list(FeatureSet.fromStore('neuralTitleModel').tokenizers) == ['title']
+
+
+def testResumedRunTrainsAsAnUninterruptedOne(tinySpecs, monkeypatch):
+    df = makeVideos()
+    projectFinal.neuralTSDateModel(df, epochs=4, runName='uninterrupted')
+    expected = projectFinal.trainedModels['neuralTSDateModel'].get_weights()
+
+    seedEpoch = projectFinal.TrainingRun.seedEpoch
+    epochs = []
+
+    def crashInEpoch(crashEpoch):
+        def seedOrCrash(self, model, epoch):
+            if epoch == crashEpoch:
+                raise KeyboardInterrupt
+            epochs.append(epoch)
+            seedEpoch(self, model, epoch)
+        return seedOrCrash
+
+    monkeypatch.setattr(projectFinal.TrainingRun, 'seedEpoch', crashInEpoch(2))
+    with pytest.raises(KeyboardInterrupt):
+        projectFinal.neuralTSDateModel(df, epochs=4, runName='resumed')
+    assert projectFinal.TrainingRun('resumed').loadState()['epoch'] == 2
+    monkeypatch.setattr(projectFinal.TrainingRun, 'seedEpoch', crashInEpoch(None))
+    projectFinal.neuralTSDateModel(df, epochs=4, runName='resumed')
+
+    # Only the epochs after the checkpoint trained again
+    assert epochs == [0, 1, 2, 3]
+    history = {name: projectFinal.TrainingRun(name).loadState()['history'] for name in ('uninterrupted', 'resumed')}
+    assert [entry['epoch'] for entry in history['resumed']] == [1, 2, 3, 4]
+    for uninterrupted, resumed in zip(history['uninterrupted'], history['resumed']):
+        assert np.isclose(resumed['loss'], uninterrupted['loss']) and np.isclose(resumed['validationLoss'], uninterrupted['validationLoss'])
+    for resumed, uninterrupted in zip(projectFinal.trainedModels['neuralTSDateModel'].get_weights(), expected):
+        assert np.allclose(resumed, uninterrupted)
@@ -0,0 +1,40 @@
+import json
+import os
+
+import pytest
+
+import projectFinal
+from projectFinal import preprocessBatch, preprocessText, preprocessTexts
+
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), 'fixtures', 'preprocessingCorpus.json')
+
+
+def nltkDataMissing():
+    import nltk
+    try:
+        for path in projectFinal.NLTK_RESOURCES.values():
+            nltk.data.find(path)
+    except LookupError:
+        return True
+    return False
+
+
+pytestmark = pytest.mark.skipif(nltkDataMissing(), reason='needs the NLTK punkt and stopwords data')
+
+
+@pytest.fixture(scope='module')
+def corpus():
+    # Contractions, quotes, unicode and whitespace: where the fast path could drift from word_tokenize
+    with open(CORPUS_PATH, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def testBatchMatchesTheNltkPath(corpus):
+    assert preprocessBatch(corpus) == [preprocessText(text) for text in corpus]
+
+
+def testPreprocessTextsMatchesTheNltkPath(corpus):
+    expected = [preprocessText(text) for text in corpus]
+    assert preprocessTexts(corpus + corpus[:3], workers=1) == expected + expected[:3]
+    assert preprocessTexts(corpus, workers=2, parallelMin=1) == expected
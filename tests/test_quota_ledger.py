@@ -0,0 +1,90 @@
+import json
+import os
+
+import pytest
+
+import projectFinal
+from projectFinal import CrawlWriter, QuotaExceededError, QuotaLedger, crawlChannels, estimateCrawlUnits
+
+
+def readLedger(filePath='quotaLedger.json'):
+    with open(filePath, 'r') as file:
+        return json.load(file)
+
+
+def testChargesAreWrittenOnFlush(workdir):
+    ledger = QuotaLedger('ledger.json', dailyQuota=150)
+    ledger.charge('videos')
+    ledger.charge('search')
+    assert not os.path.exists('ledger.json')
+
+    ledger.flush()
+    assert readLedger('ledger.json')['unitsUsed'] == 101
+    assert readLedger('ledger.json')['calls'] == {'videos': 1, 'search': 1}
+
+    # A call that would go over the quota is not charged
+    with pytest.raises(QuotaExceededError):
+        ledger.charge('search')
+    assert ledger.remaining() == 49
+    assert QuotaLedger('ledger.json', dailyQuota=150).remaining() == 49
+
+
+def testLedgerStartsOverOnANewQuotaDay(workdir, monkeypatch):
+    monkeypatch.setattr(projectFinal, 'quotaDay', lambda: '2026-01-01')
+    ledger = QuotaLedger('ledger.json', dailyQuota=150)
+    ledger.charge('search')
+    ledger.setDeferred('crawl.json', ['UCa'])
+
+    monkeypatch.setattr(projectFinal, 'quotaDay', lambda: '2026-01-02')
+    assert ledger.remaining() == 150
+    # Deferred channels wait for the next run, whatever the day
+    assert ledger.getDeferred('crawl.json') == ['UCa']
+
+
+@pytest.mark.parametrize('listingMode', ['search', 'uploads'])
+def testEstimateIsAnUpperBoundOfTheCrawl(youtube, listingMode):
+    channelIds = list(youtube.channelResources)
+
+    crawlChannels(CrawlWriter('first.json', saveFile=False), channelIds, 55, listingMode)
+    used = projectFinal.quotaLedger.state['unitsUsed']
+    assert used <= estimateCrawlUnits(channelIds, 55, listingMode)
+
+    # Cached channels cost no channels().list call
+    cachedIds = projectFinal.channelCache.freshIds(channelIds)
+    assert cachedIds == set(channelIds)
+    crawlChannels(CrawlWriter('second.json', saveFile=False), channelIds, 55, listingMode)
+    assert projectFinal.quotaLedger.state['unitsUsed'] - used <= estimateCrawlUnits(channelIds, 55, listingMode, cachedIds)
+    assert readLedger()['unitsUsed'] == projectFinal.quotaLedger.state['unitsUsed']
+
+
+def quotaForChannels(numChannels):
+    # Enough for numChannels channels of 55 searched videos, not for one more
+    return estimateCrawlUnits(['UCstub'] * numChannels, 55)
+
+
+def testUnsavedCrawlsDoNotDeferChannels(youtube, monkeypatch):
+    monkeypatch.setattr(projectFinal, 'quotaLedger', QuotaLedger(dailyQuota=quotaForChannels(2)))
+
+    records = crawlChannels(CrawlWriter('unsaved.json', saveFile=False), list(youtube.channelResources), 55)
+
+    assert {record['channelId'] for record in records} == {'UCstub0000', 'UCstub0001'}
+    assert readLedger()['deferred'] == {}
+
+
+def testSavedCrawlsDeferTheChannelsThatDoNotFit(youtube, monkeypatch):
+    monkeypatch.setattr(projectFinal, 'quotaLedger', QuotaLedger(dailyQuota=quotaForChannels(2)))
+
+    crawlChannels(CrawlWriter('saved.json'), list(youtube.channelResources), 55)
+
+    assert readLedger()['deferred'] == {'saved.json': ['UCstub0002', 'UCstub0003']}
+    assert not projectFinal.isCrawlComplete('saved.json')
+
+
+def testCrawlsThatReachTheirTargetDeferNothing(youtube, monkeypatch):
+    monkeypatch.setattr(projectFinal, 'quotaLedger', QuotaLedger(dailyQuota=quotaForChannels(2)))
+    projectFinal.quotaLedger.setDeferred('target.json', ['UCstub0003'])
+
+    crawlChannels(CrawlWriter('target.json'), list(youtube.channelResources), 55, targetCount=10)
+
+    assert readLedger()['deferred'] == {}
+    assert projectFinal.isCrawlComplete('target.json')
@@ -0,0 +1,49 @@
+import pandas as pd
+
+import projectFinal
+from projectFinal import TextFeatureCache
+
+
+def testProcessedTextsAreCachedPerText(workdir, monkeypatch):
+    processed = []
+
+    def preprocessTexts(texts):
+        processed.append(list(texts))
+        return [text.upper() for text in texts]
+
+    monkeypatch.setattr(projectFinal, 'preprocessTexts', preprocessTexts)
+    cache = TextFeatureCache('cache')
+
+    assert cache.preprocess(['a', 'b', 'a']) == ['A', 'B', 'A']
+    # A grown dataset only preprocesses its new texts, and a Series keeps its index
+    texts = pd.Series(['c', 'b', 'a'], index=[7, 8, 9])
+    assert TextFeatureCache('cache').preprocess(texts).equals(pd.Series(['C', 'B', 'A'], index=[7, 8, 9]))
+    assert processed == [['a', 'b'], ['c']]
+    assert (cache.hits, cache.misses) == (0, 2)
+
+    # A new preprocessing version does not reuse the old results
+    monkeypatch.setattr(projectFinal, 'PREPROCESS_VERSION', projectFinal.PREPROCESS_VERSION + 1)
+    cache.preprocess(['a'])
+    assert processed[-1] == ['a']
+
+
+def testTokenizersAreCachedPerFingerprint(workdir, monkeypatch):
+    texts = ['red apple', 'green apple', 'red pear', 'apple']
+    cache = TextFeatureCache('cache')
+
+    tokenizer, sequences = cache.tokenize(texts, numWords=100, minCount=2)
+    assert tokenizer.num_words == 4  # Padding, OOV, apple and red
+    assert sequences == [[3, 2], [1, 2], [3, 1], [2]]  # green and pear are OOV
+
+    reopened = TextFeatureCache('cache')
+    cachedTokenizer, cachedSequences = reopened.tokenize(texts, numWords=100, minCount=2)
+    assert cachedSequences == sequences
+    assert (cachedTokenizer.num_words, cachedTokenizer.word_index) == (tokenizer.num_words, tokenizer.word_index)
+    assert (reopened.hits, reopened.misses) == (1, 0)
+
+    # Other texts, other settings or another preprocessing version fit again
+    reopened.tokenize(texts[:3], numWords=100, minCount=2)
+    reopened.tokenize(texts, numWords=100)
+    monkeypatch.setattr(projectFinal, 'PREPROCESS_VERSION', projectFinal.PREPROCESS_VERSION + 1)
+    reopened.tokenize(texts, numWords=100, minCount=2)
+    assert (reopened.hits, reopened.misses) == (1, 3)
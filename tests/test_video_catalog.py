@@ -0,0 +1,37 @@
+import json
+
+import pytest
+
+import projectFinal
+from projectFinal import CrawlWriter, combineDatasets
+
+
+def makeRecords(channelId, *videoIds):
+    return [{'videoId': videoId, 'title': f'Title of {videoId}', 'description': '', 'channelTitle': channelId, 'channelId': channelId, 'subscriberCount': 1000, 'categoryId': '10',
+             'publishedAt': '2024-01-01T00:00:00Z', 'views': 5000} for videoId in videoIds]
+
+
+@pytest.fixture(params=['store', 'noStore'])
+def catalog(workdir, monkeypatch, request):
+    if request.param == 'noStore':
+        monkeypatch.setattr(projectFinal, 'videoStore', None)
+    return projectFinal.videoCatalog
+
+
+def testFinishedCrawlsReachTheCatalog(catalog):
+    writer = CrawlWriter('channelsVideos2.json')
+    writer.write(makeRecords('UCa', 'a1', 'a2') + makeRecords('UCb', 'b1'))
+    writer.finish(complete=False)
+    assert catalog.count() == 0
+
+    CrawlWriter('channelsVideos2.json').finish()
+    assert catalog.count(channelId='UCa') == 2
+    assert catalog.query(columns=['videoId'], channelId=['UCb'])['videoId'].tolist() == ['b1']
+
+
+def testCombinedDatasetsReachTheCatalog(catalog):
+    with open('allVideos2.json', 'w') as file:
+        json.dump(makeRecords('UCa', 'a1', 'a2'), file)
+
+    combineDatasets(saveFile=False)
+    assert catalog.count(categoryId='10') == 2
@@ -0,0 +1,38 @@
+import projectFinal
+from projectFinal import QuotaLedger, loadViewHistory, refreshViewCounts
+
+
+def testRefreshAppendsOneSnapshotPerVideo(youtube, monkeypatch):
+    videoIds = list(youtube.videoResources)[:120]
+    monkeypatch.setattr(projectFinal.time, 'time', lambda: 1700000000)
+    assert refreshViewCounts(videoIds + ['deleted-video'], 'history.csv') == 120
+
+    monkeypatch.setattr(projectFinal.time, 'time', lambda: 1700086400)
+    records = [{'videoId': videoId, 'views': 0} for videoId in videoIds[:10]]
+    assert refreshViewCounts(records, 'history.csv') == 10
+
+    # Statistics only, 50 IDs per call, and one header
+    calls = youtube.callsTo('videos')
+    assert len(calls) == 3 + 1
+    assert {params['part'] for params in calls} == {'statistics'}
+    assert all(len(params['id'].split(',')) <= 50 and 'maxResults' not in params for params in calls)
+    with open('history.csv', 'r') as file:
+        assert file.read().count('videoId') == 1
+
+    history = loadViewHistory('history.csv')
+    assert len(history) == 130
+    assert list(history.columns) == projectFinal.VIEW_HISTORY_COLUMNS
+    assert history['videoId'].is_monotonic_increasing
+    snapshots = history[history['videoId'] == videoIds[0]]
+    assert [str(polledAt.date()) for polledAt in snapshots['polledAt']] == ['2023-11-14', '2023-11-15']
+    assert snapshots['views'].tolist() == [int(youtube.videoResources[videoIds[0]]['statistics']['viewCount'])] * 2
+
+
+def testRefreshStoppedByTheQuotaKeepsItsSnapshots(youtube, monkeypatch):
+    # Batches of 2 videos in groups of 4 batches, and quota for the first group only
+    monkeypatch.setattr(projectFinal, 'VIDEO_BATCH_SIZE', 2)
+    monkeypatch.setattr(projectFinal, 'crawlEngine', projectFinal.CrawlEngine(maxWorkers=1))
+    monkeypatch.setattr(projectFinal, 'quotaLedger', QuotaLedger(dailyQuota=4))
+
+    assert refreshViewCounts(list(youtube.videoResources)[:10], 'history.csv') == 8
+    assert len(loadViewHistory('history.csv')) == 8